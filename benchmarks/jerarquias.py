@@ -0,0 +1,120 @@
+"""
+Compara las consultas sobre jerarquías de contracción con las llamadas de
+NetworkX que usaban los scripts, sobre grillas sintéticas.
+
+Uso (desde la raíz del repositorio)::
+
+    python benchmarks/jerarquias.py --tamanos 10000 40000 160000 --consultas 500
+
+Para cada tamaño se mide la construcción de la jerarquía, su escritura y
+lectura en disco y la latencia de las consultas (media, p50 y p99) frente a
+``nx.shortest_path`` + ``nx.shortest_path_length`` y a una sola
+``nx.single_source_dijkstra``. Los costos de ambos métodos se comparan en
+cada consulta. Las grillas de un millón de nodos funcionan, pero la
+construcción en Python puro puede tardar una hora o más.
+"""
+
+import argparse  # Opciones de la línea de comandos
+import math  # Lado de la grilla
+import os  # Rutas de archivos
+import random  # Pares de consulta reproducibles
+import sys  # Para importar rutas desde la raíz del repositorio
+import tempfile  # Directorio para la jerarquía guardada
+import time  # Medición de tiempos
+
+import networkx as nx  # Método de referencia
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rutas import JerarquiaContraccion, cargar_grafo, construir_jerarquia, grilla  # noqa: E402
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def _latencias(funcion, pares):
+    """Tiempo en milisegundos de ``funcion(a, b)`` para cada par, y sus resultados."""
+    tiempos, resultados = [], []
+    for a, b in pares:
+        inicio = time.perf_counter()
+        resultados.append(funcion(a, b))
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos, resultados
+
+
+def medir(tamano, consultas, peso, semilla):
+    """Mide un tamaño de grilla y devuelve un diccionario con los resultados."""
+    lado = max(2, round(math.sqrt(tamano)))
+    datos, _ = grilla(lado, semilla=semilla)
+    G_tiempo, G_distancia = cargar_grafo(datos, compilar=False)  # Sin matrices densas de n²
+    G = G_tiempo if peso == "tiempo" else G_distancia
+    fila = {"nodos": G.number_of_nodes(), "aristas": G.number_of_edges()}
+
+    inicio = time.perf_counter()
+    estadisticas = {}
+    H = construir_jerarquia(G, estadisticas=estadisticas)
+    fila["construccion_s"] = time.perf_counter() - inicio
+    fila["atajos"] = estadisticas["atajos"]
+
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, "jerarquia.npz")
+        inicio = time.perf_counter()
+        H.guardar(archivo)
+        fila["guardar_s"] = time.perf_counter() - inicio
+        fila["archivo_mb"] = os.path.getsize(archivo) / 2**20
+        inicio = time.perf_counter()
+        H = JerarquiaContraccion.cargar(archivo)
+        H.consulta(*list(G)[:2])  # Incluye la preparación de las listas de consulta
+        fila["cargar_s"] = time.perf_counter() - inicio
+
+    azar = random.Random(semilla)
+    nodos = list(G)
+    pares = [tuple(azar.sample(nodos, 2)) for _ in range(consultas)]
+
+    def networkx_dos_llamadas(a, b):
+        ruta = nx.shortest_path(G, source=a, target=b, weight="weight")
+        return ruta, nx.shortest_path_length(G, source=a, target=b, weight="weight")
+
+    def networkx_una_llamada(a, b):
+        costo, ruta = nx.single_source_dijkstra(G, a, b, weight="weight")
+        return ruta, costo
+
+    metodos = {"jerarquia": H.consulta, "nx_dos_llamadas": networkx_dos_llamadas,
+               "nx_dijkstra": networkx_una_llamada}
+    costos = {}
+    for nombre, funcion in metodos.items():
+        tiempos, resultados = _latencias(funcion, pares)
+        costos[nombre] = [costo for _, costo in resultados]
+        fila[f"{nombre}_media_ms"] = sum(tiempos) / len(tiempos)
+        fila[f"{nombre}_p50_ms"] = _percentil(tiempos, 50)
+        fila[f"{nombre}_p99_ms"] = _percentil(tiempos, 99)
+
+    fila["coinciden"] = all(math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+                            for a, b in zip(costos["jerarquia"], costos["nx_dijkstra"]))
+    return fila
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10000, 40000])
+    parser.add_argument("--consultas", type=int, default=500)
+    parser.add_argument("--peso", choices=("tiempo", "distancia"), default="tiempo")
+    parser.add_argument("--semilla", type=int, default=0)
+    opciones = parser.parse_args()
+
+    for tamano in opciones.tamanos:
+        fila = medir(tamano, opciones.consultas, opciones.peso, opciones.semilla)
+        print(f"\nGrilla de {fila['nodos']} nodos y {fila['aristas']} aristas ({opciones.peso})")
+        print(f"  Construcción: {fila['construccion_s']:.1f} s, {fila['atajos']} atajos, "
+              f"{fila['archivo_mb']:.1f} MB en disco (guardar {fila['guardar_s']:.2f} s, "
+              f"cargar {fila['cargar_s']:.2f} s)")
+        for nombre in ("jerarquia", "nx_dos_llamadas", "nx_dijkstra"):
+            print(f"  {nombre:16} media {fila[nombre + '_media_ms']:8.3f} ms   "
+                  f"p50 {fila[nombre + '_p50_ms']:8.3f} ms   p99 {fila[nombre + '_p99_ms']:8.3f} ms")
+        print(f"  Costos iguales a Dijkstra: {'sí' if fila['coinciden'] else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
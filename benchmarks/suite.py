@@ -0,0 +1,271 @@
+"""
+Mide los solucionadores de rutas y circuitos sobre mapas sintéticos.
+
+Uso (desde la raíz del repositorio)::
+
+    python benchmarks/suite.py --tamanos 8 12 100 --salida reporte.json
+    python benchmarks/suite.py --tamanos 8 12 100 --comparar reporte.json
+
+Para cada familia de ``rutas.generadores`` (anillo, grilla, geométrico
+aleatorio y completo) y cada tamaño se corren los motores de ``MOTORES``
+y se anotan el tiempo (mediana de ``--repeticiones``), la memoria pico
+(``tracemalloc``, en una corrida aparte para no falsear el tiempo), los
+contadores y fases que informa cada solucionador en ``estadisticas`` y la
+brecha contra la mejor solución conocida:
+
+- circuitos: contra el óptimo si algún motor exacto alcanzó a correr en
+  ese tamaño, si no contra el mejor circuito encontrado. Los motores exactos
+  trabajan sobre el cierre métrico (``grafo_cierre``), así que todos
+  resuelven el mismo problema: visitar cada nodo y volver, repitiendo
+  nodos si hace falta. El cierre se calcula antes de medir y queda en la
+  caché de siempre (``RUTAS_CACHE``), como en el servicio.
+- caminos: contra ``nx.single_source_dijkstra`` (debe ser 0).
+
+``circuito_tsp`` y ``ruta_mas_optima_tsp`` de los scripts son ``held_karp``
+y ``ruta_mas_rapida`` es ``a_estrella``. Para medir un motor nuevo basta con
+agregarlo a ``MOTORES``.
+
+``--salida`` escribe un JSON con el entorno (commit, versiones) y una fila
+por medición; ``--comparar`` lee uno anterior e informa (y sale con código
+1) si algún motor se volvió más lento que ``--tolerancia`` o empeoró su
+brecha, para detectar regresiones entre commits.
+"""
+
+import argparse  # Opciones de la línea de comandos
+import json  # Reportes
+import os  # Rutas de archivos
+import platform  # Datos del entorno en el reporte
+import random  # Pares de consulta reproducibles
+import statistics  # Mediana de las repeticiones
+import subprocess  # Commit actual para el reporte
+import sys  # Para importar rutas desde la raíz del repositorio
+import time  # Medición de tiempos
+import tracemalloc  # Memoria pico
+
+import networkx as nx  # Caminos de referencia
+import numpy as np  # Versión para el reporte
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rutas  # noqa: E402
+from rutas import generadores  # noqa: E402
+from rutas.instrumentacion import fase  # noqa: E402
+
+FAMILIAS = {
+    "anillo": lambda n, semilla: generadores.anillo(n, cuerdas=n // 4, semilla=semilla),
+    "grilla": lambda n, semilla: generadores.grilla(max(2, round(n ** 0.5)), max(2, -(-n // max(2, round(n ** 0.5)))),
+                                                    semilla=semilla),
+    "geometrico": lambda n, semilla: generadores.geometrico_aleatorio(n, semilla=semilla),
+    "completo": lambda n, semilla: generadores.completo(n, semilla=semilla),
+}
+
+
+def _circuito(funcion):
+    """Motor de circuitos: ``funcion(instancia, estadisticas)`` devuelve ``(ruta, peso)``."""
+    return {"tipo": "circuito", "correr": funcion}
+
+
+def _camino(funcion):
+    """Motor de caminos: ``funcion(instancia, estadisticas)`` devuelve el costo de cada par."""
+    return {"tipo": "camino", "correr": funcion}
+
+
+def _consultas_a_estrella(instancia, estadisticas):
+    costos = []
+    for a, b in instancia["pares"]:
+        por_consulta = {} if estadisticas is not None else None
+        costos.append(rutas.ruta_mas_rapida(instancia["G"], a, b, estadisticas=por_consulta)[1])
+        if por_consulta is not None:
+            estadisticas["asentados"] = estadisticas.get("asentados", 0) + por_consulta["asentados"]
+    return costos
+
+
+def _consultas_jerarquia(instancia, estadisticas):
+    with fase(estadisticas, "construccion"):
+        H = rutas.construir_jerarquia(instancia["G"], estadisticas=estadisticas)
+    with fase(estadisticas, "consultas"):
+        return [H.costo(a, b) for a, b in instancia["pares"]]
+
+
+def _consultas_distancias(instancia, estadisticas):
+    costos = []
+    for a, b in instancia["pares"]:
+        costos.append(rutas.distancias_desde(instancia["G"], a).get(b, float("inf")))
+    return costos
+
+
+# Cada motor: tipo, función, cuántos nodos aguanta como mucho (None = sin límite) y, si
+# aplica, cuántas aristas por nodo como mucho (las jerarquías no sirven en grafos densos)
+MOTORES = {
+    "held_karp": dict(_circuito(lambda i, e: rutas.held_karp(i["H"], i["inicio"], estadisticas=e)),
+                      exacto=True, maximo=16),
+    "fuerza_bruta": dict(_circuito(lambda i, e: rutas.fuerza_bruta(i["H"], i["inicio"], estadisticas=e)),
+                         exacto=True, maximo=9),
+    "ramificacion_y_poda": dict(_circuito(lambda i, e: rutas.ramificacion_y_poda(i["H"], i["inicio"],
+                                                                                  estadisticas=e)),
+                                exacto=True, maximo=12),
+    "tsp_aproximado": dict(_circuito(lambda i, e: _con_peso(i, rutas.tsp_aproximado(i["G"], i["inicio"],
+                                                                                     estadisticas=e))),
+                           maximo=2000),
+    "circuito_con_plazo": dict(_circuito(lambda i, e: rutas.circuito_con_plazo(i["G"], i["inicio"], 1000,
+                                                                               estadisticas=e)),
+                               maximo=2000),
+    "circuito_recocido": dict(_circuito(lambda i, e: rutas.circuito_recocido(i["G"], i["inicio"], 1.0,
+                                                                             estadisticas=e)),
+                              maximo=2000),
+    "ruta_mas_rapida": dict(_camino(_consultas_a_estrella), maximo=None),
+    "jerarquia": dict(_camino(_consultas_jerarquia), maximo=20000, densidad=8),
+    "distancias_desde": dict(_camino(_consultas_distancias), maximo=None),
+}
+
+
+def _con_peso(instancia, ruta):
+    """Agrega el peso real (sumando cada tramo) a una ruta que solo trae los nodos."""
+    G = instancia["G"]
+    return ruta, sum(G[u][v]["weight"] for u, v in zip(ruta, ruta[1:]))
+
+
+def _instancia(familia, tamano, peso, consultas, semilla):
+    datos, posiciones = FAMILIAS[familia](tamano, semilla)
+    G_tiempo, G_distancia = rutas.cargar_grafo(datos, posiciones=posiciones)
+    G = G_tiempo if peso == "tiempo" else G_distancia
+    nodos = list(G)
+    azar = random.Random(semilla)
+    pares = [tuple(azar.sample(nodos, 2)) for _ in range(consultas)] if len(nodos) > 1 else []
+    instancia = {"G": G, "inicio": nodos[0], "pares": pares}
+    if len(nodos) <= 2000:  # El cierre (n²) solo hace falta para los circuitos
+        instancia["H"] = rutas.grafo_cierre(G)  # Queda en la caché antes de medir
+    return instancia
+
+
+def _medir(motor, instancia, repeticiones, memoria):
+    """Corre el motor y devuelve (resultado, segundos, memoria pico en MB, estadísticas)."""
+    tiempos = []
+    for _ in range(repeticiones):
+        estadisticas = {}
+        inicio = time.perf_counter()
+        resultado = motor["correr"](instancia, estadisticas)
+        tiempos.append(time.perf_counter() - inicio)
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        motor["correr"](instancia, None)
+        pico = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return resultado, statistics.median(tiempos), pico, estadisticas
+
+
+def _referencias_caminos(instancia):
+    G = instancia["G"]
+    return [nx.single_source_dijkstra(G, a, b, weight="weight")[0] for a, b in instancia["pares"]]
+
+
+def medir(familia, tamano, motores, opciones):
+    """Filas del reporte de una familia y un tamaño."""
+    instancia = _instancia(familia, tamano, opciones.peso, opciones.consultas, opciones.semilla)
+    G = instancia["G"]
+    filas = []
+    for nombre in motores:
+        motor = MOTORES[nombre]
+        if motor["maximo"] is not None and G.number_of_nodes() > motor["maximo"]:
+            continue
+        if motor["tipo"] == "circuito" and "H" not in instancia:
+            continue
+        if G.number_of_edges() > motor.get("densidad", float("inf")) * G.number_of_nodes():
+            continue
+        resultado, segundos, pico, estadisticas = _medir(motor, instancia, opciones.repeticiones,
+                                                         opciones.memoria)
+        fila = {"familia": familia, "nodos": G.number_of_nodes(), "aristas": G.number_of_edges(),
+                "motor": nombre, "tipo": motor["tipo"], "segundos": segundos, "memoria_mb": pico,
+                "fases": estadisticas.pop("fases", {}),
+                "contadores": {k: v for k, v in estadisticas.items() if isinstance(v, (int, float, np.number))}}
+        if motor["tipo"] == "circuito":
+            fila["peso"] = float(resultado[1])
+        else:
+            referencias = _referencias_caminos(instancia)
+            fila["peso"] = float(sum(resultado))
+            fila["brecha"] = max((abs(c - r) / r if r else abs(c - r) for c, r in zip(resultado, referencias)),
+                                 default=0.0)
+            fila["referencia"] = "dijkstra"
+        filas.append(fila)
+
+    circuitos = [f for f in filas if f["tipo"] == "circuito"]
+    exactos = [f["peso"] for f in circuitos if MOTORES[f["motor"]].get("exacto")]
+    if circuitos:
+        mejor = min(exactos) if exactos else min(f["peso"] for f in circuitos)
+        for f in circuitos:
+            f["referencia"] = "optimo" if exactos else "mejor_encontrado"
+            f["brecha"] = f["peso"] / mejor - 1 if mejor > 0 else 0.0
+    return filas
+
+
+def _entorno():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "numpy": np.__version__, "networkx": nx.__version__, "plataforma": platform.platform()}
+
+
+def comparar(filas, archivo, tolerancia, piso=1e-3):
+    """
+    Diferencias con un reporte anterior: motores más lentos que
+    ``1 + tolerancia`` veces (si tardaban más de ``piso`` segundos) o con más
+    brecha. Devuelve la lista de regresiones como texto.
+    """
+    with open(archivo, encoding="utf-8") as f:
+        anteriores = {(r["familia"], r["nodos"], r["motor"]): r for r in json.load(f)["resultados"]}
+    regresiones = []
+    for fila in filas:
+        antes = anteriores.get((fila["familia"], fila["nodos"], fila["motor"]))
+        if antes is None:
+            continue
+        clave = f"{fila['motor']} en {fila['familia']} de {fila['nodos']} nodos"
+        if antes["segundos"] > piso and fila["segundos"] > antes["segundos"] * (1 + tolerancia):
+            regresiones.append(f"{clave}: {antes['segundos']:.4f} s -> {fila['segundos']:.4f} s")
+        if fila.get("brecha", 0.0) > antes.get("brecha", 0.0) + 1e-9:
+            regresiones.append(f"{clave}: brecha {antes.get('brecha', 0.0):.4f} -> {fila['brecha']:.4f}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--familias", nargs="+", choices=list(FAMILIAS), default=list(FAMILIAS))
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[8, 12, 100])
+    parser.add_argument("--motores", nargs="+", choices=list(MOTORES), default=list(MOTORES))
+    parser.add_argument("--peso", choices=("tiempo", "distancia"), default="tiempo")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--consultas", type=int, default=50)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--sin-memoria", dest="memoria", action="store_false",
+                        help="no medir la memoria pico (ahorra una corrida por motor)")
+    parser.add_argument("--salida", help="archivo JSON donde escribir el reporte")
+    parser.add_argument("--comparar", help="reporte anterior contra el cual buscar regresiones")
+    parser.add_argument("--tolerancia", type=float, default=0.25)
+    opciones = parser.parse_args()
+
+    filas = []
+    for familia in opciones.familias:
+        for tamano in opciones.tamanos:
+            for fila in medir(familia, tamano, opciones.motores, opciones):
+                filas.append(fila)
+                memoria = "" if fila["memoria_mb"] is None else f"{fila['memoria_mb']:8.2f} MB"
+                print(f"{fila['familia']:11} {fila['nodos']:6} {fila['motor']:20} "
+                      f"{fila['segundos'] * 1000:10.2f} ms {memoria}  brecha {fila['brecha']:.4f}")
+
+    if opciones.salida:
+        reporte = {"entorno": _entorno(), "parametros": vars(opciones), "resultados": filas}
+        with open(opciones.salida, "w", encoding="utf-8") as f:
+            json.dump(reporte, f, ensure_ascii=False, indent=1, default=float)
+    if opciones.comparar:
+        regresiones = comparar(filas, opciones.comparar, opciones.tolerancia)
+        for linea in regresiones:
+            print("Regresión:", linea)
+        if regresiones:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Comprueba los motores de rutas contra métodos de referencia sobre mapas
+pequeños al azar.
+
+Uso (desde la raíz del repositorio)::
+
+    python benchmarks/verificacion.py --casos 40 --semilla 0
+
+Cada caso es un mapa aleatorio (disperso o denso, dirigido o no, con pesos
+enteros para que los empates sean exactos y coordenadas al azar) o uno de
+las familias de ``rutas.generadores``. Se comprueba:
+
+- jerarquías de contracción: ``costo``, ``consulta`` (que la ruta exista en
+  el grafo y sume el costo) y ``matriz``, también tras guardarla y leerla,
+  contra ``nx.single_source_dijkstra`` para todos los pares.
+- caminos: ``a_estrella``, ``ruta_mas_rapida``, ``distancias_desde``, el
+  cierre métrico (``grafo_cierre`` y ``expandir_ruta``) y ``ArbolCaminos``
+  (al construirlo y tras cambiar pesos al azar), contra Dijkstra.
+- circuitos, en mapas de hasta ``MAXIMO_CIRCUITOS`` nodos: ``held_karp``,
+  ``ramificacion_y_poda`` y ``fuerza_bruta_paralela`` contra ``fuerza_bruta``
+  (mismo peso, o ningún circuito en ambos) y el frente de
+  ``circuito_pareto`` contra el que sale de recorrer todas las permutaciones.
+- paradas agregadas: tras ``agregar_parada`` (el grafo ya no trae su forma
+  compilada), ``tsp_aproximado``, ``circuito_con_plazo`` y
+  ``circuito_recocido`` deben devolver un recorrido real que visite todo y
+  pese lo que dicen (o ``(None, inf)``, nunca una ruta de peso infinito), y
+  en mapas conexos encontrarlo sin pesar menos que el óptimo del cierre.
+
+Sale con código 1 y lista los fallos si algún resultado no coincide.
+"""
+
+import argparse  # Opciones de la línea de comandos
+import math  # Comparación de costos
+from itertools import permutations  # Frente de Pareto de referencia
+import os  # Rutas de archivos
+import random  # Mapas reproducibles
+import sys  # Para importar rutas desde la raíz del repositorio
+import tempfile  # Directorio para la jerarquía guardada
+
+import networkx as nx  # Métodos de referencia
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rutas  # noqa: E402
+from rutas import generadores  # noqa: E402
+
+MAXIMO_CIRCUITOS = 9  # Nodos máximos para comparar circuitos con la fuerza bruta
+
+
+def _iguales(a, b):
+    return a == b or math.isclose(a, b, rel_tol=1e-6, abs_tol=1e-6)
+
+
+def _peso_camino(G, ruta):
+    """Peso de ``ruta`` en ``G``; ``None`` si usa algún tramo que no existe."""
+    if any(not G.has_edge(u, v) for u, v in zip(ruta, ruta[1:])):
+        return None
+    return sum(G[u][v]["weight"] for u, v in zip(ruta, ruta[1:]))
+
+
+def mapa_aleatorio(azar, n, densidad, dirigido):
+    """
+    Datos con el formato de ``json_data``: ``n`` nodos y tramos enteros al
+    azar, y posiciones al azar (A* ajusta su heurística a los pesos).
+    """
+    datos = {f"n{i}": {} for i in range(n)}
+    for i in range(n):
+        for j in range(n):
+            if i != j and azar.random() < densidad:
+                datos[f"n{i}"][f"n{j}"] = {"tiempo": azar.randint(1, 20), "distancia": azar.randint(1, 20)}
+    posiciones = {nodo: (4 + azar.random(), -74 + azar.random()) for nodo in datos}
+    return datos, posiciones
+
+
+def casos(cantidad, semilla):
+    """Genera ``(nombre, datos, dirigido, posiciones)`` para cada caso."""
+    azar = random.Random(semilla)
+    familias = {
+        "anillo": lambda s: generadores.anillo(azar.randint(4, 12), cuerdas=3, semilla=s),
+        "grilla": lambda s: generadores.grilla(azar.randint(2, 4), azar.randint(2, 4), semilla=s),
+        "geometrico": lambda s: generadores.geometrico_aleatorio(azar.randint(4, 12), semilla=s),
+        "completo": lambda s: generadores.completo(azar.randint(3, 8), semilla=s),
+    }
+    for k in range(cantidad):
+        if k % 2 == 0:
+            dirigido = azar.random() < 0.5
+            densidad = azar.choice((0.2, 0.4, 0.8))
+            datos, posiciones = mapa_aleatorio(azar, azar.randint(2, 9), densidad, dirigido)
+            nombre = f"aleatorio {k} ({'dirigido' if dirigido else 'no dirigido'}, densidad {densidad})"
+        else:
+            familia = list(familias)[k // 2 % len(familias)]
+            (datos, posiciones), dirigido = familias[familia](k), False
+            nombre = f"{familia} {k}"
+        yield nombre, datos, dirigido, posiciones
+
+
+def _referencia(G):
+    """Costos de Dijkstra de cada nodo a cada nodo alcanzable."""
+    return {u: nx.single_source_dijkstra_path_length(G, u, weight="weight") for u in G}
+
+
+def verificar_jerarquias(nombre, G, referencia, directorio):
+    """Fallos de la jerarquía de contracción de ``G`` (recién construida y leída de disco)."""
+    fallos = []
+    H = rutas.construir_jerarquia(G)
+    archivo = os.path.join(directorio, "jerarquia.npz")
+    H.guardar(archivo)
+    nodos = list(G)
+    for etiqueta, jerarquia in (("construida", H), ("leída", rutas.JerarquiaContraccion.cargar(archivo))):
+        matriz = jerarquia.matriz(nodos, nodos)
+        for i, a in enumerate(nodos):
+            for j, b in enumerate(nodos):
+                esperado = referencia[a].get(b, math.inf)
+                if not _iguales(float(matriz[i, j]), esperado):
+                    fallos.append(f"{nombre}: matriz {etiqueta} {a}->{b} = {matriz[i, j]}, Dijkstra {esperado}")
+                if a == b:
+                    continue
+                try:
+                    ruta, costo = jerarquia.consulta(a, b)
+                except nx.NetworkXNoPath:
+                    if b in referencia[a]:
+                        fallos.append(f"{nombre}: jerarquía {etiqueta} sin camino {a}->{b}, Dijkstra {esperado}")
+                    continue
+                if not _iguales(costo, esperado) or not _iguales(jerarquia.costo(a, b), esperado):
+                    fallos.append(f"{nombre}: jerarquía {etiqueta} {a}->{b} = {costo}, Dijkstra {esperado}")
+                peso = _peso_camino(G, ruta)
+                if ruta[0] != a or ruta[-1] != b or peso is None or not _iguales(peso, costo):
+                    fallos.append(f"{nombre}: ruta de la jerarquía {etiqueta} {a}->{b} inválida: {ruta}")
+    return fallos
+
+
+def verificar_caminos(nombre, G, referencia):
+    """Fallos de los motores de caminos y del cierre métrico de ``G``."""
+    fallos = []
+    H = rutas.grafo_cierre(G)
+    motores = {"a_estrella": rutas.a_estrella, "ruta_mas_rapida": rutas.ruta_mas_rapida}
+    for a in G:
+        distancias = rutas.distancias_desde(G, a)
+        if distancias.keys() != referencia[a].keys() or not all(
+                _iguales(distancias[b], referencia[a][b]) for b in distancias):
+            fallos.append(f"{nombre}: distancias_desde({a}) no coincide con Dijkstra")
+        for b in G:
+            if a == b:
+                continue
+            esperado = referencia[a].get(b, math.inf)
+            for motor, funcion in motores.items():
+                try:
+                    ruta, costo = funcion(G, a, b)
+                except nx.NetworkXNoPath:
+                    ruta, costo = None, math.inf
+                valida = ruta is None or (_peso_camino(G, ruta) is not None and _iguales(_peso_camino(G, ruta), costo))
+                if not _iguales(costo, esperado) or not valida:
+                    fallos.append(f"{nombre}: {motor} {a}->{b} = {costo} por {ruta}, Dijkstra {esperado}")
+            cierre = H[a][b]["weight"] if H.has_edge(a, b) else math.inf
+            if not _iguales(cierre, esperado):
+                fallos.append(f"{nombre}: cierre métrico {a}->{b} = {cierre}, Dijkstra {esperado}")
+            elif math.isfinite(esperado):
+                ruta = rutas.expandir_ruta(H, [a, b])
+                peso = _peso_camino(G, ruta)
+                if ruta[0] != a or ruta[-1] != b or peso is None or not _iguales(peso, esperado):
+                    fallos.append(f"{nombre}: expandir_ruta {a}->{b} inválida: {ruta}")
+    return fallos
+
+
+def verificar_arbol(nombre, G, azar):
+    """Fallos de ``ArbolCaminos`` al construirlo y tras cambiar pesos al azar (modifica ``G``)."""
+    fallos = []
+    raiz = next(iter(G))
+    arbol = rutas.ArbolCaminos(G, raiz)
+    aristas = list(G.edges())
+    for ronda in range(4):
+        referencia = {v: d for v, d in nx.single_source_dijkstra_path_length(G, raiz, weight="weight").items()
+                      if math.isfinite(d)}  # Con vías cerradas (inf) NetworkX las cuenta como alcanzables
+        if arbol.distancias.keys() != referencia.keys() or not all(
+                _iguales(arbol.distancias[v], referencia[v]) for v in referencia):
+            fallos.append(f"{nombre}: ArbolCaminos (ronda {ronda}) no coincide con Dijkstra")
+        for v in referencia:
+            peso = _peso_camino(G, arbol.ruta(v))
+            if peso is None or not _iguales(peso, referencia[v]):
+                fallos.append(f"{nombre}: ArbolCaminos.ruta({v}) (ronda {ronda}) inválida")
+        if not aristas:
+            break
+        tramos = azar.sample(aristas, min(3, len(aristas)))
+        arbol.actualizar([(u, v, azar.choice((1, 5, 20, 40, math.inf))) for u, v in tramos])
+    return fallos
+
+
+def _frente_referencia(G_tiempo, G_distancia, inicio):
+    """Puntos (tiempo, distancia) no dominados de todos los circuitos, recorriendo cada permutación."""
+    otros = [nodo for nodo in G_tiempo if nodo != inicio]
+    puntos = set()
+    for orden in permutations(otros):
+        ruta = [inicio, *orden, inicio]
+        tiempo, distancia = _peso_camino(G_tiempo, ruta), _peso_camino(G_distancia, ruta)
+        if tiempo is not None and distancia is not None:
+            puntos.add((tiempo, distancia))
+    return sorted(p for p in puntos if not any(q[0] <= p[0] and q[1] <= p[1] and q != p for q in puntos))
+
+
+def _circuito_valido(G, ruta, peso, inicio):
+    return (ruta[0] == ruta[-1] == inicio and sorted(map(str, ruta[:-1])) == sorted(map(str, G))
+            and _peso_camino(G, ruta) is not None and _iguales(_peso_camino(G, ruta), peso))
+
+
+def verificar_circuitos(nombre, G_tiempo, G_distancia):
+    """Fallos de los solucionadores exactos de circuitos y del frente de Pareto contra la fuerza bruta."""
+    fallos = []
+    inicio = next(iter(G_tiempo))
+    for G in (G_tiempo, G_distancia):
+        _, esperado = rutas.fuerza_bruta(G, inicio)
+        motores = {"held_karp": rutas.held_karp, "ramificacion_y_poda": rutas.ramificacion_y_poda}
+        if G is G_tiempo:  # Un solo peso: cada llamada arranca procesos
+            motores["fuerza_bruta_paralela"] = lambda G, inicio: rutas.fuerza_bruta_paralela(G, inicio, procesos=2)
+        for motor, funcion in motores.items():
+            ruta, peso = funcion(G, inicio)
+            if ruta is None:
+                if math.isfinite(esperado):
+                    fallos.append(f"{nombre} [{G.graph['peso']}]: {motor} sin circuito, fuerza bruta {esperado}")
+            elif not _iguales(peso, esperado) or not _circuito_valido(G, ruta, peso, inicio):
+                fallos.append(f"{nombre} [{G.graph['peso']}]: {motor} = {peso} por {ruta}, fuerza bruta {esperado}")
+
+    (_, tiempo), (_, distancia), frente = rutas.circuito_pareto(G_tiempo, G_distancia, inicio)
+    esperado = _frente_referencia(G_tiempo, G_distancia, inicio)
+    obtenido = [(t, d) for _, t, d in frente]
+    if obtenido != esperado:
+        fallos.append(f"{nombre}: frente de Pareto {obtenido}, fuerza bruta {esperado}")
+    if any(not _circuito_valido(G_tiempo, ruta, t, inicio) or not _circuito_valido(G_distancia, ruta, d, inicio)
+           for ruta, t, d in frente):
+        fallos.append(f"{nombre}: el frente de Pareto tiene rutas inválidas")
+    if esperado and (tiempo, distancia) != (esperado[0][0], esperado[-1][1]):
+        fallos.append(f"{nombre}: circuito_pareto da {tiempo} / {distancia}, fuerza bruta {esperado[0][0]} / "
+                      f"{esperado[-1][1]}")
+    return fallos
+
+
+def _recorrido_valido(G, ruta, peso, inicio):
+    """Recorrido cerrado por tramos reales (se puede repetir nodos) que visita todos los nodos y pesa ``peso``."""
+    return (ruta[0] == ruta[-1] == inicio and set(ruta) == set(G)
+            and _peso_camino(G, ruta) is not None and _iguales(_peso_camino(G, ruta), peso))
+
+
+def verificar_paradas(nombre, G, azar):
+    """Fallos de los solucionadores sobre el cierre tras ``agregar_parada`` (modifica ``G``)."""
+    fallos = []
+    nodos = list(G)
+    inicio = nodos[0]
+    tramos = {v: azar.randint(1, 20) for v in azar.sample(nodos, min(2, len(nodos)))}
+    entrantes = {v: azar.randint(1, 20) for v in azar.sample(nodos, min(2, len(nodos)))} if G.is_directed() else None
+    rutas.agregar_parada(G, "nueva", tramos, entrantes)
+    conexo = nx.is_strongly_connected(G) if G.is_directed() else nx.is_connected(G)
+    optimo = None
+    if conexo and G.number_of_nodes() <= MAXIMO_CIRCUITOS:
+        _, optimo = rutas.held_karp(rutas.grafo_cierre(G), inicio)
+
+    motores = {
+        "circuito_con_plazo": lambda: rutas.circuito_con_plazo(G, inicio, 50),
+        "circuito_recocido": lambda: rutas.circuito_recocido(G, inicio, 0.05),
+    }
+    if conexo:  # Sin conexión tsp_aproximado usa la heurística de NetworkX, que repite nodos a su manera
+        motores["tsp_aproximado"] = lambda: (lambda r: (r, _peso_camino(G, r) or math.inf))(
+            rutas.tsp_aproximado(G, inicio))
+    for motor, funcion in motores.items():
+        ruta, peso = funcion()
+        if ruta is None:
+            if conexo or math.isfinite(peso):
+                fallos.append(f"{nombre}: {motor} tras agregar_parada da {peso} sin ruta")
+        elif not _recorrido_valido(G, ruta, peso, inicio):
+            fallos.append(f"{nombre}: {motor} tras agregar_parada da {peso} por {ruta}, que no es válida")
+        elif optimo is not None and peso < optimo - 1e-6:
+            fallos.append(f"{nombre}: {motor} tras agregar_parada pesa {peso}, menos que el óptimo {optimo}")
+    return fallos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--casos", type=int, default=40)
+    parser.add_argument("--semilla", type=int, default=0)
+    opciones = parser.parse_args()
+
+    fallos = []
+    total = 0
+    azar = random.Random(opciones.semilla)
+    with tempfile.TemporaryDirectory() as directorio:
+        for nombre, datos, dirigido, posiciones in casos(opciones.casos, opciones.semilla):
+            G_tiempo, G_distancia = rutas.cargar_grafo(datos, dirigido=dirigido, posiciones=posiciones)
+            if G_tiempo.number_of_nodes() < 2:  # Sorteo sin tramos: no hay nada que comparar
+                continue
+            for G in (G_tiempo, G_distancia):
+                etiqueta = f"{nombre} [{G.graph['peso']}]"
+                referencia = _referencia(G)
+                fallos.extend(verificar_jerarquias(etiqueta, G, referencia, directorio))
+                fallos.extend(verificar_caminos(etiqueta, G, referencia))
+            if G_tiempo.number_of_nodes() <= MAXIMO_CIRCUITOS:
+                fallos.extend(verificar_circuitos(nombre, G_tiempo, G_distancia))
+            # ArbolCaminos cambia pesos: trabaja sobre grafos propios
+            fallos.extend(verificar_arbol(nombre, rutas.cargar_grafo(datos, dirigido=dirigido)[0], azar))
+            fallos.extend(verificar_paradas(nombre, rutas.cargar_grafo(datos, dirigido=dirigido)[0], azar))
+            total += 1
+
+    for fallo in fallos:
+        print(f"  FALLO {fallo}")
+    print(f"{total} casos, {len(fallos)} fallos")
+    sys.exit(1 if fallos else 0)
+
+
+if __name__ == "__main__":
+    main()
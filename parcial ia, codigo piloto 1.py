@@ -1,11 +1,12 @@
 """
 Este programa busca la ruta más óptima para visitar una serie de destinos,
-usando el algoritmo del viajante (TSP - Traveling Salesman Problem) con fuerza bruta.
+usando el algoritmo del viajante (TSP - Traveling Salesman Problem) de forma exacta.
 También grafica la ruta en un mapa de nodos y conexiones. Cabe aclarar que este fue 
 un código de prueba para entender como funcionaban las variables y no utiliza datos reales.  
 
 ¿Por qué se eligió este enfoque?
-- Se usa fuerza bruta porque la cantidad de destinos es pequeña.
+- Se usa programación dinámica (Held-Karp) en lugar de fuerza bruta para que el
+  cálculo siga siendo exacto pero escale a más de 20 destinos.
 - Se utiliza NetworkX para manejar grafos y matplotlib para visualización.
 - Se implementa una estructura de datos clara con nodos y conexiones.
 
@@ -18,9 +19,10 @@ Variables principales:
 - mejor_distancia: Guarda la menor distancia calculada.
 """
 
+import os  # Para leer la carpeta de gráficas sin pantalla
 import networkx as nx  # Librería para trabajar con grafos
-import matplotlib.pyplot as plt  # Para graficar el grafo
-from itertools import permutations  # Para generar todas las permutaciones posibles de rutas
+from rutas import RenderizadorRutas  # Gráficas sin pantalla (PNG/SVG)
+from rutas import held_karp  # Solucionador exacto del TSP por programación dinámica
 
 def crear_grafo():
     """
@@ -60,38 +62,26 @@ def crear_grafo():
 def ruta_mas_optima_tsp(G, inicio):
     """
     Encuentra la ruta más corta que visita todos los nodos y regresa al punto de inicio.
-    Se basa en una búsqueda de fuerza bruta usando permutaciones.
+    Antes se probaban todas las permutaciones (O(n!)); ahora se usa programación
+    dinámica de Held-Karp (O(n² · 2ⁿ)), que da la misma ruta óptima mucho más rápido.
     """
-    nodos = list(G.nodes())  # Obtener todos los nodos del grafo
-    nodos.remove(inicio)  # Excluir el nodo de inicio para generar rutas
-    mejor_ruta = None  # Variable para almacenar la mejor ruta
-    mejor_distancia = float('inf')  # Variable para almacenar la menor distancia encontrada
-    
-    # Generar todas las posibles rutas (permutaciones de los nodos)
-    for perm in permutations(nodos):
-        ruta = [inicio] + list(perm) + [inicio]  # Ruta que comienza y termina en 'inicio'
-        distancia = 0  # Distancia acumulada en la ruta
-        ruta_valida = True  # Bandera para verificar si la ruta es válida
-        
-        # Calcular la distancia total de la ruta
-        for i in range(len(ruta) - 1):
-            if G.has_edge(ruta[i], ruta[i+1]):  # Verificar si hay conexión entre nodos
-                distancia += G[ruta[i]][ruta[i+1]]['weight']
-            else:
-                ruta_valida = False  # Si no hay conexión, descartar esta ruta
-                break  # Salir del bucle
-        
-        # Si la ruta es válida y su distancia es menor que la mejor registrada, actualizar
-        if ruta_valida and distancia < mejor_distancia:
-            mejor_distancia = distancia
-            mejor_ruta = ruta
-    
-    return mejor_ruta, mejor_distancia if mejor_ruta else ([], float('inf'))
+    mejor_ruta, mejor_distancia = held_karp(G, inicio)  # Ruta óptima y su distancia
+    return mejor_ruta, mejor_distancia
 
-def graficar_grafo(G, ruta_tsp=None):
+def graficar_grafo(G, ruta_tsp=None, archivo=None):
     """
     Dibuja el grafo con los destinos y sus conexiones, resaltando la ruta óptima si está disponible.
+    Si se indica un archivo, la imagen se guarda sin abrir ninguna ventana.
     """
+    if archivo:
+        with RenderizadorRutas(G, node_color='lightblue', node_size=2000, etiquetas_pesos=True) as renderizador:
+            imagen = renderizador.renderizar(ruta_tsp, "Mapa de Rutas", "red", numerar=False,
+                                             formato=os.path.splitext(archivo)[1].lstrip(".") or "png")
+        with open(archivo, "wb") as f:
+            f.write(imagen)
+        return
+
+    import matplotlib.pyplot as plt  # Solo se importa si se va a mostrar en pantalla
     pos = nx.spring_layout(G, seed=42)  # Generar una disposición de nodos
     plt.figure(figsize=(10, 7))  # Tamaño de la figura
     
@@ -120,8 +110,9 @@ tsp_ruta, tsp_distancia = ruta_mas_optima_tsp(G, inicio)
 # Imprimir la mejor ruta encontrada y su distancia total
 print(f"Ruta más óptima visitando todos los destinos (TSP): {tsp_ruta}, distancia total: {tsp_distancia} horas")
 
-# Graficar el grafo con la ruta óptima
-graficar_grafo(G, tsp_ruta)
+# Graficar el grafo con la ruta óptima (si se define RUTAS_GRAFICOS, se guarda como PNG en esa carpeta)
+carpeta = os.environ.get("RUTAS_GRAFICOS")
+graficar_grafo(G, tsp_ruta, archivo=carpeta and os.path.join(carpeta, "mapa_de_rutas.png"))
 
 
 
@@ -1,6 +1,6 @@
 import json  # Importamos la librería para manejar datos en formato JSON
-import networkx as nx  # Importamos NetworkX para manejar grafos
-from itertools import permutations  # Importamos permutations para probar todas las rutas en TSP
+import os  # Variables de entorno de la caché
+from rutas import POSICIONES, CacheResultados, a_estrella, cargar_grafo, circuito_pareto, held_karp, held_karp_dependiente  # Carga, A*, TSP exacto, frente y caché
 # ------------------------------
 # Explicación del código:
 # ------------------------------
@@ -10,59 +10,27 @@ from itertools import permutations  # Importamos permutations para probar todas
 # Se usa un grafo bidireccional con NetworkX para representar los destinos y sus conexiones.
 # Se aplican algoritmos como Dijkstra y TSP para encontrar rutas eficientes.
 
-# Función para cargar los datos del JSON y crear dos grafos (uno para tiempo y otro para distancia)
-def cargar_grafo(datos):
-    G_tiempo = nx.Graph()  # Grafo donde las aristas representan tiempo de viaje
-    G_distancia = nx.Graph()  # Grafo donde las aristas representan distancia en km
-
-    # Iteramos sobre los datos JSON
-    for origen, destinos in datos.items():
-        for destino, valores in destinos.items():
-            # Agregamos conexiones entre nodos con sus respectivos pesos
-            G_tiempo.add_edge(origen, destino, weight=valores["tiempo"])
-            G_distancia.add_edge(origen, destino, weight=valores["distancia"])
-    
-    return G_tiempo, G_distancia  # Retornamos los dos grafos
-
-# Algoritmo de Dijkstra para encontrar la ruta más rápida (menor tiempo)
+# Algoritmo A* para encontrar la ruta más rápida (menor tiempo)
 def ruta_mas_rapida(G_tiempo, inicio, fin):
-    # Encontramos el camino más corto en términos de tiempo
-    ruta = nx.shortest_path(G_tiempo, source=inicio, target=fin, weight="weight")
-    # Calculamos el tiempo total de la ruta óptima
-    tiempo_total = nx.shortest_path_length(G_tiempo, source=inicio, target=fin, weight="weight")
+    # Una sola búsqueda guiada por la distancia en línea recta (dividida por la velocidad máxima)
+    ruta, tiempo_total = a_estrella(G_tiempo, inicio, fin)
     return ruta, tiempo_total  # Retornamos la ruta y el tiempo total
 
-# Algoritmo de Dijkstra para encontrar la ruta más corta (menor distancia)
+# Algoritmo A* para encontrar la ruta más corta (menor distancia)
 def ruta_mas_optima(G_distancia, inicio, fin):
-    # Encontramos el camino más corto en términos de distancia
-    ruta = nx.shortest_path(G_distancia, source=inicio, target=fin, weight="weight")
-    # Calculamos la distancia total de la ruta óptima
-    distancia_total = nx.shortest_path_length(G_distancia, source=inicio, target=fin, weight="weight")
+    # Una sola búsqueda guiada por la distancia en línea recta hasta el destino
+    ruta, distancia_total = a_estrella(G_distancia, inicio, fin)
     return ruta, distancia_total  # Retornamos la ruta y la distancia total
 
-# Algoritmo de Fuerza Bruta para el Problema del Viajero (TSP)
-def circuito_tsp(G, inicio):
-    nodos = list(G.nodes())  # Obtenemos todos los nodos del grafo
-    nodos.remove(inicio)  # Eliminamos el nodo de inicio de la lista de nodos a recorrer
-    mejor_ruta = None  # Inicializamos la mejor ruta como None
-    mejor_peso = float("inf")  # Inicializamos el mejor peso con infinito
-
-    # Generamos todas las posibles permutaciones de los nodos
-    for perm in permutations(nodos):
-        ruta = [inicio] + list(perm) + [inicio]  # Construimos la ruta cerrada (circuito)
-        
-        try:
-            # Calculamos el peso total de la ruta
-            peso = sum(G[ruta[i]][ruta[i+1]]["weight"] for i in range(len(ruta) - 1))
-        except KeyError:
-            continue  # Si alguna conexión no existe, ignoramos esta ruta
-
-        # Si encontramos una mejor ruta, la actualizamos
-        if peso < mejor_peso:
-            mejor_peso = peso
-            mejor_ruta = ruta
-
-    return mejor_ruta, mejor_peso  # Retornamos la mejor ruta y su peso
+# Algoritmo exacto para el Problema del Viajero (TSP) con programación dinámica (Held-Karp)
+def circuito_tsp(G, inicio, salida=None):
+    # Held-Karp recorre subconjuntos en vez de permutaciones: O(n² · 2ⁿ) en lugar de O(n!)
+    if salida is not None:
+        # Si los tramos traen "perfil", el tiempo de cada uno depende de la hora a la que se llega
+        mejor_ruta, mejor_peso = held_karp_dependiente(G, inicio, salida)
+        return mejor_ruta, mejor_peso
+    mejor_ruta, mejor_peso = held_karp(G, inicio)
+    return mejor_ruta, mejor_peso  # Retornamos la mejor ruta y su peso (None, inf si no hay circuito)
 
 # Datos en formato JSON (Representan un mapa con tiempos y distancias entre destinos)
 json_data = '''
@@ -104,16 +72,27 @@ json_data = '''
 
 # Cargamos los datos JSON y creamos los grafos
 datos = json.loads(json_data)
-G_tiempo, G_distancia = cargar_grafo(datos)
+G_tiempo, G_distancia = cargar_grafo(datos, posiciones=POSICIONES)  # Con coordenadas para A*
 
 inicio = "Universidad Sergio Arboleda"  # Definimos el punto de inicio del recorrido
+hora_salida = 3 * 60  # 3:00 am en minutos desde la medianoche (para los perfiles de tiempo por hora)
 
-# Calculamos la ruta más rápida (menor tiempo) usando TSP
-ruta_rapida, tiempo_total = circuito_tsp(G_tiempo, inicio)
-
-# Calculamos la ruta más óptima (menor distancia) usando TSP
-ruta_optima, distancia_total = circuito_tsp(G_distancia, inicio)
+# Calculamos en una sola pasada la ruta más rápida (menor tiempo), la más óptima
+# (menor distancia) y el frente de Pareto entre ambas. Si ya se calculó para estos
+# mismos datos en una ejecución anterior (con RUTAS_CACHE_RESULTADOS apuntando a una
+# carpeta), se lee de la caché en disco
+cache = CacheResultados(directorio=os.environ.get("RUTAS_CACHE_RESULTADOS"))
+(ruta_rapida, tiempo_total), (ruta_optima, distancia_total), frente = cache.consultar(circuito_pareto, G_tiempo, G_distancia, inicio)
 
 # Mostramos los resultados obtenidos
 print(f"🔴 Ruta más rápida (menor tiempo): {ruta_rapida}, Tiempo total: {tiempo_total} min")
 print(f"🟢 Ruta más óptima (menor distancia): {ruta_optima}, Distancia total: {distancia_total} km")
+
+# Circuito más rápido saliendo a la hora real del recorrido (igual al anterior si los datos no traen perfiles)
+ruta_salida, tiempo_salida = cache.consultar(circuito_tsp, G_tiempo, inicio, hora_salida)
+print(f"🕒 Saliendo a las 3:00 am: {ruta_salida}, Tiempo total: {tiempo_salida} min")
+
+# Mostramos las rutas que equilibran tiempo y distancia (ninguna es peor en ambos)
+print(f"⚖️ Frente de Pareto tiempo/distancia ({len(frente)} rutas):")
+for ruta, tiempo, distancia in frente:
+    print(f"   {tiempo} min, {distancia} km: {ruta}")
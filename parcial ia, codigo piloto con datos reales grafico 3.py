@@ -1,63 +1,22 @@
 import json  # Importamos el módulo json para cargar y manejar datos en formato JSON
 import networkx as nx  # Importamos NetworkX para manejar grafos
-import matplotlib.pyplot as plt  # Importamos Matplotlib para graficar los resultados
+import os  # Variables de entorno de la caché y las gráficas
+from rutas import POSICIONES, CacheResultados, cargar_grafo, circuito_pareto, graficar_ruta_imagen  # Carga, frente de Pareto, caché y gráficas
 
-# Función para cargar datos JSON y construir dos grafos: uno para tiempo y otro para distancia
-def cargar_grafo(datos):
-    G_tiempo = nx.Graph()  # Grafo para el tiempo de viaje entre lugares
-    G_distancia = nx.Graph()  # Grafo para la distancia en kilómetros entre lugares
+# Función para graficar una ruta en un mapa. Si se indica "archivo", la imagen (PNG o SVG)
+# se guarda sin abrir ventanas, reutilizando el dibujo del grafo base entre llamadas
+def graficar_ruta(G, ruta, titulo, color, archivo=None):
+    if archivo:
+        formato = os.path.splitext(archivo)[1].lstrip(".") or "png"
+        with open(archivo, "wb") as f:
+            f.write(graficar_ruta_imagen(G, ruta, titulo, color, formato))
+        return
 
-    # Recorremos los datos del JSON y agregamos las conexiones a los grafos
-    for origen, destinos in datos.items():
-        for destino, valores in destinos.items():
-            G_tiempo.add_edge(origen, destino, weight=valores["tiempo"])  # Usamos el tiempo como peso en G_tiempo
-            G_distancia.add_edge(origen, destino, weight=valores["distancia"])  # Usamos la distancia como peso en G_distancia
-    
-    return G_tiempo, G_distancia  # Retornamos ambos grafos
-
-# Función que implementa el algoritmo del Viajante de Comercio (TSP) usando fuerza bruta
-def circuito_tsp(G, inicio):
-    from itertools import permutations  # Importamos permutations para generar todas las posibles rutas
-    
-    nodos = list(G.nodes())  # Lista de todos los nodos en el grafo
-    nodos.remove(inicio)  # Eliminamos el nodo inicial para permutar solo los demás nodos
-    mejor_ruta = None  # Guardará la mejor ruta encontrada
-    mejor_peso = float("inf")  # Inicializamos el mejor peso con infinito (queremos minimizarlo)
-
-    # Generamos todas las posibles rutas comenzando y terminando en el nodo de inicio
-    for perm in permutations(nodos):
-        ruta = [inicio] + list(perm) + [inicio]  # La ruta siempre comienza y termina en "inicio"
-
-        try:
-            # Calculamos el peso total de la ruta sumando los pesos de cada conexión
-            peso = sum(G[ruta[i]][ruta[i+1]]["weight"] for i in range(len(ruta) - 1))
-        except KeyError:
-            continue  # Si una ruta no tiene conexión entre algunos nodos, la ignoramos
-        
-        # Si encontramos una ruta con menor peso, la guardamos como la mejor hasta ahora
-        if peso < mejor_peso:
-            mejor_peso = peso
-            mejor_ruta = ruta
-
-    return mejor_ruta, mejor_peso  # Retornamos la mejor ruta y su peso
-
-# Función para graficar una ruta en un mapa
-def graficar_ruta(G, ruta, titulo, color):
+    import matplotlib.pyplot as plt  # Solo se importa si se va a mostrar en pantalla
     plt.figure(figsize=(10, 7))  # Configuramos el tamaño de la gráfica
     
-    # Definimos posiciones aproximadas de los lugares en coordenadas ficticias
-    posiciones = {
-        "Universidad Sergio Arboleda": (4.6584, -74.0937),
-        "Parque Principal Soacha": (4.5773, -74.2144),
-        "Parque Principal Villavicencio": (4.1420, -73.6266),
-        "Parque Principal Tunja": (5.5353, -73.3672),
-        "Parque Principal Toca": (5.5646, -73.1818),
-        "Parque Principal Cajica": (4.9226, -74.0273),
-        "Parque Principal La Vega": (5.0101, -74.3445),
-        "Parque Principal La Calera": (4.6926, -73.9630)
-    }
-    
-    pos = {nodo: posiciones[nodo] for nodo in G.nodes if nodo in posiciones}  # Extraemos posiciones de los nodos en el grafo
+    # Posiciones aproximadas de los lugares (latitud, longitud)
+    pos = {nodo: POSICIONES[nodo] for nodo in G.nodes if nodo in POSICIONES}  # Extraemos posiciones de los nodos en el grafo
     nx.draw(G, pos, with_labels=True, node_color='lightgray', node_size=1500, font_size=9, edge_color="gray")  # Dibujamos el grafo
     
     # Dibujamos la ruta óptima resaltada en el color especificado
@@ -116,16 +75,25 @@ G_tiempo, G_distancia = cargar_grafo(datos)
 # Definimos el punto de inicio del recorrido
 inicio = "Universidad Sergio Arboleda"
 
-# Calculamos la ruta más rápida (menor tiempo) usando TSP
-ruta_rapida, tiempo_total = circuito_tsp(G_tiempo, inicio)
-
-# Calculamos la ruta más óptima (menor distancia) usando TSP
-ruta_optima, distancia_total = circuito_tsp(G_distancia, inicio)
+# Calculamos en una sola pasada la ruta más rápida (menor tiempo), la más óptima
+# (menor distancia) y el frente de Pareto entre ambas. Si ya se calculó para estos
+# mismos datos en una ejecución anterior (con RUTAS_CACHE_RESULTADOS apuntando a una
+# carpeta), se lee de la caché en disco
+cache = CacheResultados(directorio=os.environ.get("RUTAS_CACHE_RESULTADOS"))
+(ruta_rapida, tiempo_total), (ruta_optima, distancia_total), frente = cache.consultar(circuito_pareto, G_tiempo, G_distancia, inicio)
 
 # Imprimimos los resultados
 print(f"🔴 Ruta más rápida (menor tiempo): {ruta_rapida}, Tiempo total: {tiempo_total} min")
 print(f"🟢 Ruta más óptima (menor distancia): {ruta_optima}, Distancia total: {distancia_total} km")
 
-# Graficamos las rutas obtenidas
-graficar_ruta(G_tiempo, ruta_rapida, "Ruta más rápida (menor tiempo)", "red")
-graficar_ruta(G_distancia, ruta_optima, "Ruta más óptima (menor distancia)", "green")
+# Mostramos las rutas que equilibran tiempo y distancia (ninguna es peor en ambos)
+print(f"⚖️ Frente de Pareto tiempo/distancia ({len(frente)} rutas):")
+for ruta, tiempo, distancia in frente:
+    print(f"   {tiempo} min, {distancia} km: {ruta}")
+
+# Graficamos las rutas obtenidas (si se define RUTAS_GRAFICOS, se guardan como PNG en esa carpeta)
+carpeta = os.environ.get("RUTAS_GRAFICOS")
+graficar_ruta(G_tiempo, ruta_rapida, "Ruta más rápida (menor tiempo)", "red",
+              archivo=carpeta and os.path.join(carpeta, "ruta_rapida.png"))
+graficar_ruta(G_distancia, ruta_optima, "Ruta más óptima (menor distancia)", "green",
+              archivo=carpeta and os.path.join(carpeta, "ruta_optima.png"))
@@ -1,6 +1,7 @@
 import json  # Librería para manejar datos en formato JSON
+import os  # Variables de entorno de la caché y las gráficas
 import networkx as nx  # Librería para trabajar con grafos
-import matplotlib.pyplot as plt  # Librería para graficar los grafos
+import rutas  # Funciones compartidas para cargar grafos y resolver rutas
 
 def cargar_grafo(datos):
     """
@@ -8,23 +9,17 @@ def cargar_grafo(datos):
     - G_tiempo: usa los tiempos de viaje como peso.
     - G_distancia: usa la distancia en kilómetros como peso.
     """
-    G_tiempo = nx.DiGraph()  # Grafo dirigido basado en el tiempo de viaje
-    G_distancia = nx.DiGraph()  # Grafo dirigido basado en la distancia en km
-
-    for origen, destinos in datos.items():  # Recorremos cada nodo origen
-        for destino, valores in destinos.items():  # Revisamos los destinos conectados a ese origen
-            G_tiempo.add_edge(origen, destino, weight=valores["tiempo"])  # Agregamos arista con peso de tiempo
-            G_distancia.add_edge(origen, destino, weight=valores["distancia"])  # Agregamos arista con peso de distancia
-    
-    return G_tiempo, G_distancia  # Retornamos los dos grafos
+    return rutas.cargar_grafo(datos, dirigido=True)  # Una sola pasada que también compila las matrices
 
 def ruta_mas_rapida(G, inicio):
     """
-    Calcula la ruta más rápida desde el nodo de inicio usando el algoritmo de Bellman-Ford.
+    Calcula la ruta más rápida desde el nodo de inicio.
+    Usa Dijkstra cuando todos los pesos son no negativos (tiempos y distancias siempre lo son)
+    y Bellman-Ford solo si hubiera pesos negativos.
     Devuelve el camino más corto desde el inicio a cada nodo y los tiempos totales.
     """
     try:
-        distancias, _ = nx.single_source_bellman_ford(G, inicio, weight='weight')
+        distancias = rutas.distancias_desde(G, inicio)
         return distancias  # Retorna diccionario con las distancias mínimas
     except nx.NetworkXUnbounded:
         print("Error: el grafo contiene un ciclo negativo.")
@@ -32,35 +27,33 @@ def ruta_mas_rapida(G, inicio):
 
 def tsp_aproximado(G, inicio):
     """
-    Usa la heurística de NetworkX para resolver el problema del viajero (*Traveling Salesman Problem*).
+    Usa una heurística para resolver el problema del viajero (*Traveling Salesman Problem*).
     Devuelve una ruta aproximada que visita todos los nodos y vuelve al inicio.
+    La heurística trabaja sobre el cierre métrico (caminos mínimos entre todos los pares),
+    que se calcula una sola vez y se guarda en disco; la ruta se pule con búsqueda local
+    y al final se expande al camino real por carretera.
     """
-    if nx.is_strongly_connected(G):  # Verifica si el grafo es fuertemente conectado
-        return nx.approximation.traveling_salesman_problem(G, cycle=True, weight="weight")
-    else:
+    if not nx.is_strongly_connected(G):  # Verifica si el grafo es fuertemente conectado
         print("El grafo no es fuertemente conectado, convirtiéndolo en no dirigido...")
-        G_undirected = G.to_undirected()  # Lo convertimos en un grafo no dirigido
-        return nx.approximation.traveling_salesman_problem(G_undirected, cycle=True, weight="weight")
+    return rutas.tsp_aproximado(G, inicio)
 
-def graficar_ruta(G, ruta, titulo, color):
+def graficar_ruta(G, ruta, titulo, color, archivo=None):
     """
     Grafica la ruta sobre el grafo.
+    Si se indica ``archivo`` la imagen (PNG o SVG) se guarda sin abrir ninguna ventana,
+    reutilizando el dibujo del grafo base entre llamadas.
     """
+    if archivo:
+        formato = os.path.splitext(archivo)[1].lstrip(".") or "png"
+        with open(archivo, "wb") as f:
+            f.write(rutas.graficar_ruta_imagen(G, ruta, titulo, color, formato))
+        return
+
+    import matplotlib.pyplot as plt  # Solo se importa si se va a mostrar en pantalla
     plt.figure(figsize=(10, 7))
 
     # Posiciones geográficas aproximadas de los nodos (para mejor visualización)
-    posiciones = {
-        "Universidad Sergio Arboleda": (4.6584, -74.0937),
-        "Parque Principal Soacha": (4.5773, -74.2144),
-        "Parque Principal Villavicencio": (4.1420, -73.6266),
-        "Parque Principal Tunja": (5.5353, -73.3672),
-        "Parque Principal Toca": (5.5646, -73.1818),
-        "Parque Principal Cajica": (4.9226, -74.0273),
-        "Parque Principal La Vega": (5.0101, -74.3445),
-        "Parque Principal La Calera": (4.6926, -73.9630)
-    }
-    
-    pos = {nodo: posiciones[nodo] for nodo in G.nodes if nodo in posiciones}
+    pos = {nodo: rutas.POSICIONES[nodo] for nodo in G.nodes if nodo in rutas.POSICIONES}
     nx.draw(G, pos, with_labels=True, node_color='lightgray', node_size=1500, font_size=9, edge_color="gray")
     
     # Dibujar la ruta específica
@@ -109,21 +102,25 @@ json_data = '''
 datos = json.loads(json_data)  # Convertimos el JSON a diccionario de Python
 G_tiempo, G_distancia = cargar_grafo(datos)  # Creamos los grafos
 inicio = "Universidad Sergio Arboleda"  # Nodo inicial
+cache = rutas.CacheResultados(directorio=os.environ.get("RUTAS_CACHE_RESULTADOS"))  # En disco solo si se pide con RUTAS_CACHE_RESULTADOS
 
-# Calcular la ruta más rápida usando Bellman-Ford
-tiempos = ruta_mas_rapida(G_tiempo, inicio)
+# Calcular la ruta más rápida (Dijkstra, porque no hay tiempos negativos)
+tiempos = cache.consultar(ruta_mas_rapida, G_tiempo, inicio, nombre="distancias_desde")
 if tiempos:
     print(f"🔴 Ruta más rápida desde {inicio}:")
     for nodo, tiempo in tiempos.items():
         print(f"   {nodo} -> {tiempo} min")
 
 # Calcular la mejor ruta usando heurística para TSP
-ruta_optima = tsp_aproximado(G_distancia, inicio)
+ruta_optima = cache.consultar(tsp_aproximado, G_distancia, inicio)
 if ruta_optima:
     distancia_total = sum(G_distancia[ruta_optima[i]][ruta_optima[i+1]]["weight"] for i in range(len(ruta_optima)-1))
     print(f"\n🟢 Ruta más óptima (circuito más corto): {ruta_optima}")
     print(f"   Distancia total: {distancia_total} km")
 
-# Graficar rutas
-graficar_ruta(G_tiempo, list(tiempos.keys()), "Ruta más rápida (menor tiempo)", "red")
-graficar_ruta(G_distancia, ruta_optima, "Ruta más óptima (menor distancia)", "green")
+# Graficar rutas (si se define RUTAS_GRAFICOS, se guardan como PNG en esa carpeta en vez de mostrarse)
+carpeta = os.environ.get("RUTAS_GRAFICOS")
+graficar_ruta(G_tiempo, list(tiempos.keys()), "Ruta más rápida (menor tiempo)", "red",
+              archivo=carpeta and os.path.join(carpeta, "ruta_rapida.png"))
+graficar_ruta(G_distancia, ruta_optima, "Ruta más óptima (menor distancia)", "green",
+              archivo=carpeta and os.path.join(carpeta, "ruta_optima.png"))
@@ -0,0 +1,111 @@
+"""
+Funciones compartidas por los scripts del parcial para cargar los grafos de
+destinos y resolver rutas sobre ellos.
+"""
+
+from .arbol_caminos import ArbolCaminos
+from .busqueda_local import busqueda_local, listas_vecinos, mejorar_circuito, preparar_busqueda
+from .cache_resultados import CacheResultados
+from .dependiente_tiempo import (
+    duracion,
+    evaluar_circuito,
+    held_karp_dependiente,
+    llegada_mas_temprana,
+    mejor_salida,
+    perfil_llegadas,
+)
+from .caminos import a_estrella, distancias_desde, haversine, ruta_mas_rapida, tsp_aproximado
+from .cierre_metrico import DIRECTORIO_CACHE, caminos_minimos, cierre_metrico, expandir_ruta, grafo_cierre, grafos_cierre, huella, preparar_circuito
+from .grafo import (
+    POSICIONES,
+    GrafoCompilado,
+    agregar_parada,
+    cambiar_peso,
+    cargar_grafo,
+    compilar_grafo,
+    crear_perfil,
+    evaluar_rutas,
+    huella_datos,
+    huella_grafo,
+    matriz_pesos,
+    pesos_no_negativos,
+    quitar_parada,
+)
+from .generadores import anillo, completo, geometrico_aleatorio, grilla
+from .graficos import RenderizadorRutas, graficar_ruta_imagen, renderizador
+from .jerarquias import JerarquiaContraccion, construir_jerarquia, jerarquia, matrices_viaje, matriz_costos
+from .red_compacta import RedCompacta, cargar_red, leer_tramos, vista_networkx
+from .reoptimizacion import CircuitoIncremental
+from .tsp_exacto import circuito_pareto, fuerza_bruta, held_karp, ramificacion_y_poda
+from .metaheuristicas import circuito_recocido, pesos_circuitos, recocido_paralelo
+from .tsp_paralelo import fuerza_bruta_paralela
+from .tsp_progresivo import circuito_con_plazo, circuitos_progresivos, vecino_mas_cercano
+
+__all__ = [
+    "ArbolCaminos",
+    "RedCompacta",
+    "cargar_red",
+    "leer_tramos",
+    "vista_networkx",
+    "CircuitoIncremental",
+    "busqueda_local",
+    "listas_vecinos",
+    "mejorar_circuito",
+    "preparar_busqueda",
+    "CacheResultados",
+    "a_estrella",
+    "distancias_desde",
+    "haversine",
+    "ruta_mas_rapida",
+    "tsp_aproximado",
+    "DIRECTORIO_CACHE",
+    "caminos_minimos",
+    "cierre_metrico",
+    "expandir_ruta",
+    "grafo_cierre",
+    "grafos_cierre",
+    "huella",
+    "preparar_circuito",
+    "duracion",
+    "evaluar_circuito",
+    "held_karp_dependiente",
+    "llegada_mas_temprana",
+    "mejor_salida",
+    "perfil_llegadas",
+    "POSICIONES",
+    "GrafoCompilado",
+    "agregar_parada",
+    "cambiar_peso",
+    "cargar_grafo",
+    "compilar_grafo",
+    "crear_perfil",
+    "evaluar_rutas",
+    "huella_datos",
+    "huella_grafo",
+    "matriz_pesos",
+    "pesos_no_negativos",
+    "quitar_parada",
+    "anillo",
+    "completo",
+    "geometrico_aleatorio",
+    "grilla",
+    "RenderizadorRutas",
+    "graficar_ruta_imagen",
+    "renderizador",
+    "JerarquiaContraccion",
+    "construir_jerarquia",
+    "jerarquia",
+    "matrices_viaje",
+    "matriz_costos",
+    "circuito_pareto",
+    "fuerza_bruta",
+    "fuerza_bruta_paralela",
+    "circuito_con_plazo",
+    "circuito_recocido",
+    "pesos_circuitos",
+    "recocido_paralelo",
+    "circuitos_progresivos",
+    "vecino_mas_cercano",
+    "held_karp",
+    "ramificacion_y_poda",
+]
@@ -0,0 +1,156 @@
+"""
+Árbol de caminos mínimos desde un origen que se repara en lugar de
+recalcularse cuando cambian los pesos.
+
+Cuando se cierra una vía o cambia el tiempo de un tramo por el tráfico, casi
+todas las distancias desde el origen siguen igual. ``ArbolCaminos`` guarda
+las ``distancias`` y el padre de cada nodo en el árbol, y
+``actualizar(cambios)`` aplica un lote de cambios de peso reparando solo lo
+afectado:
+
+- Si sube el peso de una arista del árbol, se invalida el subárbol que
+  cuelga de ella; cada nodo invalidado toma como candidato su mejor vecino de
+  entrada que no quedó invalidado.
+- Si baja el peso de cualquier arista, su extremo recibe el nuevo candidato.
+- Desde esos candidatos se propaga una búsqueda de Dijkstra que solo avanza
+  mientras encuentra mejoras.
+
+Los pesos deben ser no negativos; un peso ``inf`` representa una vía cerrada.
+"""
+
+import heapq  # Cola de prioridad de la propagación
+import math  # Infinito
+
+import networkx as nx  # Errores de nodos inexistentes
+
+from .grafo import cambiar_peso, pesos_no_negativos
+
+
+class ArbolCaminos:
+    """
+    Árbol de caminos mínimos de ``G`` desde ``raiz``. ``distancias`` tiene el
+    costo hacia cada nodo alcanzable (como ``nx.single_source_dijkstra_path_length``)
+    y ``padres`` el nodo anterior en el camino mínimo.
+    """
+
+    def __init__(self, G, raiz):
+        if raiz not in G:
+            raise nx.NodeNotFound(f"Node {raiz} not found in graph")
+        if not pesos_no_negativos(G):
+            raise ValueError("ArbolCaminos necesita pesos no negativos")
+        self.G = G
+        self.raiz = raiz
+        self.distancias = {raiz: 0}
+        self.padres = {raiz: None}
+        self._hijos = {raiz: set()}
+        self._propagar([(0, raiz)])
+
+    def _entradas(self, nodo):
+        return self.G.pred[nodo] if self.G.is_directed() else self.G[nodo]
+
+    def _colgar(self, nodo, padre):
+        """Cuelga ``nodo`` de ``padre`` en el árbol."""
+        anterior = self.padres.get(nodo)
+        if anterior is not None:
+            self._hijos[anterior].discard(nodo)
+        self.padres[nodo] = padre
+        self._hijos.setdefault(padre, set()).add(nodo)
+        self._hijos.setdefault(nodo, set())
+
+    def _propagar(self, cola, antes=None):
+        """
+        Dijkstra a partir de los candidatos de ``cola``; devuelve cuántos nodos
+        asentó. Anota en ``antes`` la distancia previa de cada nodo que mejora.
+        """
+        heapq.heapify(cola)
+        asentados = 0
+        while cola:
+            d, u = heapq.heappop(cola)
+            if d > self.distancias.get(u, math.inf):
+                continue
+            asentados += 1
+            for v, atributos in self.G[u].items():
+                nuevo = d + atributos["weight"]
+                if nuevo < self.distancias.get(v, math.inf):
+                    if antes is not None:
+                        antes.setdefault(v, self.distancias.get(v, math.inf))
+                    self.distancias[v] = nuevo
+                    self._colgar(v, u)
+                    heapq.heappush(cola, (nuevo, v))
+        return asentados
+
+    def _subarbol(self, nodo):
+        """``nodo`` y todos sus descendientes en el árbol."""
+        nodos = [nodo]
+        for u in nodos:
+            nodos.extend(self._hijos.get(u, ()))
+        return nodos
+
+    def actualizar(self, cambios, estadisticas=None):
+        """
+        Aplica un lote de cambios ``(origen, destino, peso)`` sobre aristas
+        existentes (con ``cambiar_peso``, así la forma compilada y la huella
+        quedan al día) y repara el árbol. Devuelve un diccionario con los nodos
+        cuya distancia cambió y su nueva distancia (``inf`` si ya no se alcanzan).
+        Si se pasa ``estadisticas`` se llena con los nodos ``"invalidados"``
+        y ``"asentados"``.
+        """
+        antes = {}
+        invalidados = set()
+        bajadas = []
+        for u, v, peso in cambios:
+            if peso < 0:
+                raise ValueError("ArbolCaminos necesita pesos no negativos")
+            viejo = self.G[u][v]["weight"]
+            cambiar_peso(self.G, u, v, peso)
+            sentidos = [(u, v)] if self.G.is_directed() else [(u, v), (v, u)]
+            for a, b in sentidos:
+                if peso > viejo and self.padres.get(b) == a:
+                    invalidados.update(self._subarbol(b))
+                elif peso < viejo:
+                    bajadas.append((a, b))
+
+        # Subárboles que colgaban de una arista que subió: se sueltan del árbol
+        for nodo in invalidados:
+            antes.setdefault(nodo, self.distancias.pop(nodo))
+            padre = self.padres.pop(nodo)
+            if padre is not None and padre not in invalidados:
+                self._hijos[padre].discard(nodo)
+            self._hijos[nodo] = set()
+
+        cola = []
+        for nodo in invalidados:  # Mejor vecino de entrada que sigue en el árbol
+            mejor, padre = math.inf, None
+            for p, atributos in self._entradas(nodo).items():
+                candidato = self.distancias.get(p, math.inf) + atributos["weight"]
+                if candidato < mejor:
+                    mejor, padre = candidato, p
+            if padre is not None:
+                self.distancias[nodo] = mejor
+                self._colgar(nodo, padre)
+                cola.append((mejor, nodo))
+        for a, b in bajadas:
+            candidato = self.distancias.get(a, math.inf) + self.G[a][b]["weight"]
+            if candidato < self.distancias.get(b, math.inf):
+                antes.setdefault(b, self.distancias.get(b, math.inf))
+                self.distancias[b] = candidato
+                self._colgar(b, a)
+                cola.append((candidato, b))
+
+        asentados = self._propagar(cola, antes)
+
+        if estadisticas is not None:
+            estadisticas["invalidados"] = len(invalidados)
+            estadisticas["asentados"] = asentados
+        return {nodo: self.distancias.get(nodo, math.inf) for nodo, valor in antes.items()
+                if self.distancias.get(nodo, math.inf) != valor}
+
+    def ruta(self, nodo):
+        """Camino mínimo desde la raíz hasta ``nodo`` según el árbol actual."""
+        if nodo not in self.distancias:
+            raise nx.NetworkXNoPath(f"No path between {self.raiz} and {nodo}.")
+        ruta = []
+        while nodo is not None:
+            ruta.append(nodo)
+            nodo = self.padres[nodo]
+        return ruta[::-1]
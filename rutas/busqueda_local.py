@@ -0,0 +1,238 @@
+"""
+Mejora local de circuitos ya construidos (2-opt y Or-opt).
+
+``tsp_aproximado`` devuelve la ruta de la heurística de NetworkX sin
+intentar mejorarla. Aquí se pule cualquier circuito inicial con dos tipos de
+movimiento:
+
+- 2-opt: cambia dos aristas (a, b), (c, d) por (a, c), (b, d) invirtiendo el
+  tramo intermedio. Solo se usa si la matriz es simétrica.
+- Or-opt: saca un tramo de 1 a 3 nodos y lo inserta entre otros dos.
+
+Cada movimiento candidato se evalúa en tiempo constante (solo cambian unas
+pocas aristas) y los candidatos se limitan a los ``vecinos`` más cercanos
+de cada nodo, con "bits de no mirar" para no revisar nodos que no cambiaron.
+Así se pueden pulir circuitos de 1.000 a 10.000 paradas dentro de un tiempo
+límite.
+"""
+
+import time  # Control del tiempo límite
+from collections import deque  # Cola de nodos pendientes de revisar
+
+import numpy as np  # Listas de vecinos y matriz de pesos
+
+from .grafo import matriz_pesos
+
+EPSILON = 1e-9  # Mejora mínima para aceptar un movimiento
+TRAMO_MAXIMO = 3  # Largo máximo de los tramos que mueve Or-opt
+
+
+def listas_vecinos(W, k=8, bloque=1024):
+    """
+    Devuelve un arreglo ``(n, k)`` con los ``k`` nodos más cercanos a cada
+    nodo (sin contarse a sí mismo), calculado por bloques de filas para no
+    ordenar la matriz completa.
+    """
+    n = len(W)
+    k = max(1, min(k, n - 1))
+    vecinos = np.empty((n, k), dtype=np.intp)
+    for inicio in range(0, n, bloque):
+        filas = np.array(W[inicio:inicio + bloque], dtype=float)
+        filas[np.arange(len(filas)), np.arange(inicio, inicio + len(filas))] = np.inf  # Sin sí mismo
+        cercanos = np.argpartition(filas, k - 1, axis=1)[:, :k]
+        orden = np.take_along_axis(filas, cercanos, axis=1).argsort(axis=1)
+        vecinos[inicio:inicio + len(filas)] = np.take_along_axis(cercanos, orden, axis=1)
+    return vecinos
+
+
+def preparar_busqueda(W, vecinos=8):
+    """
+    Deja lista ``W`` para ``busqueda_local``: las aristas faltantes pasan a
+    ser muy caras (para que las restas no den ``nan``), se anota si es
+    simétrica y se calculan las listas de vecinos. Devuelve
+    ``(W, simetrica, cercanos)``; quien llama muchas veces sobre la misma
+    matriz (por ejemplo en la búsqueda local iterada) lo calcula una vez y lo
+    pasa en ``preparada``.
+    """
+    W = np.asarray(W, dtype=float)
+    if not np.isfinite(W).all():
+        finitos = W[np.isfinite(W)]
+        grande = (finitos.max() if finitos.size else 1.0) * len(W) * 10 + 1
+        W = np.where(np.isfinite(W), W, grande)
+    simetrica = np.array_equal(W, W.T)
+    cercanos = listas_vecinos(np.minimum(W, W.T), vecinos).tolist() if len(W) > 3 else [[] for _ in range(len(W))]
+    return W, simetrica, cercanos
+
+
+def busqueda_local(W, ruta, tiempo_limite=1.0, vecinos=8, estadisticas=None, revisar=None, preparada=None):
+    """
+    Mejora un circuito dado como secuencia de índices de ``W`` (cada nodo una
+    vez, sin repetir el primero al final) y devuelve ``(ruta, peso)`` con la
+    ruta rotada para empezar en el mismo nodo que la original.
+
+    ``tiempo_limite`` son los segundos disponibles; al agotarse se devuelve
+    la mejor ruta alcanzada. Si se pasa un diccionario en ``estadisticas`` se
+    llena con el peso inicial y final, la mejora y los movimientos aplicados.
+    ``revisar`` limita los nodos que se revisan al comenzar (por defecto
+    todos), por ejemplo a los extremos de una perturbación pequeña.
+    ``preparada`` es el resultado de ``preparar_busqueda(W, vecinos)``, si
+    ya se calculó.
+    """
+    inicio_reloj = time.perf_counter()
+    W, simetrica, cercanos = preparar_busqueda(W, vecinos) if preparada is None else preparada
+
+    ruta = [int(v) for v in ruta]
+    n = len(ruta)
+    primero = ruta[0]
+    peso_inicial = _peso_circuito(W, ruta)
+
+    pos = [0] * len(W)  # Posición de cada nodo dentro de la ruta
+    for i, v in enumerate(ruta):
+        pos[v] = i
+    d = W.item  # d(a, b) devuelve un float de Python
+
+    def suc(v):
+        return ruta[(pos[v] + 1) % n]
+
+    def pred(v):
+        return ruta[(pos[v] - 1) % n]
+
+    def invertir(i, j):
+        """Invierte el tramo cíclico de posiciones i..j (o su complemento, si es más corto)."""
+        largo = (j - i) % n + 1
+        if 2 * largo > n:  # Invertir el complemento da el mismo circuito
+            i, j = (j + 1) % n, (i - 1) % n
+            largo = n - largo
+        for _ in range(largo // 2):
+            a, b = ruta[i], ruta[j]
+            ruta[i], ruta[j] = b, a
+            pos[a], pos[b] = j, i
+            i, j = (i + 1) % n, (j - 1) % n
+
+    def dos_opt(a):
+        """Intenta un movimiento 2-opt que toque al nodo ``a``; True si lo aplicó."""
+        for hacia_adelante in (True, False):
+            b = suc(a) if hacia_adelante else pred(a)
+            d_ab = d(a, b)
+            for c in cercanos[a]:
+                ganancia = d_ab - d(a, c)
+                if ganancia <= EPSILON:
+                    break  # Los vecinos están ordenados: los siguientes están más lejos
+                e = suc(c) if hacia_adelante else pred(c)
+                if c == b or e == a:
+                    continue
+                delta = d(a, c) + d(b, e) - d_ab - d(c, e)
+                if delta < -EPSILON:
+                    if hacia_adelante:
+                        invertir(pos[b], pos[c])  # a -> c ... b -> e
+                    else:
+                        invertir(pos[c], pos[b])  # e <- c ... b <- a, en sentido opuesto
+                    return True
+        return False
+
+    def or_opt(a):
+        """Intenta mover un tramo que empieza en ``a``; True si lo aplicó."""
+        p = pos[a]
+        for largo in range(1, TRAMO_MAXIMO + 1):
+            if p + largo >= n or largo >= n - 2:
+                break  # Solo tramos que no dan la vuelta a la lista
+            tramo = ruta[p:p + largo]
+            s, t = tramo[0], tramo[-1]
+            antes, despues = ruta[p - 1], ruta[p + largo]
+            ganancia = d(antes, s) + d(t, despues) - d(antes, despues)
+            if ganancia <= EPSILON:
+                continue
+            for c in cercanos[s] + cercanos[t]:
+                if c in tramo:
+                    continue
+                # Insertar entre c y su sucesor, en el mismo sentido o (si es simétrica) invertido
+                cn = suc(c)
+                if cn == s:
+                    continue
+                opciones = [(d(c, s) + d(t, cn) - d(c, cn), False)]
+                if simetrica:
+                    opciones.append((d(c, t) + d(s, cn) - d(c, cn), True))
+                for costo, invertido in opciones:
+                    if costo < ganancia - EPSILON:
+                        mover(p, largo, c, invertido)
+                        return True
+        return False
+
+    def mover(p, largo, c, invertido):
+        """Saca el tramo en posiciones p..p+largo-1 y lo inserta justo después de ``c``."""
+        tramo = ruta[p:p + largo]
+        if invertido:
+            tramo.reverse()
+        del ruta[p:p + largo]
+        q = ruta.index(c, max(0, pos[c] - largo), pos[c] + 1) + 1
+        ruta[q:q] = tramo
+        for k in range(min(p, q), max(p + largo, q + largo)):
+            pos[ruta[k]] = k
+
+    movimientos_2opt = movimientos_oropt = 0
+    pendientes = deque(ruta if revisar is None else dict.fromkeys(int(v) for v in revisar))  # Por revisar
+    en_cola = [False] * len(W)
+    for v in pendientes:
+        en_cola[v] = True
+    agotado = False
+
+    while pendientes and n > 3:
+        if time.perf_counter() - inicio_reloj > tiempo_limite:
+            agotado = True
+            break
+        a = pendientes.popleft()
+        en_cola[a] = False
+        if simetrica and dos_opt(a):
+            movimientos_2opt += 1
+        elif or_opt(a):
+            movimientos_oropt += 1
+        else:
+            continue
+        # El nodo, sus nuevos extremos y sus vecinos vuelven a revisarse
+        for v in [a, suc(a), pred(a)] + cercanos[a]:
+            if not en_cola[v]:
+                en_cola[v] = True
+                pendientes.append(v)
+
+    # Rotamos para que la ruta empiece donde empezaba la original
+    k = ruta.index(primero)
+    ruta = ruta[k:] + ruta[:k]
+    peso_final = _peso_circuito(W, ruta)
+
+    if estadisticas is not None:
+        estadisticas.update(
+            peso_inicial=peso_inicial,
+            peso_final=peso_final,
+            mejora=peso_inicial - peso_final,
+            mejora_relativa=(peso_inicial - peso_final) / peso_inicial if peso_inicial else 0.0,
+            movimientos_2opt=movimientos_2opt,
+            movimientos_oropt=movimientos_oropt,
+            segundos=time.perf_counter() - inicio_reloj,
+            tiempo_agotado=agotado,
+        )
+    return ruta, peso_final
+
+
+def _peso_circuito(W, ruta):
+    """Peso del circuito cerrado ``ruta`` (vuelve del último al primero)."""
+    idx = np.asarray(ruta, dtype=np.intp)
+    return float(W[idx, np.roll(idx, -1)].sum())
+
+
+def mejorar_circuito(G, ruta, weight="weight", tiempo_limite=1.0, vecinos=8, estadisticas=None):
+    """
+    Aplica ``busqueda_local`` a un circuito de ``G`` en el formato de
+    ``circuito_tsp`` (``[inicio, ..., inicio]``, cada nodo una sola vez) y
+    devuelve ``(ruta, peso)`` con el mismo formato.
+    """
+    if ruta[0] != ruta[-1] or len(set(ruta)) != len(ruta) - 1:
+        raise ValueError("La ruta debe ser un circuito que visite cada nodo una sola vez")
+    orden = ruta[:-1]
+    W = matriz_pesos(G, orden, weight)
+    indices, _ = busqueda_local(W, range(len(orden)), tiempo_limite, vecinos, estadisticas)
+    nueva = [orden[i] for i in indices] + [orden[0]]
+    try:
+        peso = sum(G[nueva[i]][nueva[i + 1]][weight] for i in range(len(nueva) - 1))
+    except KeyError:
+        peso = float("inf")  # La ruta de entrada ya usaba aristas inexistentes
+    return nueva, peso
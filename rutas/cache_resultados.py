@@ -0,0 +1,200 @@
+"""
+Caché de resultados de rutas en dos niveles: memoria y disco.
+
+Los scripts y el servicio repiten casi siempre las mismas consultas (mismo
+mapa, mismo inicio "Universidad Sergio Arboleda"). ``CacheResultados``
+guarda el resultado de cada llamada con una clave formada por el nombre del
+solucionador y sus argumentos, donde cada grafo se reemplaza por su huella
+(``huella_grafo``) y el peso que representa. Así, si cambia el peso de una
+arista (con ``cambiar_peso``) cambia la huella y las consultas viejas ya no
+coinciden. La clave lleva también ``VERSION``, que se sube cada vez que un
+solucionador cambia sus resultados para que no se lean los de la versión
+anterior.
+
+- Nivel 1: un LRU en memoria con como máximo ``maximo`` resultados.
+- Nivel 2 (solo si se pasa ``directorio``): archivos JSON, con como máximo
+  ``maximo_disco`` archivos; se borran primero los usados hace más tiempo.
+  Las tuplas y los diccionarios se guardan marcados para que desde disco
+  vuelvan con los mismos tipos que el resultado sin caché.
+"""
+
+import copy  # Copias para que quien llama no modifique lo guardado
+import hashlib  # Nombre de archivo a partir de la clave
+import json  # Formato de las claves y de los archivos
+import os  # Archivos del nivel en disco
+import tempfile  # Escritura atómica
+import threading  # El servicio atiende solicitudes en varios hilos
+from collections import OrderedDict  # LRU en memoria
+
+import networkx as nx  # Para reconocer qué argumentos son grafos
+
+from .grafo import huella_grafo
+
+VERSION = 2  # Versión de los resultados de los solucionadores; forma parte de cada clave
+
+
+def _codificar(valor):
+    """Convierte el valor a JSON marcando tuplas y diccionarios para recuperarlos tal cual."""
+    if isinstance(valor, tuple):
+        return {"tupla": [_codificar(v) for v in valor]}
+    if isinstance(valor, list):
+        return [_codificar(v) for v in valor]
+    if isinstance(valor, dict):  # Como pares, para no perder claves que no son texto
+        return {"dict": [[_codificar(k), _codificar(v)] for k, v in valor.items()]}
+    return valor
+
+
+def _decodificar(valor):
+    """Inverso de ``_codificar``."""
+    if isinstance(valor, list):
+        return [_decodificar(v) for v in valor]
+    if isinstance(valor, dict):
+        if "tupla" in valor:
+            return tuple(_decodificar(v) for v in valor["tupla"])
+        return {_decodificar(k): _decodificar(v) for k, v in valor["dict"]}
+    return valor
+
+
+class CacheResultados:
+    """
+    Caché LRU en memoria con respaldo opcional en disco. ``estadisticas()``
+    devuelve los aciertos en cada nivel, los fallos y los desalojos.
+    """
+
+    def __init__(self, maximo=1024, directorio=None, maximo_disco=10000):
+        self.maximo = maximo
+        self.directorio = directorio
+        self.maximo_disco = maximo_disco
+        self._memoria = OrderedDict()  # clave -> (huellas, valor)
+        self._candado = threading.Lock()
+        self._contadores = {"aciertos_memoria": 0, "aciertos_disco": 0, "fallos": 0, "desalojos": 0}
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+    @staticmethod
+    def clave(nombre, argumentos, opciones=None):
+        """
+        Clave canónica (texto JSON) y huellas de grafo de una llamada. Cada
+        grafo se representa por su huella y por el peso que usa (``G.graph["peso"]``).
+        """
+        partes = []
+        huellas = []
+        for valor in argumentos:
+            if isinstance(valor, nx.Graph):
+                h = huella_grafo(valor)
+                huellas.append(h)
+                partes.append({"grafo": h, "peso": valor.graph.get("peso", "weight")})
+            else:
+                partes.append(valor)
+        texto = json.dumps([VERSION, nombre, partes, opciones or {}], sort_keys=True, ensure_ascii=False,
+                           default=str)
+        return texto, tuple(huellas)
+
+    def _archivo(self, clave):
+        return os.path.join(self.directorio, hashlib.sha256(clave.encode("utf-8")).hexdigest() + ".json")
+
+    def obtener(self, clave):
+        """Devuelve ``(True, valor)`` si la clave está guardada y ``(False, None)`` si no."""
+        with self._candado:
+            if clave in self._memoria:
+                self._memoria.move_to_end(clave)
+                self._contadores["aciertos_memoria"] += 1
+                return True, copy.deepcopy(self._memoria[clave][1])
+
+        if self.directorio:
+            archivo = self._archivo(clave)
+            try:
+                with open(archivo, encoding="utf-8") as f:
+                    guardado = json.load(f)
+            except (OSError, ValueError):
+                guardado = None
+            if guardado is not None and guardado["clave"] == clave:
+                os.utime(archivo)  # Marca de uso para el desalojo en disco
+                valor = _decodificar(guardado["valor"])
+                self._guardar_memoria(clave, tuple(guardado["huellas"]), valor)
+                with self._candado:
+                    self._contadores["aciertos_disco"] += 1
+                return True, copy.deepcopy(valor)
+
+        with self._candado:
+            self._contadores["fallos"] += 1
+        return False, None
+
+    def _guardar_memoria(self, clave, huellas, valor):
+        with self._candado:
+            self._memoria[clave] = (huellas, valor)
+            self._memoria.move_to_end(clave)
+            while len(self._memoria) > self.maximo:
+                self._memoria.popitem(last=False)
+                self._contadores["desalojos"] += 1
+
+    def guardar(self, clave, valor, huellas=()):
+        """Guarda el resultado en memoria y, si hay directorio, en disco."""
+        self._guardar_memoria(clave, tuple(huellas), copy.deepcopy(valor))
+        if not self.directorio:
+            return
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+            json.dump({"clave": clave, "huellas": list(huellas), "valor": _codificar(valor)}, f, ensure_ascii=False)
+        os.replace(temporal, self._archivo(clave))
+        self._recortar_disco()
+
+    def _recortar_disco(self):
+        """Borra los archivos usados hace más tiempo si se pasó de ``maximo_disco``."""
+        archivos = [e for e in os.scandir(self.directorio) if e.name.endswith(".json")]
+        if len(archivos) <= self.maximo_disco:
+            return
+        archivos.sort(key=lambda e: e.stat().st_mtime)
+        for entrada in archivos[:len(archivos) - self.maximo_disco]:
+            try:
+                os.unlink(entrada.path)
+            except FileNotFoundError:
+                pass  # Otro proceso ya lo borró
+            with self._candado:
+                self._contadores["desalojos"] += 1
+
+    def consultar(self, funcion, *argumentos, nombre=None, **opciones):
+        """
+        Devuelve ``funcion(*argumentos, **opciones)`` usando la caché. Los
+        grafos entre los argumentos se identifican por su huella; el resto de
+        argumentos (inicio, fin, ...) debe poder convertirse a JSON.
+        """
+        clave, huellas = self.clave(nombre or funcion.__name__, argumentos, opciones)
+        encontrado, valor = self.obtener(clave)
+        if encontrado:
+            return valor
+        valor = funcion(*argumentos, **opciones)
+        self.guardar(clave, valor, huellas)
+        return valor
+
+    def invalidar(self, huella=None):
+        """
+        Borra los resultados que dependen del grafo con esa ``huella``
+        (o todos, si no se indica) de la memoria y del disco.
+        """
+        with self._candado:
+            for clave in [c for c, (h, _) in self._memoria.items() if huella is None or huella in h]:
+                del self._memoria[clave]
+        if not self.directorio:
+            return
+        for entrada in os.scandir(self.directorio):
+            if not entrada.name.endswith(".json"):
+                continue
+            if huella is not None:
+                try:
+                    with open(entrada.path, encoding="utf-8") as f:
+                        if huella not in json.load(f)["huellas"]:
+                            continue
+                except (OSError, ValueError, KeyError):
+                    pass  # Archivo dañado: también se borra
+            try:
+                os.unlink(entrada.path)
+            except FileNotFoundError:
+                pass
+
+    def estadisticas(self):
+        """Contadores de aciertos, fallos y desalojos, más el tamaño en memoria."""
+        with self._candado:
+            datos = dict(self._contadores)
+            datos["en_memoria"] = len(self._memoria)
+        return datos
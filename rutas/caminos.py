@@ -0,0 +1,191 @@
+"""
+Rutas entre dos puntos y circuitos aproximados sobre los grafos de
+``cargar_grafo``, en la forma que usan los scripts y el servicio.
+
+Para rutas entre dos puntos se usa A* con una heurística de distancia
+ortodrómica (haversine) a partir de la latitud y longitud de cada nodo
+(atributos ``"lat"`` y ``"lon"``, que pone ``cargar_grafo`` con
+``posiciones=``). La heurística se multiplica por el menor cociente
+``peso / distancia ortodrómica`` entre las aristas del grafo:
+
+- en el grafo de distancias ese factor es como mucho 1, así que nunca se
+  supone una carretera más corta que la línea recta;
+- en el grafo de tiempos es ``1 / velocidad máxima`` observada en los datos.
+
+Con ese factor la heurística es consistente: nunca sobrestima lo que falta
+y cada nodo se asienta una sola vez, igual que en Dijkstra.
+"""
+
+import heapq  # Cola de prioridad de A*
+import math  # Fórmula de haversine
+
+import networkx as nx  # Algoritmos de caminos mínimos y heurísticas de TSP
+
+from .busqueda_local import busqueda_local, mejorar_circuito
+from .cierre_metrico import preparar_circuito
+from .grafo import pesos_no_negativos
+from .instrumentacion import fase
+from .tsp_progresivo import vecino_mas_cercano
+
+
+RADIO_TIERRA_KM = 6371.0088  # Radio medio de la Tierra
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Distancia ortodrómica en kilómetros entre dos puntos (en grados)."""
+    fi1, fi2 = math.radians(lat1), math.radians(lat2)
+    dfi = fi2 - fi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dfi / 2) ** 2 + math.cos(fi1) * math.cos(fi2) * math.sin(dlambda / 2) ** 2
+    return 2 * RADIO_TIERRA_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _coordenadas(G):
+    """Diccionario nodo -> (lat, lon), o ``None`` si a algún nodo le faltan."""
+    coordenadas = {}
+    for nodo, atributos in G.nodes(data=True):
+        if "lat" not in atributos or "lon" not in atributos:
+            return None
+        coordenadas[nodo] = (atributos["lat"], atributos["lon"])
+    return coordenadas
+
+
+def factor_heuristica(G, coordenadas, velocidad_maxima=None):
+    """
+    Factor por el que se multiplica la distancia ortodrómica para obtener
+    una cota inferior del peso restante (ver la descripción del módulo).
+    Se guarda en ``G.graph["factor_heuristica"]``; ``cambiar_peso`` lo borra.
+    """
+    if velocidad_maxima is not None:
+        return 1.0 / velocidad_maxima
+    if "factor_heuristica" not in G.graph:
+        factor = math.inf
+        for u, v, peso in G.edges(data="weight"):
+            recta = haversine(*coordenadas[u], *coordenadas[v])
+            if recta > 0:
+                factor = min(factor, peso / recta)
+        if not math.isfinite(factor):
+            factor = 0.0  # Sin aristas útiles: A* se comporta como Dijkstra
+        if G.graph.get("peso") == "distancia":
+            factor = min(factor, 1.0)  # La carretera nunca es más corta que la línea recta
+        G.graph["factor_heuristica"] = factor
+    return G.graph["factor_heuristica"]
+
+
+def _busqueda(G, inicio, fin, heuristica):
+    """
+    A* (o Dijkstra si la heurística es cero) con una cola de prioridad.
+    Devuelve ``(ruta, costo, asentados)``; lanza ``nx.NetworkXNoPath`` si
+    ``fin`` no es alcanzable.
+    """
+    if inicio not in G:
+        raise nx.NodeNotFound(f"Node {inicio} not found in graph")
+    if fin not in G:
+        raise nx.NodeNotFound(f"Node {fin} not found in graph")
+
+    costo = {inicio: 0}
+    anterior = {inicio: None}
+    asentado = set()
+    cola = [(heuristica(inicio), 0, inicio)]
+    desempate = 0  # Evita comparar nodos cuando las prioridades empatan
+
+    while cola:
+        _, _, u = heapq.heappop(cola)
+        if u in asentado:
+            continue
+        asentado.add(u)
+        if u == fin:
+            ruta = []
+            while u is not None:
+                ruta.append(u)
+                u = anterior[u]
+            return ruta[::-1], costo[fin], len(asentado)
+        for v, atributos in G[u].items():
+            nuevo = costo[u] + atributos["weight"]
+            if v not in asentado and nuevo < costo.get(v, math.inf):
+                costo[v] = nuevo
+                anterior[v] = u
+                desempate += 1
+                heapq.heappush(cola, (nuevo + heuristica(v), desempate, v))
+
+    raise nx.NetworkXNoPath(f"No path between {inicio} and {fin}.")
+
+
+def a_estrella(G, inicio, fin, velocidad_maxima=None, estadisticas=None, comparar_dijkstra=False):
+    """
+    Camino de menor peso entre ``inicio`` y ``fin`` con A*. Devuelve
+    ``(ruta, costo)`` en una sola búsqueda.
+
+    ``velocidad_maxima`` (km por unidad de peso) reemplaza la que se deduce
+    de los datos en el grafo de tiempos. Si a algún nodo le faltan
+    coordenadas se usa Dijkstra. Si se pasa ``estadisticas`` se llena con los
+    nodos ``"asentados"`` y, con ``comparar_dijkstra=True``, también con los
+    ``"asentados_dijkstra"`` de una búsqueda sin heurística.
+    """
+    coordenadas = _coordenadas(G)
+    if coordenadas is None or fin not in coordenadas:
+        heuristica = lambda nodo: 0.0  # noqa: E731 - sin coordenadas no hay heurística
+    else:
+        factor = factor_heuristica(G, coordenadas, velocidad_maxima)
+        lat_fin, lon_fin = coordenadas[fin]
+        heuristica = lambda nodo: factor * haversine(*coordenadas[nodo], lat_fin, lon_fin)  # noqa: E731
+
+    ruta, costo, asentados = _busqueda(G, inicio, fin, heuristica)
+    if estadisticas is not None:
+        estadisticas["asentados"] = asentados
+        if comparar_dijkstra:
+            estadisticas["asentados_dijkstra"] = _busqueda(G, inicio, fin, lambda nodo: 0.0)[2]
+    return ruta, costo
+
+
+def ruta_mas_rapida(G, inicio, fin, estadisticas=None):
+    """
+    Camino de menor peso entre ``inicio`` y ``fin``. Devuelve ``(ruta, costo)``
+    con una sola búsqueda (A* si los nodos tienen coordenadas, Dijkstra si no),
+    en lugar de una búsqueda para la ruta y otra para su largo.
+    """
+    return a_estrella(G, inicio, fin, estadisticas=estadisticas)
+
+
+def distancias_desde(G, inicio):
+    """
+    Costo mínimo desde ``inicio`` hacia cada nodo alcanzable. Usa Dijkstra
+    si todos los pesos son no negativos (siempre, con tiempos y distancias)
+    y Bellman-Ford solo si hay pesos negativos; en ese caso un ciclo negativo
+    lanza ``nx.NetworkXUnbounded``.
+    """
+    if pesos_no_negativos(G):
+        return nx.single_source_dijkstra_path_length(G, inicio, weight="weight")
+    distancias, _ = nx.single_source_bellman_ford(G, inicio, weight="weight")
+    return distancias
+
+
+def tsp_aproximado(G, inicio, estadisticas=None):
+    """
+    Circuito aproximado que visita todos los nodos y vuelve a ``inicio``.
+
+    Si el grafo es (fuertemente) conexo se trabaja sobre el cierre métrico
+    guardado en disco (sus matrices, sin armar el grafo completo): vecino más
+    cercano, búsqueda local y expansión al camino real. Si no, se usa la
+    heurística de NetworkX sobre la versión no dirigida, como hacía el script
+    original. Si se pasa ``estadisticas`` se anota el tiempo de cada fase y
+    lo que informa ``busqueda_local``.
+    """
+    conexo = nx.is_strongly_connected(G) if G.is_directed() else nx.is_connected(G)
+    if conexo:
+        with fase(estadisticas, "cierre"):
+            W, traducir = preparar_circuito(G, inicio)  # Costos del cierre métrico (leídos de la caché)
+        with fase(estadisticas, "heuristica"):
+            ruta = vecino_mas_cercano(W)
+        with fase(estadisticas, "busqueda_local"):
+            ruta, _ = busqueda_local(W, ruta, estadisticas=estadisticas)  # Pulimos con 2-opt / Or-opt
+        with fase(estadisticas, "expansion"):
+            return traducir(ruta + [0])  # Cada salto se vuelve el camino real que lo realiza
+
+    G_undirected = G.to_undirected()
+    with fase(estadisticas, "heuristica"):
+        ruta = nx.approximation.traveling_salesman_problem(G_undirected, cycle=True, weight="weight")
+    if len(set(ruta)) == len(ruta) - 1:  # Circuito sin nodos repetidos: se puede mejorar localmente
+        with fase(estadisticas, "busqueda_local"):
+            ruta, _ = mejorar_circuito(G_undirected, ruta, estadisticas=estadisticas)
+    return ruta
@@ -0,0 +1,263 @@
+"""
+Cierre métrico (caminos más cortos entre todos los pares) guardado en disco.
+
+Los grafos de ``json_data`` son anillos dispersos: casi ninguna permutación
+usa solo aristas existentes y ``tsp_aproximado`` recalcula el cierre métrico
+en cada llamada. Aquí se calcula una sola vez, por cada peso (``tiempo`` y
+``distancia``), la matriz de costos mínimos y la de predecesores, y se
+guardan como archivos ``.npy`` cuyo nombre es una huella del contenido del
+grafo. Las siguientes ejecuciones (y otros procesos) abren los mismos
+archivos con ``mmap_mode="r"`` en lugar de recalcularlos.
+
+Sobre el cierre todo par de nodos conectados tiene arista, así que los
+solucionadores encuentran circuitos aunque el grafo real sea un anillo;
+``expandir_ruta`` convierte luego cada salto en el camino real por carretera.
+Los solucionadores no arman ese grafo completo: ``preparar_circuito`` les da
+la matriz de costos ya reordenada y la expansión por índices.
+"""
+
+import hashlib  # Huella del contenido del grafo
+import heapq  # Dijkstra desde cada nodo en grafos dispersos
+import json  # Serialización canónica de los nombres de nodo
+import os  # Directorio de caché y reemplazo atómico de archivos
+import tempfile  # Archivos temporales antes de publicar el resultado
+
+import numpy as np  # Matrices de costos y predecesores
+import networkx as nx  # Grafos completos sobre el cierre y conectividad
+
+from .grafo import PESOS, GrafoCompilado, _coincide, matriz_pesos
+
+DIRECTORIO_CACHE = os.environ.get(
+    "RUTAS_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "rutas"))
+DENSIDAD_DIJKSTRA = 0.015  # Fracción de celdas con arista bajo la cual Dijkstra desde cada nodo le gana a Floyd-Warshall
+
+
+def huella(compilado):
+    """Huella SHA-256 de los nodos, la dirección y las dos matrices de pesos."""
+    h = hashlib.sha256()
+    h.update(json.dumps(compilado.nodos, ensure_ascii=False, default=str).encode("utf-8"))
+    h.update(b"dirigido" if compilado.dirigido else b"no dirigido")
+    for peso in PESOS:
+        h.update(np.ascontiguousarray(compilado.matriz(peso), dtype=np.float64).tobytes())
+    return h.hexdigest()
+
+
+def caminos_minimos(W):
+    """
+    Devuelve ``(costos, predecesores)`` donde ``predecesores[i, j]`` es el
+    nodo anterior a ``j`` en el camino mínimo desde ``i`` (``-1`` si no hay
+    camino o si ``i == j``). En grafos dispersos (como los anillos de
+    ``json_data``) corre Dijkstra desde cada nodo; en los densos, o con pesos
+    negativos, Floyd-Warshall vectorizado.
+    """
+    W = np.asarray(W, dtype=np.float64)
+    n = len(W)
+    finitos = np.isfinite(W)
+    if n and finitos.sum() <= DENSIDAD_DIJKSTRA * n * n and not (W[finitos] < 0).any():
+        return _dijkstra_todos(W, finitos)
+    return _floyd_warshall(W)
+
+
+def _dijkstra_todos(W, finitos):
+    """Dijkstra con montículo desde cada nodo sobre las listas de adyacencia de ``W``."""
+    n = len(W)
+    vecinos = [[] for _ in range(n)]
+    for i, j in zip(*np.nonzero(finitos)):
+        if i != j:
+            vecinos[i].append((int(j), W[i, j].item()))
+    costos = np.full((n, n), np.inf)
+    predecesores = np.full((n, n), -1, dtype=np.int32)
+    for origen in range(n):
+        distancia = [np.inf] * n
+        anterior = [-1] * n
+        distancia[origen] = 0.0
+        monticulo = [(0.0, origen)]
+        while monticulo:
+            d, u = heapq.heappop(monticulo)
+            if d > distancia[u]:
+                continue  # Entrada vieja: u ya salió con un costo menor
+            for v, peso in vecinos[u]:
+                nuevo = d + peso
+                if nuevo < distancia[v]:
+                    distancia[v] = nuevo
+                    anterior[v] = u
+                    heapq.heappush(monticulo, (nuevo, v))
+        costos[origen] = distancia
+        predecesores[origen] = anterior
+    return costos, predecesores
+
+
+def _floyd_warshall(W):
+    """Floyd-Warshall vectorizado sobre dos matrices de trabajo que se reutilizan en cada paso."""
+    n = len(W)
+    costos = np.array(W, dtype=np.float64)
+    np.fill_diagonal(costos, 0.0)
+    predecesores = np.where(np.isfinite(costos), np.arange(n)[:, None], -1).astype(np.int32)
+    np.fill_diagonal(predecesores, -1)
+
+    por_k = np.empty_like(costos)
+    mejora = np.empty(costos.shape, dtype=bool)
+    for k in range(n):
+        np.add(costos[:, k, None], costos[None, k, :], out=por_k)  # Pasar por el nodo k
+        np.less(por_k, costos, out=mejora)
+        np.copyto(costos, por_k, where=mejora)
+        np.copyto(predecesores, predecesores[k].copy(), where=mejora)
+
+    return costos, predecesores
+
+
+def _guardar(ruta_archivo, arreglo):
+    """Escribe el arreglo en un temporal y lo publica con un reemplazo atómico."""
+    directorio = os.path.dirname(ruta_archivo)
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".npy")
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            np.save(archivo, arreglo)
+        os.replace(temporal, ruta_archivo)  # Otros procesos nunca ven un archivo a medias
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+
+def cierre_metrico(compilado, peso, directorio=None):
+    """
+    Devuelve ``(costos, predecesores)`` del cierre métrico para ``peso``
+    (``"tiempo"`` o ``"distancia"``) como arreglos mapeados en memoria.
+
+    Si los archivos de esa huella ya existen se abren directamente; si no,
+    se calculan con ``caminos_minimos`` y se guardan en ``directorio``
+    (por defecto ``$RUTAS_CACHE`` o ``~/.cache/rutas``).
+    """
+    directorio = directorio or DIRECTORIO_CACHE
+    os.makedirs(directorio, exist_ok=True)
+    base = os.path.join(directorio, f"{huella(compilado)}_{peso}")
+    archivo_costos = base + "_costos.npy"
+    archivo_predecesores = base + "_predecesores.npy"
+
+    if not (os.path.exists(archivo_costos) and os.path.exists(archivo_predecesores)):
+        costos, predecesores = caminos_minimos(compilado.matriz(peso))
+        _guardar(archivo_costos, costos)
+        _guardar(archivo_predecesores, predecesores)
+
+    return np.load(archivo_costos, mmap_mode="r"), np.load(archivo_predecesores, mmap_mode="r")
+
+
+def grafos_cierre(compilado, directorio=None, pesos=PESOS):
+    """
+    Construye grafos completos sobre el cierre métrico (por defecto
+    ``H_tiempo`` y ``H_distancia``), con el mismo formato que
+    ``cargar_grafo``: cada arista pesa el costo del camino mínimo entre sus
+    extremos. Cada grafo guarda además su matriz de predecesores en
+    ``H.graph["predecesores"]`` para poder usar ``expandir_ruta``. Solo se
+    calcula el cierre de los ``pesos`` pedidos.
+    """
+    n = len(compilado.nodos)
+    cierres = {peso: cierre_metrico(compilado, peso, directorio) for peso in pesos}
+    matrices = {}
+    for peso in PESOS:
+        if peso in cierres:
+            matrices[peso] = np.array(cierres[peso][0])
+            np.fill_diagonal(matrices[peso], np.inf)  # Sin lazos: la diagonal vuelve a ser "sin arista"
+        else:
+            matrices[peso] = np.broadcast_to(np.inf, (n, n))  # Peso no pedido: sin calcular
+    cierre = GrafoCompilado(compilado.nodos, matrices["tiempo"], matrices["distancia"], compilado.dirigido)
+    cierre.aristas = int(np.isfinite(matrices[pesos[0]]).sum()) if pesos else 0
+
+    nodos = compilado.nodos
+    grafos = []
+    for peso in pesos:
+        costos, predecesores = cierres[peso]
+        H = nx.DiGraph() if compilado.dirigido else nx.Graph()
+        H.add_nodes_from(nodos)
+        i, j = np.nonzero(np.isfinite(cierre.matriz(peso)))
+        if not compilado.dirigido:
+            i, j = i[i < j], j[i < j]
+        H.add_weighted_edges_from((nodos[a], nodos[b], costos[a, b].item()) for a, b in zip(i, j))
+        H.graph.update(compilado=cierre, peso=peso, predecesores=predecesores)
+        grafos.append(H)
+
+    return tuple(grafos)
+
+
+def _compilado_de(G):
+    """
+    Forma compilada de ``G`` y el peso que representa. Si ``G`` no trae una
+    que coincida con sus aristas (``compilar=False``, paradas agregadas o
+    quitadas, grafos de NetworkX cualquiera) se arma una con la matriz de
+    ``G`` en el lugar de su peso.
+    """
+    compilado = G.graph.get("compilado")
+    peso = G.graph.get("peso", PESOS[0])
+    if compilado is not None and _coincide(G, compilado):
+        return compilado, peso
+    nodos = list(G)
+    matrices = {p: np.broadcast_to(np.inf, (len(nodos),) * 2) for p in PESOS}
+    matrices[peso] = matriz_pesos(G, nodos)
+    compilado = GrafoCompilado(nodos, matrices["tiempo"], matrices["distancia"], G.is_directed())
+    compilado.aristas = int(np.isfinite(matrices[peso]).sum())
+    return compilado, peso
+
+
+def grafo_cierre(G, directorio=None):
+    """
+    Grafo completo sobre el cierre métrico para el mismo peso que ``G``.
+    Armarlo cuesta ``O(n²)`` objetos de Python aunque el cierre ya esté en
+    disco; los solucionadores usan ``preparar_circuito``, que trabaja sobre
+    las matrices.
+    """
+    compilado, peso = _compilado_de(G)
+    (H,) = grafos_cierre(compilado, directorio, pesos=(peso,))
+    return H
+
+
+def preparar_circuito(G, inicio, directorio=None):
+    """
+    Matriz de trabajo para buscar circuitos desde ``inicio`` (fila y columna
+    0) y función que traduce un circuito de índices de esa matriz a la ruta
+    real.
+
+    Si ``G`` es (fuertemente) conexo la matriz sale directamente de los
+    costos de ``cierre_metrico``, sin armar el grafo completo, y cada salto
+    se expande con sus predecesores. Si no, es la matriz de ``G`` (``inf``
+    donde no hay arista) y los índices se traducen tal cual.
+    """
+    conexo = nx.is_strongly_connected(G) if G.is_directed() else nx.is_connected(G)
+    if not conexo:
+        orden = [inicio] + [nodo for nodo in G.nodes if nodo != inicio]
+        return matriz_pesos(G, orden), lambda indices: [orden[i] for i in indices]
+
+    compilado, peso = _compilado_de(G)
+    costos, predecesores = cierre_metrico(compilado, peso, directorio)
+    n = len(compilado.nodos)
+    k = compilado.indice[inicio]
+    idx = np.concatenate(([k], np.arange(k), np.arange(k + 1, n)))
+    W = costos[np.ix_(idx, idx)]
+    if not compilado.dirigido:
+        # Los dos sentidos pueden diferir por redondeo; simétrica, la búsqueda local usa 2-opt
+        np.minimum(W, W.T, out=W)
+    np.fill_diagonal(W, np.inf)  # Sin lazos, igual que la matriz de un grafo
+    return W, lambda indices: _expandir(predecesores, compilado.nodos, idx[list(indices)].tolist())
+
+
+def _expandir(predecesores, nodos, indices):
+    """Ruta real (con nombres) que recorre los índices ``indices`` por caminos mínimos."""
+    real = [nodos[indices[0]]]
+    for i, j in zip(indices, indices[1:]):
+        destino = j
+        tramo = []
+        while j != i:  # Retrocedemos desde el destino hasta i siguiendo los predecesores
+            tramo.append(nodos[j])
+            j = int(predecesores[i, j])
+            if j < 0:
+                raise ValueError(f"No hay camino de {nodos[i]!r} a {nodos[destino]!r}")
+        real.extend(reversed(tramo))
+    return real
+
+
+def expandir_ruta(H, ruta):
+    """
+    Convierte una ruta sobre el cierre métrico en la ruta real: cada salto
+    ``u -> v`` se reemplaza por el camino mínimo que lo realiza.
+    """
+    indice = H.graph["compilado"].indice
+    return _expandir(H.graph["predecesores"], H.graph["compilado"].nodos, [indice[u] for u in ruta])
@@ -0,0 +1,258 @@
+"""
+Rutas y circuitos cuando el tiempo de viaje depende de la hora de salida.
+
+El script 2 sale a las 3:00 am, pero ``tiempo`` es un número fijo por tramo.
+Con perfiles (``"perfil"`` en los datos, ver ``crear_perfil``) cada arista de
+``G_tiempo`` sabe cuánto tarda según el minuto del día en que se entra en
+ella; las aristas sin perfil tardan siempre su ``"weight"``. Las horas se
+expresan en minutos desde la medianoche (las 3:00 am son ``180``).
+
+- ``llegada_mas_temprana``: Dijkstra / A* donde la etiqueta de cada nodo es
+  la hora de llegada. Como salir más tarde nunca hace llegar antes, basta
+  con llegar lo antes posible a cada nodo intermedio.
+- ``perfil_llegadas``: la hora de llegada en función de la hora de salida
+  dentro de una ventana, como función lineal por tramos; ``mejor_salida``
+  toma de ella la salida con menor duración.
+- ``held_karp_dependiente``: el circuito de ``held_karp`` evaluado con los
+  perfiles (por la misma razón, cada estado guarda su llegada más temprana).
+"""
+
+import heapq  # Colas de prioridad
+import math  # Infinito
+
+import numpy as np  # Perfiles y funciones lineales por tramos
+import networkx as nx  # Errores de caminos inexistentes
+
+from .caminos import _coordenadas, haversine
+from .tsp_exacto import _matriz_pesos
+
+TOLERANCIA = 1e-9  # Diferencia mínima entre funciones de llegada para considerarla mejora
+
+
+def duracion(atributos, salida):
+    """Tiempo de viaje de una arista (sus atributos) si se entra en ella a la hora ``salida``."""
+    perfil = atributos.get("perfil")
+    if perfil is None:
+        return atributos["weight"]
+    return float(np.interp(salida, perfil[0], perfil[1]))
+
+
+def _factor_perfiles(G, coordenadas):
+    """
+    Minutos por km más bajos de cualquier arista a cualquier hora: multiplicado
+    por la distancia en línea recta da una cota inferior para A*. Se guarda
+    en ``G.graph["factor_perfiles"]``; ``cambiar_peso`` lo borra.
+    """
+    if "factor_perfiles" not in G.graph:
+        factor = math.inf
+        for u, v, atributos in G.edges(data=True):
+            recta = haversine(*coordenadas[u], *coordenadas[v])
+            perfil = atributos.get("perfil")
+            minimo = atributos["weight"] if perfil is None else min(atributos["weight"], perfil[1].min())
+            if recta > 0:
+                factor = min(factor, minimo / recta)
+        G.graph["factor_perfiles"] = factor if math.isfinite(factor) else 0.0
+    return G.graph["factor_perfiles"]
+
+
+def llegada_mas_temprana(G, inicio, fin, salida, estadisticas=None):
+    """
+    Ruta que llega antes a ``fin`` saliendo de ``inicio`` a la hora ``salida``.
+    Devuelve ``(ruta, llegada)``. Usa A* si los nodos tienen coordenadas.
+    """
+    if inicio not in G:
+        raise nx.NodeNotFound(f"Node {inicio} not found in graph")
+    if fin not in G:
+        raise nx.NodeNotFound(f"Node {fin} not found in graph")
+    coordenadas = _coordenadas(G)
+    if coordenadas is None:
+        heuristica = lambda nodo: 0.0  # noqa: E731
+    else:
+        factor = _factor_perfiles(G, coordenadas)
+        heuristica = lambda nodo: factor * haversine(*coordenadas[nodo], *coordenadas[fin])  # noqa: E731
+
+    llegada = {inicio: salida}
+    anterior = {inicio: None}
+    asentado = set()
+    cola = [(salida + heuristica(inicio), 0, inicio)]
+    desempate = 0
+    while cola:
+        _, _, u = heapq.heappop(cola)
+        if u in asentado:
+            continue
+        asentado.add(u)
+        if u == fin:
+            break
+        for v, atributos in G[u].items():
+            nueva = llegada[u] + duracion(atributos, llegada[u])
+            if v not in asentado and nueva < llegada.get(v, math.inf):
+                llegada[v] = nueva
+                anterior[v] = u
+                desempate += 1
+                heapq.heappush(cola, (nueva + heuristica(v), desempate, v))
+    else:
+        raise nx.NetworkXNoPath(f"No path between {inicio} and {fin}.")
+
+    if estadisticas is not None:
+        estadisticas["asentados"] = len(asentado)
+    ruta = []
+    nodo = fin
+    while nodo is not None:
+        ruta.append(nodo)
+        nodo = anterior[nodo]
+    return ruta[::-1], llegada[fin]
+
+
+def _componer(xs, ys, atributos):
+    """
+    Llegada tras recorrer la arista, en función de la salida del origen:
+    ``ys(t) + duracion(ys(t))``. Se agregan como quiebres las salidas que
+    llegan a la arista justo en un quiebre de su perfil.
+    """
+    perfil = atributos.get("perfil")
+    if perfil is None:
+        return xs, ys + atributos["weight"]
+    dentro = perfil[0][(perfil[0] > ys[0]) & (perfil[0] < ys[-1])]
+    if len(dentro):  # ys es no decreciente: se invierte interpolando
+        nuevas = np.union1d(xs, np.interp(dentro, ys, xs))
+        xs, ys = nuevas, np.interp(nuevas, xs, ys)
+    return xs, ys + np.interp(ys, perfil[0], perfil[1])
+
+
+def _minimo(a, b):
+    """Mínimo punto a punto de dos funciones lineales por tramos ``(xs, ys)``."""
+    xs = np.union1d(a[0], b[0])
+    ya, yb = np.interp(xs, *a), np.interp(xs, *b)
+    diferencia = ya - yb
+    cruces = np.nonzero(diferencia[:-1] * diferencia[1:] < 0)[0]
+    if len(cruces):
+        t = diferencia[cruces] / (diferencia[cruces] - diferencia[cruces + 1])
+        xs = np.union1d(xs, xs[cruces] + t * (xs[cruces + 1] - xs[cruces]))
+        ya, yb = np.interp(xs, *a), np.interp(xs, *b)
+    return _simplificar(xs, np.minimum(ya, yb))
+
+
+def _simplificar(xs, ys):
+    """Quita los quiebres donde la pendiente no cambia."""
+    if len(xs) <= 2:
+        return xs, ys
+    pendientes = np.diff(ys) / np.diff(xs)
+    quedan = np.concatenate(([True], np.abs(np.diff(pendientes)) > TOLERANCIA, [True]))
+    return xs[quedan], ys[quedan]
+
+
+def perfil_llegadas(G, inicio, fin, desde, hasta):
+    """
+    Hora de llegada más temprana a ``fin`` para cada salida de ``inicio``
+    entre ``desde`` y ``hasta``, como arreglos ``(salidas, llegadas)`` de una
+    función lineal por tramos. Es una búsqueda con corrección de etiquetas
+    donde cada etiqueta es una función completa en lugar de un número.
+    """
+    if inicio not in G:
+        raise nx.NodeNotFound(f"Node {inicio} not found in graph")
+    if fin not in G:
+        raise nx.NodeNotFound(f"Node {fin} not found in graph")
+    ventana = np.array([desde, hasta], dtype=np.float64)
+    etiquetas = {inicio: (ventana, ventana.copy())}  # Llegar al inicio = salir del inicio
+    cola = [(desde, inicio)]
+    while cola:
+        clave, u = heapq.heappop(cola)
+        if clave > etiquetas[u][1].min() + TOLERANCIA:
+            continue  # Entrada vieja: la etiqueta ya mejoró
+        if fin in etiquetas and clave >= etiquetas[fin][1].max():
+            break  # Nada en la cola puede mejorar la llegada al destino
+        for v, atributos in G[u].items():
+            nueva = _componer(*etiquetas[u], atributos)
+            if v in etiquetas:
+                vieja = etiquetas[v]
+                puntos = np.union1d(nueva[0], vieja[0])
+                if not (np.interp(puntos, *nueva) < np.interp(puntos, *vieja) - TOLERANCIA).any():
+                    continue
+                nueva = _minimo(vieja, nueva)
+            etiquetas[v] = nueva
+            heapq.heappush(cola, (nueva[1].min(), v))
+
+    if fin not in etiquetas:
+        raise nx.NetworkXNoPath(f"No path between {inicio} and {fin}.")
+    return etiquetas[fin]
+
+
+def mejor_salida(G, inicio, fin, desde, hasta):
+    """
+    Salida entre ``desde`` y ``hasta`` con el viaje más corto. Devuelve
+    ``(ruta, salida, llegada)``; la duración mínima siempre cae en un quiebre
+    del perfil de llegadas.
+    """
+    salidas, llegadas = perfil_llegadas(G, inicio, fin, desde, hasta)
+    i = int(np.argmin(llegadas - salidas))
+    ruta, llegada = llegada_mas_temprana(G, inicio, fin, float(salidas[i]))
+    return ruta, float(salidas[i]), llegada
+
+
+def evaluar_circuito(G, ruta, salida):
+    """Duración de recorrer ``ruta`` saliendo a la hora ``salida`` (``inf`` si falta una arista)."""
+    hora = salida
+    for u, v in zip(ruta, ruta[1:]):
+        if not G.has_edge(u, v):
+            return math.inf
+        hora += duracion(G[u][v], hora)
+    return hora - salida
+
+
+def held_karp_dependiente(G, inicio, salida):
+    """
+    ``held_karp`` con tiempos dependientes de la hora: ``llegada[mascara, j]``
+    es la hora más temprana a la que se puede terminar en ``j`` habiendo
+    visitado ``mascara``. Devuelve ``(ruta, duracion)`` saliendo a la hora
+    ``salida``, o ``(None, inf)`` si no hay circuito.
+    """
+    orden, W = _matriz_pesos(G, inicio)
+    indice = {nodo: i for i, nodo in enumerate(orden)}
+    perfiles = {(indice[u], indice[v]): p for u, v, p in G.edges(data="perfil") if p is not None}
+    if not G.is_directed():
+        perfiles.update({(j, i): p for (i, j), p in list(perfiles.items())})
+    m = len(orden) - 1
+    if m == 0:  # Grafo de un solo nodo: solo vale un lazo sobre sí mismo
+        if G.has_edge(inicio, inicio):
+            return [inicio, inicio], evaluar_circuito(G, [inicio, inicio], salida)
+        return None, float("inf")
+
+    def llegar(horas, i, j):
+        """Llegada a ``j`` (índice de ``orden``) saliendo de ``i`` a cada una de ``horas``."""
+        if (i, j) in perfiles:
+            perfil = perfiles[(i, j)]
+            return horas + np.interp(horas, perfil[0], perfil[1])
+        return horas + W[i, j]
+
+    total = 1 << m
+    llegada = np.full((total, m), np.inf)
+    padre = np.full((total, m), -1, dtype=np.int16)
+    unitarias = 1 << np.arange(m)
+    llegada[unitarias, np.arange(m)] = [llegar(np.float64(salida), 0, j + 1) for j in range(m)]
+
+    bits = np.zeros(1, dtype=np.int8)
+    for _ in range(m):
+        bits = np.concatenate([bits, bits + 1])
+    mascaras = np.arange(total)
+    for tam in range(2, m + 1):
+        capa = mascaras[bits == tam]
+        for j in range(m):
+            con_j = capa[(capa >> j) & 1 == 1]
+            previas = con_j ^ (1 << j)
+            candidatos = np.column_stack([llegar(llegada[previas, k], k + 1, j + 1) for k in range(m)])
+            mejor_k = np.argmin(candidatos, axis=1)
+            llegada[con_j, j] = candidatos[np.arange(len(con_j)), mejor_k]
+            padre[con_j, j] = mejor_k
+
+    cierre = np.array([llegar(llegada[total - 1, j], j + 1, 0) for j in range(m)])
+    ultimo = int(np.argmin(cierre))
+    if not np.isfinite(cierre[ultimo]):
+        return None, float("inf")
+
+    recorrido = []
+    mascara, j = total - 1, ultimo
+    while j != -1:
+        recorrido.append(orden[j + 1])
+        mascara, j = mascara ^ (1 << j), int(padre[mascara, j])
+    ruta = [inicio] + recorrido[::-1] + [inicio]
+    return ruta, evaluar_circuito(G, ruta, salida)
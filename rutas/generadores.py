@@ -0,0 +1,131 @@
+"""
+Mapas sintéticos con el mismo formato JSON que ``json_data``, para medir
+los solucionadores en tamaños mucho mayores que los 8 destinos reales.
+
+Cada generador devuelve ``(datos, posiciones)``: ``datos`` tiene la forma
+``{origen: {destino: {"tiempo": t, "distancia": d}}}`` y ``posiciones`` la
+de ``POSICIONES`` (nodo -> (latitud, longitud)), listos para
+``cargar_grafo(datos, posiciones=posiciones)``. La distancia de cada tramo
+es la distancia en línea recta por un factor de desvío y el tiempo sale de
+una velocidad aleatoria, así que la heurística de A* sigue siendo válida.
+"""
+
+import math  # Posiciones del anillo y radio de conexión
+import random  # Pesos reproducibles a partir de una semilla
+
+from .caminos import haversine
+
+ORIGEN = (4.6584, -74.0937)  # Las grillas empiezan en la Universidad Sergio Arboleda
+PASO_GRADOS = 0.01  # Separación entre nodos vecinos (~1.1 km)
+
+
+def _tramo(azar, posiciones, u, v):
+    """Pesos de un tramo entre ``u`` y ``v``: km por carretera y minutos."""
+    distancia = haversine(*posiciones[u], *posiciones[v]) * azar.uniform(1.0, 1.4)
+    velocidad = azar.uniform(0.5, 1.5)  # km por minuto (30 a 90 km/h)
+    return {"tiempo": round(distancia / velocidad, 3), "distancia": round(distancia, 3)}
+
+
+def grilla(filas, columnas=None, semilla=0):
+    """
+    Grilla de ``filas x columnas`` nodos (``"f,c"``) unidos con sus vecinos de
+    arriba, abajo, izquierda y derecha. Cada tramo aparece una sola vez en
+    los datos, como en ``json_data``.
+    """
+    columnas = columnas or filas
+    azar = random.Random(semilla)
+    posiciones = {f"{f},{c}": (ORIGEN[0] + f * PASO_GRADOS, ORIGEN[1] + c * PASO_GRADOS)
+                  for f in range(filas) for c in range(columnas)}
+    datos = {}
+    for f in range(filas):
+        for c in range(columnas):
+            nodo = f"{f},{c}"
+            destinos = datos.setdefault(nodo, {})
+            if c + 1 < columnas:
+                destinos[f"{f},{c + 1}"] = _tramo(azar, posiciones, nodo, f"{f},{c + 1}")
+            if f + 1 < filas:
+                destinos[f"{f + 1},{c}"] = _tramo(azar, posiciones, nodo, f"{f + 1},{c}")
+    return datos, posiciones
+
+
+def anillo(n, cuerdas=0, semilla=0):
+    """
+    ``n`` nodos (``"0"`` a ``"n-1"``) en un círculo, cada uno unido al
+    siguiente, como los anillos dispersos de ``json_data``, más ``cuerdas``
+    tramos entre nodos al azar.
+    """
+    azar = random.Random(semilla)
+    radio = n * PASO_GRADOS / (2 * math.pi)  # Vecinos separados por PASO_GRADOS
+    posiciones = {str(i): (ORIGEN[0] + radio * math.sin(2 * math.pi * i / n),
+                           ORIGEN[1] + radio * math.cos(2 * math.pi * i / n)) for i in range(n)}
+    datos = {str(i): {} for i in range(n)}
+    pares = [(i, (i + 1) % n) for i in range(n if n > 2 else n - 1)]
+    while cuerdas > 0 and n > 3:
+        i, j = azar.sample(range(n), 2)
+        if (j - i) % n not in (1, n - 1):
+            pares.append((i, j))
+            cuerdas -= 1
+    for i, j in pares:
+        datos[str(i)][str(j)] = _tramo(azar, posiciones, str(i), str(j))
+    return datos, posiciones
+
+
+def _puntos(azar, n):
+    """``n`` posiciones al azar en un cuadrado con densidad de un nodo por celda de ``PASO_GRADOS``."""
+    lado = PASO_GRADOS * math.sqrt(n)
+    return {str(i): (ORIGEN[0] + azar.uniform(0, lado), ORIGEN[1] + azar.uniform(0, lado)) for i in range(n)}
+
+
+def geometrico_aleatorio(n, radio=None, semilla=0):
+    """
+    ``n`` nodos al azar unidos con todos los que están a menos de ``radio``
+    grados (por defecto el necesario para que el grafo quede conexo con alta
+    probabilidad). Si aun así quedan componentes separadas, cada una se une
+    a su nodo más cercano de otra componente.
+    """
+    azar = random.Random(semilla)
+    posiciones = _puntos(azar, n)
+    if radio is None:
+        radio = PASO_GRADOS * math.sqrt(2 * math.log(max(n, 2)) / math.pi)
+    celdas = {}  # Cuadrícula de lado radio: solo se comparan nodos de celdas vecinas
+    for nodo, (lat, lon) in posiciones.items():
+        celdas.setdefault((int(lat // radio), int(lon // radio)), []).append(nodo)
+
+    padre = {nodo: nodo for nodo in posiciones}
+
+    def raiz(nodo):
+        while padre[nodo] != nodo:
+            padre[nodo] = padre[padre[nodo]]
+            nodo = padre[nodo]
+        return nodo
+
+    datos = {nodo: {} for nodo in posiciones}
+    for (f, c), nodos in celdas.items():
+        for df in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                for v in celdas.get((f + df, c + dc), ()):
+                    for u in nodos:
+                        if int(u) < int(v) and math.dist(posiciones[u], posiciones[v]) < radio:
+                            datos[u][v] = _tramo(azar, posiciones, u, v)
+                            padre[raiz(u)] = raiz(v)
+
+    componentes = {}
+    for nodo in posiciones:
+        componentes.setdefault(raiz(nodo), []).append(nodo)
+    componentes = sorted(componentes.values(), key=len, reverse=True)
+    principal = list(componentes[0]) if componentes else []
+    for componente in componentes[1:]:
+        u, v = min(((u, v) for u in componente for v in principal),
+                   key=lambda par: math.dist(posiciones[par[0]], posiciones[par[1]]))
+        datos[u][v] = _tramo(azar, posiciones, u, v)
+        principal.extend(componente)
+    return datos, posiciones
+
+
+def completo(n, semilla=0):
+    """``n`` nodos al azar con un tramo directo entre cada par (``n(n-1)/2`` tramos)."""
+    azar = random.Random(semilla)
+    posiciones = _puntos(azar, n)
+    nodos = list(posiciones)
+    datos = {u: {v: _tramo(azar, posiciones, u, v) for v in nodos[i + 1:]} for i, u in enumerate(nodos)}
+    return datos, posiciones
@@ -0,0 +1,145 @@
+"""
+Gráficas de rutas sin pantalla, para servidores y lotes grandes.
+
+``graficar_ruta`` en los scripts importa pyplot al cargar el módulo, vuelve
+a dibujar el grafo completo para cada ruta y termina en ``plt.show()``, que
+se bloquea (o falla) en un servidor. ``RenderizadorRutas`` usa el backend
+Agg sin pyplot (matplotlib se importa solo al crear el primer renderizador),
+dibuja el grafo base una única vez y lo guarda como fondo; cada ruta solo
+agrega sus aristas y los números de orden de visita encima del fondo y se
+devuelve como bytes PNG o SVG. No se crean figuras globales, así que no
+quedan figuras abiertas aunque se generen miles de imágenes.
+"""
+
+import io  # Las imágenes se devuelven como bytes
+import weakref  # Un renderizador por grafo sin impedir que el grafo se libere
+
+import networkx as nx  # Dibujo del grafo base y de las aristas de la ruta
+
+from .grafo import POSICIONES, huella_grafo
+
+# Estilo de los scripts 3 y 4
+ESTILO_BASE = {"node_color": "lightgray", "node_size": 1500, "font_size": 9, "edge_color": "gray"}
+
+_renderizadores = weakref.WeakKeyDictionary()  # Grafo -> (huella, RenderizadorRutas) ya construido
+
+
+def posiciones_de(G, posiciones=None):
+    """
+    Posiciones para dibujar ``G``: las coordenadas conocidas (``POSICIONES``
+    por defecto) y, si falta alguna, una distribución ``spring_layout`` fija.
+    """
+    posiciones = POSICIONES if posiciones is None else posiciones
+    if all(nodo in posiciones for nodo in G.nodes):
+        return {nodo: posiciones[nodo] for nodo in G.nodes}
+    return nx.spring_layout(G, seed=42)
+
+
+class RenderizadorRutas:
+    """
+    Dibuja rutas sobre un mismo grafo reutilizando el dibujo del grafo base.
+
+    ``renderizar(ruta, titulo, color)`` devuelve los bytes de la imagen;
+    ``renderizar_lote`` hace lo mismo para muchas rutas. Al terminar se puede
+    llamar a ``cerrar()`` (o usarlo con ``with``) para soltar la figura.
+    """
+
+    def __init__(self, G, posiciones=None, figsize=(10, 7), dpi=100, etiquetas_pesos=False, **estilo):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg  # Import diferido
+        from matplotlib.figure import Figure
+
+        # Solo se guarda la estructura, sin los pesos ni una referencia al grafo original
+        self.G = G.__class__()
+        self.G.add_nodes_from(G)
+        self.G.add_edges_from(G.edges())
+        self.pos = posiciones_de(G, posiciones)
+        self.figura = Figure(figsize=figsize, dpi=dpi)
+        self.lienzo = FigureCanvasAgg(self.figura)
+        self.ejes = self.figura.add_subplot()
+
+        # Grafo base: se dibuja una sola vez
+        nx.draw_networkx(G, self.pos, ax=self.ejes, with_labels=True, **{**ESTILO_BASE, **estilo})
+        if etiquetas_pesos:
+            etiquetas = nx.get_edge_attributes(G, "weight")
+            nx.draw_networkx_edge_labels(G, self.pos, edge_labels=etiquetas, font_size=8, ax=self.ejes)
+        self.ejes.set_axis_off()
+        self.lienzo.draw()
+        self._fondo = self.lienzo.copy_from_bbox(self.figura.bbox)  # Píxeles del grafo base
+
+    def _capas(self, ruta, titulo, color, numerar):
+        """Agrega al dibujo las aristas de la ruta, su numeración y el título."""
+        aristas = nx.draw_networkx_edges(
+            self.G, self.pos, edgelist=list(zip(ruta, ruta[1:])), ax=self.ejes,
+            edge_color=color, width=2.5, style="solid" if color == "red" else "dashed")
+        capas = list(aristas) if isinstance(aristas, list) else [aristas]
+        if numerar:
+            for i, nodo in enumerate(ruta):
+                x, y = self.pos[nodo]
+                capas.append(self.ejes.text(x, y + 0.02, str(i + 1), fontsize=12,
+                                            fontweight="bold", color=color))
+        capas.append(self.ejes.set_title(titulo))
+        return capas
+
+    def renderizar(self, ruta, titulo="", color="red", formato="png", numerar=True):
+        """Devuelve los bytes (``"png"`` o ``"svg"``) del grafo con la ruta resaltada."""
+        capas = self._capas(ruta or [], titulo, color, numerar)
+        try:
+            if formato == "png":
+                # Se restaura el fondo y solo se pintan las capas nuevas
+                self.lienzo.restore_region(self._fondo)
+                for capa in capas:
+                    self.ejes.draw_artist(capa)
+                return _png(self.lienzo.buffer_rgba())
+            salida = io.BytesIO()
+            self.figura.savefig(salida, format=formato)  # Formatos vectoriales: se dibuja todo
+            return salida.getvalue()
+        finally:
+            for capa in capas[:-1]:
+                capa.remove()
+            self.ejes.set_title("")
+
+    def renderizar_lote(self, rutas, formato="png"):
+        """``rutas`` es una lista de ``(ruta, titulo, color)``; devuelve una lista de bytes."""
+        return [self.renderizar(ruta, titulo, color, formato) for ruta, titulo, color in rutas]
+
+    def cerrar(self):
+        """Suelta la figura (no hay pyplot, así que basta con limpiarla)."""
+        self.figura.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *error):
+        self.cerrar()
+
+
+def _png(rgba):
+    """Codifica el búfer RGBA del lienzo como PNG."""
+    import numpy as np  # Solo hace falta al codificar
+    from matplotlib.image import imsave
+
+    salida = io.BytesIO()
+    # Compresión baja: codificar domina el tiempo y el tamaño apenas cambia en estos dibujos
+    imsave(salida, np.asarray(rgba), format="png", pil_kwargs={"compress_level": 1})
+    return salida.getvalue()
+
+
+def renderizador(G, **opciones):
+    """
+    Renderizador guardado para ``G`` (se crea la primera vez), de modo que
+    varias llamadas sobre el mismo grafo reutilizan el mismo fondo. Si el
+    grafo cambió desde entonces (otra huella, por ejemplo tras
+    ``agregar_parada``) se vuelve a dibujar el fondo.
+    """
+    huella = huella_grafo(G)
+    guardado = _renderizadores.get(G)
+    if guardado is None or guardado[0] != huella:
+        if guardado is not None:
+            guardado[1].cerrar()
+        guardado = _renderizadores[G] = (huella, RenderizadorRutas(G, **opciones))
+    return guardado[1]
+
+
+def graficar_ruta_imagen(G, ruta, titulo, color, formato="png"):
+    """Atajo con la firma de ``graficar_ruta`` que devuelve la imagen en bytes."""
+    return renderizador(G).renderizar(ruta, titulo, color, formato)
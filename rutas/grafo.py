@@ -0,0 +1,295 @@
+"""
+Carga de los datos JSON de destinos en grafos de NetworkX y en una forma
+compilada con matrices densas de NumPy.
+
+Los datos tienen la forma ``{origen: {destino: {"tiempo": t, "distancia": d}}}``.
+Cada tramo puede traer además ``"perfil": [[salida, tiempo], ...]``: el
+tiempo de viaje según el minuto del día en que se sale (lineal entre puntos,
+constante antes del primero y después del último), que se guarda en el
+atributo ``"perfil"`` de las aristas de ``G_tiempo``.
+``cargar_grafo`` recorre esos datos una sola vez y construye a la vez los dos
+grafos de siempre (``G_tiempo`` y ``G_distancia``) y un ``GrafoCompilado``
+con un índice por nodo y las matrices de tiempo y distancia (infinito donde
+no hay conexión). Los solucionadores usan las matrices en lugar de consultar
+``G[u][v]["weight"]`` arista por arista.
+"""
+
+import hashlib  # Huella de los datos
+import json  # Serialización canónica de los datos
+
+import numpy as np  # Matrices densas de pesos
+import networkx as nx  # Grafos que usan los scripts
+
+PESOS = ("tiempo", "distancia")  # Atributos de peso presentes en los datos
+
+# Coordenadas aproximadas (latitud, longitud) de los destinos de json_data
+POSICIONES = {
+    "Universidad Sergio Arboleda": (4.6584, -74.0937),
+    "Parque Principal Soacha": (4.5773, -74.2144),
+    "Parque Principal Villavicencio": (4.1420, -73.6266),
+    "Parque Principal Tunja": (5.5353, -73.3672),
+    "Parque Principal Toca": (5.5646, -73.1818),
+    "Parque Principal Cajica": (4.9226, -74.0273),
+    "Parque Principal La Vega": (5.0101, -74.3445),
+    "Parque Principal La Calera": (4.6926, -73.9630),
+}
+
+
+class GrafoCompilado:
+    """
+    Representación compacta de los datos: ``nodos`` es la lista de nombres,
+    ``indice`` traduce cada nombre a su posición y ``tiempo`` / ``distancia``
+    son matrices contiguas de ``float64`` con ``inf`` donde no hay arista.
+    """
+
+    def __init__(self, nodos, tiempo, distancia, dirigido=False):
+        self.nodos = list(nodos)
+        self.indice = {nodo: i for i, nodo in enumerate(self.nodos)}
+        self.tiempo = tiempo
+        self.distancia = distancia
+        self.dirigido = dirigido
+        self.aristas = int(np.isfinite(tiempo).sum())  # Aristas dirigidas guardadas
+
+    def matriz(self, peso):
+        """Devuelve la matriz del atributo ``"tiempo"`` o ``"distancia"``."""
+        if peso not in PESOS:
+            raise ValueError(f"Peso desconocido: {peso!r}")
+        return getattr(self, peso)
+
+    def submatriz(self, peso, orden):
+        """Matriz de ``peso`` reordenada según la lista de nombres ``orden``."""
+        idx = np.fromiter((self.indice[nodo] for nodo in orden), dtype=np.intp, count=len(orden))
+        return self.matriz(peso)[np.ix_(idx, idx)]
+
+
+def crear_perfil(puntos):
+    """
+    Convierte ``[[salida, tiempo], ...]`` en un arreglo ``(2, k)`` de
+    ``float64`` (fila 0: minutos de salida, fila 1: tiempos de viaje). Exige
+    salidas crecientes y que salir más tarde nunca haga llegar antes
+    (pendiente >= -1), condición que necesitan las búsquedas dependientes del
+    tiempo.
+    """
+    perfil = np.array(puntos, dtype=np.float64).T
+    if perfil.ndim != 2 or perfil.shape[0] != 2 or perfil.shape[1] == 0:
+        raise ValueError("El perfil debe ser una lista de pares [salida, tiempo]")
+    salidas, tiempos = perfil
+    if (np.diff(salidas) <= 0).any():
+        raise ValueError("Las salidas del perfil deben ser crecientes")
+    if (tiempos < 0).any() or (np.diff(tiempos) / np.diff(salidas) < -1).any():
+        raise ValueError("Perfil inválido: salir más tarde no puede hacer llegar antes")
+    return np.ascontiguousarray(perfil)
+
+
+def _indexar_nodos(datos):
+    """Asigna un índice a cada nodo en el orden en que aparece en los datos."""
+    indice = {}
+    for origen, destinos in datos.items():
+        indice.setdefault(origen, len(indice))
+        for destino in destinos:
+            indice.setdefault(destino, len(indice))
+    return indice
+
+
+def cargar_grafo(datos, dirigido=False, posiciones=None, compilar=True):
+    """
+    Crea los grafos de tiempo y distancia a partir de los datos JSON.
+
+    Además, cada grafo guarda en ``G.graph["compilado"]`` el mismo
+    ``GrafoCompilado`` y en ``G.graph["peso"]`` qué atributo representa su
+    ``"weight"``, para que los solucionadores tomen la matriz ya construida.
+    Si se pasan ``posiciones`` (nodo -> (latitud, longitud), como
+    ``POSICIONES``), cada nodo guarda sus atributos ``"lat"`` y ``"lon"``.
+    Con ``compilar=False`` no se construyen las matrices densas (que ocupan
+    ``n²`` celdas), para mapas grandes que solo se consultan por caminos.
+    """
+    clase = nx.DiGraph if dirigido else nx.Graph
+    G_tiempo = clase()  # Grafo donde las aristas representan tiempo de viaje
+    G_distancia = clase()  # Grafo donde las aristas representan distancia en km
+
+    indice = _indexar_nodos(datos)
+    n = len(indice)
+    if compilar:
+        tiempo = np.full((n, n), np.inf)
+        distancia = np.full((n, n), np.inf)
+
+    # Una sola pasada: llenamos los grafos y las matrices a la vez
+    for origen, destinos in datos.items():
+        i = indice[origen]
+        for destino, valores in destinos.items():
+            j = indice[destino]
+            G_tiempo.add_edge(origen, destino, weight=valores["tiempo"])
+            G_distancia.add_edge(origen, destino, weight=valores["distancia"])
+            if "perfil" in valores:
+                G_tiempo[origen][destino]["perfil"] = crear_perfil(valores["perfil"])
+            if not compilar:
+                continue
+            tiempo[i, j] = valores["tiempo"]
+            distancia[i, j] = valores["distancia"]
+            if not dirigido:  # En el grafo no dirigido la última arista leída gana, igual que en NetworkX
+                tiempo[j, i] = valores["tiempo"]
+                distancia[j, i] = valores["distancia"]
+
+    if posiciones:
+        for G in (G_tiempo, G_distancia):
+            for nodo in G.nodes:
+                if nodo in posiciones:
+                    G.nodes[nodo]["lat"], G.nodes[nodo]["lon"] = posiciones[nodo]
+
+    G_tiempo.graph["peso"] = "tiempo"
+    G_distancia.graph["peso"] = "distancia"
+    if compilar:
+        compilado = GrafoCompilado(list(indice), tiempo, distancia, dirigido)
+        G_tiempo.graph["compilado"] = G_distancia.graph["compilado"] = compilado
+
+    return G_tiempo, G_distancia
+
+
+def compilar_grafo(datos, dirigido=False):
+    """Devuelve solo el ``GrafoCompilado`` de los datos JSON."""
+    G_tiempo, _ = cargar_grafo(datos, dirigido)
+    return G_tiempo.graph["compilado"]
+
+
+def huella_datos(datos, dirigido=False):
+    """
+    Huella SHA-256 de los datos JSON, independiente del orden de las claves,
+    para reconocer el mismo mapa aunque llegue serializado de otra forma.
+    """
+    canonico = json.dumps(datos, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    h = hashlib.sha256(canonico.encode("utf-8"))
+    h.update(b"dirigido" if dirigido else b"no dirigido")
+    return h.hexdigest()
+
+
+def huella_grafo(G):
+    """
+    Huella SHA-256 de un grafo ya construido: dirección, nodos y cada arista
+    con su ``"weight"`` (y su ``"perfil"``, si tiene). Se calcula una vez y se guarda en ``G.graph["huella"]``;
+    ``cambiar_peso`` la borra para que se vuelva a calcular.
+    """
+    if "huella" not in G.graph:
+        h = hashlib.sha256(b"dirigido" if G.is_directed() else b"no dirigido")
+        h.update(json.dumps(list(G.nodes()), ensure_ascii=False, default=str).encode("utf-8"))
+        aristas = [(u, v, d.get("weight")) + ((d["perfil"].tolist(),) if "perfil" in d else ())
+                   for u, v, d in G.edges(data=True)]
+        h.update(json.dumps(aristas, ensure_ascii=False, default=str).encode("utf-8"))
+        G.graph["huella"] = h.hexdigest()
+    return G.graph["huella"]
+
+
+def cambiar_peso(G, origen, destino, valor):
+    """
+    Cambia el ``"weight"`` de una arista existente manteniendo al día la
+    matriz compilada y la huella del grafo (que identifica sus resultados en
+    la caché).
+    """
+    G[origen][destino]["weight"] = valor
+    compilado = G.graph.get("compilado")
+    if compilado is not None:
+        matriz = compilado.matriz(G.graph["peso"])
+        i, j = compilado.indice[origen], compilado.indice[destino]
+        matriz[i, j] = valor
+        if not G.is_directed():
+            matriz[j, i] = valor
+    _invalidar(G)
+
+
+def _invalidar(G):
+    """Borra lo que se calculó a partir de los pesos o la forma del grafo."""
+    G.graph.pop("huella", None)
+    G.graph.pop("factor_heuristica", None)  # La cota de A* depende de los pesos
+    G.graph.pop("factor_perfiles", None)
+    G.graph.pop("jerarquia", None)  # Se vuelve a construir (o leer) con la nueva huella
+
+
+def agregar_parada(G, nodo, tramos, entrantes=None):
+    """
+    Agrega ``nodo`` con sus tramos ``{destino: peso}`` (en el atributo que
+    representa ``G``) sin volver a cargar los datos. En un grafo dirigido
+    ``entrantes`` da los tramos ``{origen: peso}`` que llegan a él. La matriz
+    compilada deja de usarse para este grafo, ya que no tiene la nueva fila.
+    """
+    for destino, peso in tramos.items():
+        G.add_edge(nodo, destino, weight=peso)
+    for origen, peso in (entrantes or {}).items():
+        G.add_edge(origen, nodo, weight=peso)
+    G.graph.pop("compilado", None)
+    _invalidar(G)
+
+
+def quitar_parada(G, nodo):
+    """Quita ``nodo`` y sus tramos, con las mismas precauciones que ``agregar_parada``."""
+    G.remove_node(nodo)
+    G.graph.pop("compilado", None)
+    _invalidar(G)
+
+
+def matriz_pesos(G, orden, weight="weight"):
+    """
+    Matriz de pesos de ``G`` con filas y columnas en el orden de ``orden``.
+
+    Si el grafo viene de ``cargar_grafo`` y no se le han agregado ni quitado
+    aristas, se reutiliza la matriz compilada; en otro caso se construye con
+    ``nx.to_numpy_array``. Los cambios de peso conviene hacerlos con
+    ``cambiar_peso``, que mantiene la matriz compilada al día; si se edita
+    ``G[u][v]["weight"]`` a mano ``_coincide`` lo nota y se deja de usar.
+    """
+    compilado = G.graph.get("compilado")
+    peso = G.graph.get("peso")
+    if compilado is not None and weight == "weight" and _coincide(G, compilado):
+        return compilado.submatriz(peso, orden)
+    return nx.to_numpy_array(G, nodelist=orden, weight=weight, nonedge=np.inf)
+
+
+def _coincide(G, compilado):
+    """
+    Comprueba que la forma compilada siga representando a ``G``: los mismos
+    nodos y, para cada arista, una celda con el mismo ``"weight"`` (y
+    ninguna celda finita de más). Recorre las aristas una sola vez sin armar
+    la matriz, así que también detecta aristas agregadas o quitadas con
+    ``G.add_edge`` / ``G.remove_edge`` y pesos editados a mano.
+    """
+    indice = compilado.indice
+    if G.number_of_nodes() != len(indice) or any(nodo not in indice for nodo in G):
+        return False
+    aristas = G.number_of_edges()
+    if not G.is_directed():
+        # Cada arista no dirigida ocupa dos celdas, salvo los lazos
+        lazos = nx.number_of_selfloops(G)
+        aristas = 2 * aristas - lazos
+    if aristas != compilado.aristas:
+        return False
+    if not aristas:
+        return True
+
+    filas, columnas, pesos = zip(*((indice[u], indice[v], peso)
+                                   for u, v, peso in G.edges(data="weight", default=1)))
+    filas, columnas = np.array(filas), np.array(columnas)
+    pesos = np.array(pesos, dtype=np.float64)
+    matriz = compilado.matriz(G.graph.get("peso", PESOS[0]))
+    if not np.array_equal(matriz[filas, columnas], pesos):
+        return False
+    return G.is_directed() or np.array_equal(matriz[columnas, filas], pesos)
+
+
+def pesos_no_negativos(G):
+    """
+    Indica si ningún ``"weight"`` de ``G`` es negativo (condición para usar
+    Dijkstra). Con la forma compilada basta revisar la matriz.
+    """
+    compilado = G.graph.get("compilado")
+    if compilado is not None and _coincide(G, compilado):
+        return not (compilado.matriz(G.graph["peso"]) < 0).any()
+    return all(peso >= 0 for _, _, peso in G.edges(data="weight", default=1))
+
+
+def evaluar_rutas(W, rutas):
+    """
+    Calcula el peso de muchas rutas a la vez. ``rutas`` es un arreglo de
+    enteros de forma ``(k, largo)`` con índices de nodo; el resultado es un
+    vector de ``k`` pesos, con ``inf`` para las rutas que usan una arista
+    inexistente.
+    """
+    rutas = np.asarray(rutas)
+    return W[rutas[:, :-1], rutas[:, 1:]].sum(axis=1)
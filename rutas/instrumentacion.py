@@ -0,0 +1,43 @@
+"""
+Contadores y cronómetros opcionales para los solucionadores.
+
+Los solucionadores reciben ``estadisticas=None``; solo cuando se pasa un
+diccionario anotan en él. ``fase`` y ``contar`` siguen la misma regla: con
+``None`` no hacen nada (``fase`` devuelve siempre el mismo contexto vacío),
+así que dejarlos en el código no cuesta nada cuando no se mide.
+"""
+
+import time  # Cronómetros de cada fase
+from contextlib import nullcontext  # Contexto vacío cuando no se mide
+
+_SIN_MEDIR = nullcontext()
+
+
+class _Fase:
+    """Suma los segundos del bloque en ``estadisticas["fases"][nombre]``."""
+
+    __slots__ = ("estadisticas", "nombre", "inicio")
+
+    def __init__(self, estadisticas, nombre):
+        self.estadisticas = estadisticas
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        fases = self.estadisticas.setdefault("fases", {})
+        fases[self.nombre] = fases.get(self.nombre, 0.0) + time.perf_counter() - self.inicio
+        return False
+
+
+def fase(estadisticas, nombre):
+    """Cronómetro para ``with fase(estadisticas, "nombre"):``; no mide si ``estadisticas`` es ``None``."""
+    return _SIN_MEDIR if estadisticas is None else _Fase(estadisticas, nombre)
+
+
+def contar(estadisticas, clave, cantidad=1):
+    """Suma ``cantidad`` a ``estadisticas[clave]`` si se está midiendo."""
+    if estadisticas is not None:
+        estadisticas[clave] = estadisticas.get(clave, 0) + cantidad
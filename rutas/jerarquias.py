@@ -0,0 +1,413 @@
+"""
+Jerarquías de contracción para consultas repetidas de camino mínimo.
+
+``ruta_mas_rapida`` hace una búsqueda completa en cada consulta. Cuando el
+mismo mapa recibe miles de consultas conviene preprocesarlo una vez:
+
+1. Se contraen los nodos uno a uno, de menos a más importante (diferencia
+   de aristas, vecinos ya contraídos y nivel en la jerarquía, con
+   actualización perezosa). Al quitar ``v`` se agrega un atajo ``u -> x``
+   por cada par de vecinos cuyo camino mínimo pasaba por ``v`` (una búsqueda
+   local de "testigos" descarta los que no hacen falta). Cada atajo recuerda
+   el nodo ``medio`` que reemplaza.
+2. Las aristas que suben de rango forman dos grafos pequeños: ``salida``
+   (aristas ``u -> v`` con ``rango[v] > rango[u]``) y ``entrada`` (aristas
+   ``u -> v`` con ``rango[u] > rango[v]``, guardadas en la fila de ``v``).
+3. Una consulta es una búsqueda bidireccional que solo sube: hacia adelante
+   desde el inicio por ``salida`` y hacia atrás desde el fin por ``entrada``.
+   Un nodo al que se llega más barato bajando desde otro ya visitado no se
+   expande (detención a pedido). La ruta se obtiene desplegando los atajos
+   por su ``medio``.
+
+La jerarquía se guarda como arreglos CSR de NumPy en un ``.npz`` cuyo nombre
+es la huella del grafo (``huella_grafo``), en el mismo directorio de caché
+que el cierre métrico. Hay una jerarquía por peso: una para ``G_tiempo`` y
+otra para ``G_distancia``.
+
+Sobre la misma jerarquía, ``matrices_viaje`` calcula las matrices completas
+origen x destino de tiempo y distancia (``float32``) con el método de cubetas,
+compartiendo las búsquedas entre todos los pares.
+"""
+
+import heapq  # Colas de prioridad de la contracción y de las consultas
+import json  # Nombres de los nodos dentro del archivo
+import math  # Infinito
+import os  # Directorio de caché
+import tempfile  # Escritura atómica
+
+import numpy as np  # Arreglos CSR de la jerarquía
+import networkx as nx  # Errores de caminos inexistentes
+
+from .cierre_metrico import DIRECTORIO_CACHE
+from .grafo import huella_grafo
+
+
+class JerarquiaContraccion:
+    """
+    Jerarquía ya construida. ``consulta(inicio, fin)`` devuelve ``(ruta, costo)``
+    y ``costo(inicio, fin)`` solo el costo; ambas lanzan ``nx.NetworkXNoPath``
+    si no hay camino, igual que ``a_estrella``.
+    """
+
+    def __init__(self, nodos, rango, salida, entrada):
+        self.nodos = list(nodos)
+        self.indice = {nodo: i for i, nodo in enumerate(self.nodos)}
+        self.rango = rango
+        self.salida = salida  # (desplazamientos, destinos, pesos, medios)
+        self.entrada = entrada
+        self._listas = None
+
+    def _filas(self):
+        """
+        Por cada lado, una lista con las aristas ``(destino, peso, medio)`` de
+        cada nodo: recorrer tuplas de Python es mucho más rápido que indexar NumPy.
+        """
+        if self._listas is None:
+            self._rangos = self.rango.tolist()
+            self._listas = []
+            for desplazamientos, destinos, pesos, medios in (self.salida, self.entrada):
+                aristas = list(zip(destinos.tolist(), pesos.tolist(), medios.tolist()))
+                limites = desplazamientos.tolist()
+                self._listas.append([aristas[a:b] for a, b in zip(limites, limites[1:])])
+        return self._listas
+
+    def _indice(self, nodo):
+        if nodo not in self.indice:
+            raise nx.NodeNotFound(f"Node {nodo} not found in graph")
+        return self.indice[nodo]
+
+    def _buscar(self, s, t, estadisticas=None):
+        """Búsqueda bidireccional ascendente; devuelve ``(costo, encuentro, previos)``."""
+        filas = self._filas()
+        distancias = ({s: 0.0}, {t: 0.0})
+        previos = ({s: None}, {t: None})  # nodo -> (nodo anterior, medio de la arista)
+        colas = ([(0.0, s)], [(0.0, t)])
+        mejor, encuentro = (0.0, s) if s == t else (math.inf, None)
+        asentados = 0
+
+        while colas[0] or colas[1]:
+            for lado in (0, 1):
+                cola = colas[lado]
+                if not cola:
+                    continue
+                d, u = heapq.heappop(cola)
+                if d >= mejor:
+                    cola.clear()  # Este lado ya no puede mejorar el encuentro
+                    continue
+                distancia = distancias[lado]
+                if d > distancia[u]:
+                    continue
+                asentados += 1
+                otra = distancias[1 - lado]
+                if u in otra and d + otra[u] < mejor:
+                    mejor, encuentro = d + otra[u], u
+                # Detención: si se llega a u más barato bajando desde un nodo más alto, u no
+                # está en ningún camino mínimo de esta búsqueda y no vale la pena expandirlo
+                detenido = False
+                for w, peso, _ in filas[1 - lado][u]:
+                    if w in distancia and distancia[w] + peso < d:
+                        detenido = True
+                        break
+                if detenido:
+                    continue
+                previo = previos[lado]
+                for v, peso, medio in filas[lado][u]:
+                    nuevo = d + peso
+                    if nuevo < distancia.get(v, math.inf):
+                        distancia[v] = nuevo
+                        previo[v] = (u, medio)
+                        heapq.heappush(cola, (nuevo, v))
+
+        if estadisticas is not None:
+            estadisticas["asentados"] = asentados
+        return mejor, encuentro, previos
+
+    def costo(self, inicio, fin):
+        """Costo mínimo de ``inicio`` a ``fin``."""
+        mejor, encuentro, _ = self._buscar(self._indice(inicio), self._indice(fin))
+        if encuentro is None:
+            raise nx.NetworkXNoPath(f"No path between {inicio} and {fin}.")
+        return mejor
+
+    def consulta(self, inicio, fin, estadisticas=None):
+        """Camino mínimo ``(ruta, costo)`` de ``inicio`` a ``fin``, con los atajos desplegados."""
+        mejor, encuentro, (adelante, atras) = self._buscar(
+            self._indice(inicio), self._indice(fin), estadisticas)
+        if encuentro is None:
+            raise nx.NetworkXNoPath(f"No path between {inicio} and {fin}.")
+
+        # Aristas de la jerarquía: del inicio al encuentro y del encuentro al fin
+        aristas = []
+        v = encuentro
+        while adelante[v] is not None:
+            u, medio = adelante[v]
+            aristas.append((u, v, medio))
+            v = u
+        aristas.reverse()
+        u = encuentro
+        while atras[u] is not None:
+            v, medio = atras[u]
+            aristas.append((u, v, medio))
+            u = v
+
+        ruta = [self._indice(inicio)]
+        for u, v, medio in aristas:
+            ruta.extend(self._desplegar(u, v, medio))
+        return [self.nodos[i] for i in ruta], mejor
+
+    def _espacio(self, raiz, lado):
+        """
+        Búsqueda ascendente completa desde ``raiz`` por ``salida`` (``lado=0``)
+        o ``entrada`` (``lado=1``). Devuelve los nodos asentados sin detener y
+        su distancia: todo camino mínimo pasa por el más alto de sus nodos, que
+        está en el espacio de búsqueda de ambos extremos.
+        """
+        filas, otras = self._filas()[lado], self._filas()[1 - lado]
+        distancia = {raiz: 0.0}
+        cola = [(0.0, raiz)]
+        espacio = []
+        while cola:
+            d, u = heapq.heappop(cola)
+            if d > distancia[u]:
+                continue
+            if any(w in distancia and distancia[w] + peso < d for w, peso, _ in otras[u]):
+                continue  # Detenido: no es parte de ningún camino mínimo desde la raíz
+            espacio.append((u, d))
+            for v, peso, _ in filas[u]:
+                nuevo = d + peso
+                if nuevo < distancia.get(v, math.inf):
+                    distancia[v] = nuevo
+                    heapq.heappush(cola, (nuevo, v))
+        return espacio
+
+    def matriz(self, origenes, destinos):
+        """
+        Costos mínimos de cada origen a cada destino como matriz ``float32``
+        (``inf`` donde no hay camino), con el método de cubetas: una búsqueda
+        hacia atrás por destino deja ``(columna, distancia)`` en la cubeta de
+        cada nodo que visita y una búsqueda hacia adelante por origen recorre
+        solo las cubetas de sus nodos. Son ``len(origenes) + len(destinos)``
+        búsquedas pequeñas en lugar de una por par.
+        """
+        filas = [self._indice(nodo) for nodo in origenes]
+        columnas = [self._indice(nodo) for nodo in destinos]
+        cubetas = {}
+        for j, t in enumerate(columnas):
+            for v, d in self._espacio(t, 1):
+                cubetas.setdefault(v, []).append((j, d))
+
+        resultado = np.full((len(filas), len(columnas)), np.inf, dtype=np.float32)
+        for i, s in enumerate(filas):
+            mejor = [math.inf] * len(columnas)
+            for u, d in self._espacio(s, 0):
+                for j, resto in cubetas.get(u, ()):
+                    if d + resto < mejor[j]:
+                        mejor[j] = d + resto
+            resultado[i] = mejor
+        return resultado
+
+    def _medio(self, u, v):
+        """Nodo ``medio`` de la arista ``u -> v`` de la jerarquía (``-1`` si es original)."""
+        filas = self._filas()
+        if self._rangos[u] < self._rangos[v]:
+            fila, buscado = filas[0][u], v
+        else:
+            fila, buscado = filas[1][v], u
+        for destino, _, medio in fila:
+            if destino == buscado:
+                return medio
+        raise KeyError((u, v))
+
+    def _desplegar(self, u, v, medio):
+        """Nodos reales que recorre la arista ``u -> v`` (sin incluir ``u``)."""
+        tramo = []
+        pila = [(u, v, medio)]
+        while pila:
+            a, b, m = pila.pop()
+            if m < 0:
+                tramo.append(b)
+            else:  # El atajo a -> b reemplaza a -> m -> b; se despliega primero a -> m
+                pila.append((m, b, self._medio(m, b)))
+                pila.append((a, m, self._medio(a, m)))
+        return tramo
+
+    def guardar(self, archivo):
+        """Guarda la jerarquía en un ``.npz`` (reemplazo atómico)."""
+        arreglos = {"nodos": np.frombuffer(json.dumps(self.nodos, ensure_ascii=False).encode("utf-8"),
+                                           dtype=np.uint8),
+                    "rango": self.rango}
+        for nombre, lado in (("salida", self.salida), ("entrada", self.entrada)):
+            for campo, arreglo in zip(("desplazamientos", "destinos", "pesos", "medios"), lado):
+                arreglos[f"{nombre}_{campo}"] = arreglo
+        descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(archivo) or ".", suffix=".npz")
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                np.savez(f, **arreglos)
+            os.replace(temporal, archivo)
+        except BaseException:
+            os.unlink(temporal)
+            raise
+
+    @classmethod
+    def cargar(cls, archivo):
+        """Lee una jerarquía guardada con ``guardar``."""
+        with np.load(archivo) as datos:
+            nodos = json.loads(datos["nodos"].tobytes().decode("utf-8"))
+            lados = [tuple(datos[f"{nombre}_{campo}"]
+                           for campo in ("desplazamientos", "destinos", "pesos", "medios"))
+                     for nombre in ("salida", "entrada")]
+            return cls(nodos, datos["rango"], *lados)
+
+
+def _busqueda_testigos(salida, origen, excluido, limite, maximo_asentados):
+    """Dijkstra local desde ``origen`` sin pasar por ``excluido`` ni superar ``limite``."""
+    distancia = {origen: 0.0}
+    cola = [(0.0, origen)]
+    asentados = 0
+    while cola and asentados < maximo_asentados:
+        d, u = heapq.heappop(cola)
+        if d > limite:
+            break
+        if d > distancia[u]:
+            continue
+        asentados += 1
+        for v, peso in salida[u].items():
+            if v == excluido:
+                continue
+            nuevo = d + peso
+            if nuevo < distancia.get(v, math.inf):
+                distancia[v] = nuevo
+                heapq.heappush(cola, (nuevo, v))
+    return distancia
+
+
+def _atajos(v, salida, entrada, maximo_asentados):
+    """Atajos ``(u, x, peso)`` que hacen falta al contraer ``v``."""
+    atajos = []
+    if not salida[v]:
+        return atajos
+    mayor_salida = max(salida[v].values())
+    for u, peso_uv in entrada[v].items():
+        testigos = _busqueda_testigos(salida, u, v, peso_uv + mayor_salida, maximo_asentados)
+        for x, peso_vx in salida[v].items():
+            if x != u and testigos.get(x, math.inf) > peso_uv + peso_vx:
+                atajos.append((u, x, peso_uv + peso_vx))
+    return atajos
+
+
+def _csr(filas):
+    """Convierte una lista de diccionarios ``destino -> (peso, medio)`` en arreglos CSR."""
+    desplazamientos = np.zeros(len(filas) + 1, dtype=np.int64)
+    desplazamientos[1:] = np.cumsum([len(fila) for fila in filas])
+    destinos = np.fromiter((v for fila in filas for v in fila), dtype=np.int32, count=desplazamientos[-1])
+    pesos = np.fromiter((p for fila in filas for p, _ in fila.values()), dtype=np.float64,
+                        count=desplazamientos[-1])
+    medios = np.fromiter((m for fila in filas for _, m in fila.values()), dtype=np.int32,
+                         count=desplazamientos[-1])
+    return desplazamientos, destinos, pesos, medios
+
+
+def construir_jerarquia(G, maximo_asentados=50, estadisticas=None):
+    """
+    Construye la jerarquía de contracción de ``G`` según su ``"weight"``.
+    ``maximo_asentados`` limita cada búsqueda de testigos (más pequeño es más
+    rápido pero agrega atajos de sobra). ``estadisticas`` recibe los
+    ``"atajos"`` agregados.
+    """
+    nodos = list(G.nodes)
+    indice = {nodo: i for i, nodo in enumerate(nodos)}
+    n = len(nodos)
+    salida = [{} for _ in range(n)]  # Solo aristas entre nodos aún sin contraer
+    entrada = [{} for _ in range(n)]
+    medio = {}  # (u, x) -> nodo que reemplaza el atajo u -> x
+
+    aristas = G.edges(data="weight")
+    if not G.is_directed():
+        aristas = [(u, v, p) for a, b, p in aristas for u, v in ((a, b), (b, a))]
+    for a, b, peso in aristas:
+        u, v = indice[a], indice[b]
+        if u != v and peso < salida[u].get(v, math.inf):  # Sin lazos; de aristas paralelas, la menor
+            salida[u][v] = entrada[v][u] = peso
+
+    vecinos_contraidos = [0] * n
+    nivel = [0] * n
+
+    def prioridad(v):
+        """Prioridad de contracción de ``v`` y los atajos que necesitaría."""
+        atajos = _atajos(v, salida, entrada, maximo_asentados)
+        diferencia = len(atajos) - len(salida[v]) - len(entrada[v])
+        return 2 * diferencia + vecinos_contraidos[v] + nivel[v], atajos
+
+    cola = [(prioridad(v)[0], v) for v in range(n)]
+    heapq.heapify(cola)
+    rango = np.empty(n, dtype=np.int32)
+    arriba_salida = [None] * n  # v -> {x: (peso, medio)} con rango[x] > rango[v]
+    arriba_entrada = [None] * n  # v -> {u: (peso, medio)} con rango[u] > rango[v]
+    total_atajos = 0
+
+    for siguiente in range(n):
+        # Actualización perezosa: se recalcula la prioridad del primero antes de contraerlo
+        while True:
+            _, v = heapq.heappop(cola)
+            actual, atajos = prioridad(v)
+            if not cola or actual <= cola[0][0]:
+                break
+            heapq.heappush(cola, (actual, v))
+
+        rango[v] = siguiente
+        arriba_salida[v] = {x: (p, medio.get((v, x), -1)) for x, p in salida[v].items()}
+        arriba_entrada[v] = {u: (p, medio.get((u, v), -1)) for u, p in entrada[v].items()}
+
+        for u in entrada[v]:
+            del salida[u][v]
+            vecinos_contraidos[u] += 1
+            nivel[u] = max(nivel[u], nivel[v] + 1)
+        for x in salida[v]:
+            del entrada[x][v]
+            vecinos_contraidos[x] += 1
+            nivel[x] = max(nivel[x], nivel[v] + 1)
+        for u, x, peso in atajos:
+            if peso < salida[u].get(x, math.inf):
+                salida[u][x] = entrada[x][u] = peso
+                medio[(u, x)] = v
+                total_atajos += 1
+
+    if estadisticas is not None:
+        estadisticas["atajos"] = total_atajos
+    return JerarquiaContraccion(nodos, rango, _csr(arriba_salida), _csr(arriba_entrada))
+
+
+def jerarquia(G, directorio=None):
+    """
+    Jerarquía de ``G`` (un grafo de ``cargar_grafo``): se guarda en
+    ``G.graph["jerarquia"]`` y en disco con la huella del grafo, de modo que
+    otros procesos la abren en lugar de reconstruirla. ``cambiar_peso``
+    cambia la huella, así que un grafo modificado usa otro archivo.
+    """
+    if "jerarquia" not in G.graph:
+        directorio = directorio or DIRECTORIO_CACHE
+        os.makedirs(directorio, exist_ok=True)
+        archivo = os.path.join(directorio, f"{huella_grafo(G)}_jerarquia.npz")
+        if os.path.exists(archivo):
+            H = JerarquiaContraccion.cargar(archivo)
+        else:
+            H = construir_jerarquia(G)
+            H.guardar(archivo)
+        G.graph["jerarquia"] = H
+    return G.graph["jerarquia"]
+
+
+def matriz_costos(G, origenes=None, destinos=None, directorio=None):
+    """
+    Matriz ``float32`` de costos mínimos de ``origenes`` a ``destinos`` (por
+    defecto, todos los nodos) según el peso de ``G``.
+    """
+    origenes = list(G.nodes) if origenes is None else list(origenes)
+    destinos = list(G.nodes) if destinos is None else list(destinos)
+    return jerarquia(G, directorio).matriz(origenes, destinos)
+
+
+def matrices_viaje(G_tiempo, G_distancia, origenes=None, destinos=None, directorio=None):
+    """Matrices ``(tiempo, distancia)`` origen x destino en una sola llamada."""
+    return (matriz_costos(G_tiempo, origenes, destinos, directorio),
+            matriz_costos(G_distancia, origenes, destinos, directorio))
@@ -0,0 +1,208 @@
+"""
+Recocido simulado con intercambio de temperaturas (parallel tempering),
+vectorizado con NumPy para circuitos de miles de paradas.
+
+Se mantienen ``replicas`` circuitos a la vez como filas de un arreglo de
+enteros ``(replicas, n)``, cada uno a una temperatura distinta (de caliente
+a fría, en progresión geométrica). En cada generación todas las réplicas
+proponen un movimiento a la vez y se evalúan juntas:
+
+- 2-opt (solo si la matriz es simétrica): une un nodo con uno de sus
+  ``vecinos`` más cercanos invirtiendo el tramo intermedio.
+- Reubicación: saca un nodo y lo inserta después de uno de sus vecinos
+  más cercanos (vale también para matrices asimétricas).
+
+La aceptación es la de Metropolis y cada ``intercambio`` generaciones las
+réplicas de temperaturas vecinas intercambian circuitos con la probabilidad
+habitual, de modo que los buenos circuitos bajan hacia las réplicas frías.
+
+Con la misma ``semilla`` y un límite de ``generaciones`` (sin tiempo
+límite) el resultado es reproducible.
+"""
+
+import math  # Infinito: sin tiempo límite o sin circuito
+import time  # Tiempo límite
+
+import numpy as np  # Poblaciones de circuitos como arreglos
+
+from .busqueda_local import _peso_circuito, busqueda_local, listas_vecinos
+from .cierre_metrico import preparar_circuito
+from .tsp_progresivo import vecino_mas_cercano
+
+REVISION_RELOJ = 64  # Cada cuántas generaciones se mira el reloj
+
+
+def pesos_circuitos(W, poblacion):
+    """Peso de cada circuito cerrado (cada fila de ``poblacion``), todos a la vez."""
+    poblacion = np.asarray(poblacion, dtype=np.intp)
+    return W[poblacion, np.roll(poblacion, -1, axis=1)].sum(axis=1)
+
+
+def _dos_opt(W, circuitos, posiciones, filas, i, c):
+    """
+    Cambio de peso de los movimientos 2-opt ``(replicas, candidatos)``: el
+    nodo en la posición ``i`` pasa a ir seguido de su vecino ``c``. Devuelve
+    también las posiciones que delimitan el tramo que se invierte.
+    """
+    n = circuitos.shape[1]
+    j = posiciones[filas, c]
+    a, b = circuitos[filas, i], circuitos[filas, (i + 1) % n]
+    d = circuitos[filas, (j + 1) % n]
+    return W[a, c] + W[b, d] - W[a, b] - W[c, d], (i, j)
+
+
+def _origen_dos_opt(n, i, j):
+    """Índice de origen de cada posición del circuito tras invertir el tramo entre ``i`` y ``j``."""
+    bajo, alto = (np.minimum(i, j) + 1)[:, None], np.maximum(i, j)[:, None]
+    indices = np.arange(n)[None, :]
+    return np.where((indices >= bajo) & (indices <= alto), bajo + alto - indices, indices)
+
+
+def _reubicar(W, circuitos, posiciones, filas, p, c):
+    """
+    Cambio de peso de las reubicaciones ``(replicas, candidatos)``: el nodo
+    en la posición ``p`` pasa a ir justo después de su vecino ``c``. Devuelve
+    también la posición de origen y la del nodo ``c``.
+    """
+    n = circuitos.shape[1]
+    q = posiciones[filas, c]
+    x = circuitos[filas, p]
+    u, w = circuitos[filas, (p - 1) % n], circuitos[filas, (p + 1) % n]
+    e = circuitos[filas, (q + 1) % n]
+    delta = W[u, w] - W[u, x] - W[x, w] + W[c, x] + W[x, e] - W[c, e]
+    delta[c == u] = np.inf  # Insertarlo después de su anterior no cambia nada
+    return delta, (p, q)
+
+
+def _origen_reubicar(n, p, q):
+    """Índice de origen de cada posición del circuito tras llevar ``p`` justo después de ``q``."""
+    adelante = (p < q)[:, None]
+    p, q = p[:, None], q[:, None]
+    indices = np.arange(n)[None, :]
+    origen = np.where(adelante & (indices >= p) & (indices < q), indices + 1, indices)
+    origen = np.where(adelante & (indices == q), p, origen)
+    origen = np.where(~adelante & (indices > q + 1) & (indices <= p), indices - 1, origen)
+    return np.where(~adelante & (indices == q + 1), p, origen)
+
+
+def recocido_paralelo(W, ruta=None, tiempo_limite=1.0, generaciones=None, replicas=16, candidatos=32,
+                      vecinos=8, temperaturas=(0.5, 0.005), intercambio=10, semilla=0, estadisticas=None):
+    """
+    Mejora un circuito de índices de ``W`` (por defecto el del vecino más
+    cercano desde 0) y devuelve ``(ruta, peso)`` con la ruta rotada para
+    empezar en el mismo nodo.
+
+    Se detiene al pasar ``tiempo_limite`` segundos o ``generaciones``
+    generaciones (``None`` desactiva cualquiera de los dos). En cada
+    generación cada réplica sortea ``candidatos`` movimientos y aplica el
+    primero que acepte.
+    ``temperaturas`` son la más alta y la más baja como fracción del peso
+    medio de una arista del circuito inicial. Si se pasa ``estadisticas``
+    se llena con las ``"generaciones"``, los movimientos ``"aceptados"``, los
+    ``"intercambios"`` y el peso inicial y final.
+    """
+    reloj = time.perf_counter()
+    W = np.asarray(W, dtype=np.float64)
+    n = len(W)
+    ruta = vecino_mas_cercano(W) if ruta is None else [int(v) for v in ruta]
+    peso_inicial = _peso_circuito(W, ruta)
+    if n <= 3:
+        return ruta, peso_inicial
+
+    # Las aristas faltantes se reemplazan por una penalización finita para poder restar pesos
+    finitos = np.isfinite(W)
+    W_trabajo = np.where(finitos, W, W[finitos].sum() + 1.0) if not finitos.all() else W
+    simetrica = np.array_equal(W, W.T)
+    cercanos = listas_vecinos(np.minimum(W_trabajo, W_trabajo.T), vecinos)
+    k = cercanos.shape[1]
+
+    azar = np.random.default_rng(semilla)
+    filas = np.arange(replicas)
+    circuitos = np.tile(np.asarray(ruta, dtype=np.intp), (replicas, 1))
+    posiciones = np.empty_like(circuitos)
+    indices = np.broadcast_to(np.arange(n), circuitos.shape)
+    np.put_along_axis(posiciones, circuitos, indices, axis=1)
+    energias = pesos_circuitos(W_trabajo, circuitos)
+    arista_media = energias[0] / n
+    T = arista_media * np.geomspace(*temperaturas, replicas)  # Fila 0 la más caliente
+
+    mejor_ruta, mejor_peso = circuitos[0].copy(), energias[0]
+    generacion = aceptados = intercambios = 0
+    while generaciones is None or generacion < generaciones:
+        if (tiempo_limite is not None and generacion % REVISION_RELOJ == 0
+                and time.perf_counter() - reloj >= tiempo_limite):
+            break
+        posicion = azar.integers(0, n, (replicas, candidatos))
+        c = cercanos[circuitos[filas[:, None], posicion], azar.integers(0, k, (replicas, candidatos))]
+        dos_opt = simetrica and generacion % 2 == 0
+        mover = _dos_opt if dos_opt else _reubicar
+        delta, (desde, hasta) = mover(W_trabajo, circuitos, posiciones, filas[:, None], posicion, c)
+
+        with np.errstate(over="ignore"):
+            aceptables = (delta < 0) | (azar.random(delta.shape) < np.exp(-delta / T[:, None]))
+        acepta = aceptables.any(axis=1)
+        if acepta.any():
+            movidas = filas[acepta]
+            elegido = aceptables[acepta].argmax(axis=1)  # Primer candidato aceptado de cada réplica
+            armar = _origen_dos_opt if dos_opt else _origen_reubicar
+            origen = armar(n, desde[movidas, elegido], hasta[movidas, elegido])
+            circuitos[movidas] = np.take_along_axis(circuitos[movidas], origen, axis=1)
+            nuevas = posiciones[movidas]
+            np.put_along_axis(nuevas, circuitos[movidas], indices[acepta], axis=1)
+            posiciones[movidas] = nuevas
+            energias[movidas] += delta[movidas, elegido]
+            aceptados += len(movidas)
+            mas_baja = int(np.argmin(energias))
+            if energias[mas_baja] < mejor_peso - 1e-9:
+                mejor_ruta, mejor_peso = circuitos[mas_baja].copy(), energias[mas_baja]
+        generacion += 1
+
+        if generacion % intercambio == 0:
+            energias = pesos_circuitos(W_trabajo, circuitos)  # Corrige el error de redondeo acumulado
+            for r in range(generacion // intercambio % 2, replicas - 1, 2):  # Pares alternados
+                cambio = (energias[r] - energias[r + 1]) * (1 / T[r] - 1 / T[r + 1])
+                if cambio >= 0 or azar.random() < np.exp(cambio):
+                    circuitos[[r, r + 1]] = circuitos[[r + 1, r]]
+                    posiciones[[r, r + 1]] = posiciones[[r + 1, r]]
+                    energias[[r, r + 1]] = energias[[r + 1, r]]
+                    intercambios += 1
+
+    inicio = int(np.flatnonzero(mejor_ruta == ruta[0])[0])
+    mejor_ruta = np.roll(mejor_ruta, -inicio).tolist()
+    peso = _peso_circuito(W, mejor_ruta)
+    if peso > peso_inicial:  # Solo puede pasar con aristas faltantes: se conserva la original
+        mejor_ruta, peso = ruta, peso_inicial
+    if estadisticas is not None:
+        estadisticas.update(generaciones=generacion, aceptados=aceptados, intercambios=intercambios,
+                            peso_inicial=peso_inicial, peso_final=peso)
+    return mejor_ruta, peso
+
+
+def circuito_recocido(G, inicio, tiempo_limite=1.0, pulir=True, estadisticas=None, **opciones):
+    """
+    Circuito que visita todos los nodos de ``G`` y vuelve a ``inicio`` con
+    ``recocido_paralelo`` (sobre el cierre métrico si el grafo es conexo) y,
+    si ``pulir``, una búsqueda local final con el tiempo que sobre de
+    ``tiempo_limite``, que cubre toda la llamada. Devuelve ``(ruta, peso)``
+    como los demás solucionadores, o ``(None, inf)`` si no encuentra un
+    circuito que use solo tramos existentes (grafo no conexo); las demás
+    opciones pasan a ``recocido_paralelo``.
+    """
+    reloj = time.perf_counter()
+
+    def restante():
+        return None if tiempo_limite is None else tiempo_limite - (time.perf_counter() - reloj)
+
+    W, traducir = preparar_circuito(G, inicio)
+    if len(W) == 1:
+        return traducir([0, 0]), 0.0
+    ruta, peso = recocido_paralelo(W, tiempo_limite=restante(), estadisticas=estadisticas, **opciones)
+    sobra = restante()
+    if pulir and len(W) > 3 and (sobra is None or sobra > 0):
+        ruta, _ = busqueda_local(W, ruta, tiempo_limite=math.inf if sobra is None else sobra)
+        peso = _peso_circuito(W, ruta)  # Con los pesos reales: la búsqueda local penaliza los faltantes
+        if estadisticas is not None:
+            estadisticas["peso_final"] = peso
+    if not math.isfinite(peso):
+        return None, math.inf  # Como los solucionadores exactos: ninguna ruta usa tramos inexistentes
+    return traducir(ruta + [0]), peso
@@ -0,0 +1,402 @@
+"""
+Carga de mapas grandes sin pasar por ``json.loads`` ni por dos grafos de
+NetworkX.
+
+``cargar_grafo`` lee todo el documento y guarda cada tramo dos veces como
+diccionarios de Python (uno en ``G_tiempo`` y otro en ``G_distancia``).
+``cargar_red`` lee los tramos a medida que llegan y arma una sola
+``RedCompacta``: los nombres se traducen a enteros y la adyacencia queda en
+formato CSR (``desplazamientos``, ``destinos``) con ``tiempo`` y
+``distancia`` como arreglos ``float32`` separados. Se puede guardar en un
+archivo binario y volver a abrir con ``mmap``, sin copiarlo a memoria.
+
+Formatos de entrada (según la extensión):
+
+- ``.json``: el mismo formato que ``json_data``,
+  ``{origen: {destino: {"tiempo": t, "distancia": d}}}``.
+- ``.jsonl`` / ``.ndjson``: un tramo por línea,
+  ``{"origen": ..., "destino": ..., "tiempo": t, "distancia": d}``.
+- ``.csv``: columnas ``origen,destino,tiempo,distancia``.
+
+``RedCompacta.grafos()`` devuelve vistas de solo lectura con la interfaz de
+NetworkX, para seguir usando ``a_estrella``, ``tsp_aproximado``,
+``nx.shortest_path`` y el resto sin materializar los diccionarios. Las vistas
+son subclases de ``nx.Graph`` / ``nx.DiGraph`` que reemplazan los
+diccionarios internos por medio de ``node_dict_factory`` y
+``adjlist_outer_dict_factory``, los puntos de extensión documentados de
+NetworkX. Si la red tiene coordenadas (``posiciones`` en ``cargar_red``),
+cada nodo de la vista expone ``"lat"`` y ``"lon"`` como en ``cargar_grafo``.
+Los perfiles por hora (``"perfil"``) no se guardan en la forma compacta.
+"""
+
+import csv  # Archivos de tramos separados por comas
+import json  # Nombres de nodo y lectura incremental del documento
+import os  # Rutas de archivos y reemplazo atómico
+import re  # Espacios entre símbolos del JSON
+import tempfile  # Archivo temporal antes de publicar la red
+from array import array  # Tramos acumulados sin un objeto de Python por número
+from collections.abc import Mapping  # Adyacencia de solo lectura para NetworkX
+
+import numpy as np  # Arreglos CSR
+import networkx as nx  # Vistas compatibles con las funciones existentes
+
+MAGIA = b"RUTASRED"  # Primeros bytes del archivo binario
+ALINEACION = 64  # Cada arreglo empieza en un múltiplo de estos bytes
+BLOQUE = 1 << 20  # Caracteres leídos por vez del documento JSON
+ESPACIOS = re.compile(r"[ \t\r\n]*")  # Blancos permitidos entre símbolos
+
+
+def _tramos_json(f, bloque=BLOQUE):
+    """
+    Recorre ``{origen: {destino: {...}}}`` leyendo ``f`` por bloques. Solo se
+    decodifican de una vez las claves y los objetos de cada tramo, que siempre
+    terminan en comillas o llaves, así que nunca se cortan a medias.
+    """
+    decodificador = json.JSONDecoder()
+    texto, pos, agotado = "", 0, False
+
+    def leer():
+        nonlocal texto, pos, agotado
+        bloque_leido = f.read(bloque)
+        agotado = not bloque_leido
+        texto, pos = texto[pos:] + bloque_leido, 0
+
+    def simbolo(consumir=True):
+        nonlocal pos
+        while True:
+            pos = ESPACIOS.match(texto, pos).end()
+            if pos < len(texto):
+                caracter = texto[pos]
+                pos += consumir
+                return caracter
+            if agotado:
+                raise ValueError("El documento JSON terminó antes de tiempo")
+            leer()
+
+    def esperar(caracteres):
+        caracter = simbolo()
+        if caracter not in caracteres:
+            raise ValueError(f"Se esperaba {caracteres!r} y se encontró {caracter!r}")
+        return caracter
+
+    def valor():
+        nonlocal pos
+        simbolo(consumir=False)
+        while True:
+            try:
+                resultado, pos = decodificador.raw_decode(texto, pos)
+                return resultado
+            except json.JSONDecodeError:
+                if agotado:
+                    raise
+                leer()
+
+    esperar("{")
+    if simbolo(consumir=False) == "}":
+        return
+    while True:
+        origen = valor()
+        esperar(":")
+        esperar("{")
+        if simbolo(consumir=False) == "}":
+            simbolo()
+            yield origen, None, None  # Nodo sin tramos de salida
+        else:
+            while True:
+                destino = valor()
+                esperar(":")
+                yield origen, destino, valor()
+                if esperar(",}") == "}":
+                    break
+        if esperar(",}") == "}":
+            return
+
+
+def leer_tramos(archivo):
+    """
+    Genera ``(origen, destino, valores)`` por cada tramo de ``archivo`` sin
+    leerlo completo; ``valores`` tiene ``"tiempo"`` y ``"distancia"``. Un nodo
+    sin tramos de salida en el JSON aparece como ``(origen, None, None)``.
+    """
+    extension = os.path.splitext(archivo)[1].lower()
+    with open(archivo, encoding="utf-8", newline="") as f:
+        if extension in (".jsonl", ".ndjson"):
+            for linea in f:
+                if linea.strip():
+                    tramo = json.loads(linea)
+                    yield tramo["origen"], tramo["destino"], tramo
+        elif extension == ".csv":
+            for fila in csv.DictReader(f):
+                yield fila["origen"], fila["destino"], {"tiempo": float(fila["tiempo"]),
+                                                        "distancia": float(fila["distancia"])}
+        else:
+            yield from _tramos_json(f)
+
+
+class RedCompacta:
+    """
+    Adyacencia CSR con los dos pesos: los vecinos del nodo ``i`` son
+    ``destinos[desplazamientos[i]:desplazamientos[i + 1]]`` (ordenados), con
+    sus ``tiempo`` y ``distancia`` en las mismas posiciones. En una red no
+    dirigida cada tramo aparece en los dos sentidos, como en la matriz
+    compilada. ``nodos`` es la lista de nombres y ``lat`` / ``lon``, si se
+    conocen, las coordenadas de cada nodo (``nan`` las que faltan).
+    """
+
+    def __init__(self, nodos, desplazamientos, destinos, tiempo, distancia, dirigido=False, lat=None, lon=None):
+        self.nodos = nodos
+        self.desplazamientos = desplazamientos
+        self.destinos = destinos
+        self.tiempo = tiempo
+        self.distancia = distancia
+        self.dirigido = dirigido
+        self.lat = lat
+        self.lon = lon
+        self._indice = None
+
+    @property
+    def indice(self):
+        """Nombre -> entero, armado la primera vez que se necesita."""
+        if self._indice is None:
+            self._indice = {nodo: i for i, nodo in enumerate(self.nodos)}
+        return self._indice
+
+    def __len__(self):
+        return len(self.nodos)
+
+    def pesos(self, peso):
+        """Arreglo del atributo ``"tiempo"`` o ``"distancia"``."""
+        if peso not in ("tiempo", "distancia"):
+            raise ValueError(f"Peso desconocido: {peso!r}")
+        return getattr(self, peso)
+
+    def transpuesta(self):
+        """``(desplazamientos, destinos, posiciones)`` de los tramos que llegan a cada nodo."""
+        origenes = np.repeat(np.arange(len(self), dtype=self.destinos.dtype), np.diff(self.desplazamientos))
+        orden = np.lexsort((origenes, self.destinos))
+        conteos = np.bincount(self.destinos, minlength=len(self))
+        desplazamientos = np.concatenate(([0], np.cumsum(conteos))).astype(np.int64)
+        return desplazamientos, origenes[orden], orden
+
+    def guardar(self, archivo):
+        """
+        Escribe la red en un archivo binario: una cabecera JSON con el tipo,
+        la forma y la posición de cada arreglo, y los arreglos alineados para
+        abrirlos con ``np.memmap``. Reemplazo atómico, como la caché del cierre.
+        """
+        nombres = np.frombuffer(json.dumps(self.nodos, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+        arreglos = {"nombres": nombres, "desplazamientos": self.desplazamientos, "destinos": self.destinos,
+                    "tiempo": self.tiempo, "distancia": self.distancia}
+        if self.lat is not None:
+            arreglos.update(lat=self.lat, lon=self.lon)
+        cabecera = {"dirigido": self.dirigido, "arreglos": {}}
+        posicion = 0
+        for nombre, arreglo in arreglos.items():
+            cabecera["arreglos"][nombre] = [arreglo.dtype.str, len(arreglo), posicion]
+            posicion += -(-arreglo.nbytes // ALINEACION) * ALINEACION
+        texto = json.dumps(cabecera).encode("utf-8")
+        inicio_datos = -(-(len(MAGIA) + 8 + len(texto)) // ALINEACION) * ALINEACION
+
+        descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(archivo) or ".", suffix=".red")
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                f.write(MAGIA + len(texto).to_bytes(8, "little") + texto)
+                for nombre, arreglo in arreglos.items():
+                    f.seek(inicio_datos + cabecera["arreglos"][nombre][2])
+                    f.write(np.ascontiguousarray(arreglo).tobytes())
+                f.truncate(inicio_datos + posicion)
+            os.replace(temporal, archivo)
+        except BaseException:
+            os.unlink(temporal)
+            raise
+
+    @classmethod
+    def cargar(cls, archivo, mmap=True):
+        """Abre una red escrita con ``guardar``; con ``mmap`` los arreglos se leen del disco a demanda."""
+        with open(archivo, "rb") as f:
+            if f.read(len(MAGIA)) != MAGIA:
+                raise ValueError(f"{archivo} no es una red guardada con RedCompacta.guardar")
+            largo = int.from_bytes(f.read(8), "little")
+            cabecera = json.loads(f.read(largo).decode("utf-8"))
+        inicio_datos = -(-(len(MAGIA) + 8 + largo) // ALINEACION) * ALINEACION
+        arreglos = {}
+        for nombre, (tipo, largo, posicion) in cabecera["arreglos"].items():
+            if mmap and largo:
+                arreglos[nombre] = np.memmap(archivo, dtype=tipo, mode="r", offset=inicio_datos + posicion,
+                                             shape=(largo,))
+            else:
+                arreglos[nombre] = np.fromfile(archivo, dtype=tipo, count=largo, offset=inicio_datos + posicion)
+        nodos = json.loads(bytes(arreglos.pop("nombres")).decode("utf-8"))
+        return cls(nodos, dirigido=cabecera["dirigido"], **arreglos)
+
+    def grafos(self):
+        """``(G_tiempo, G_distancia)`` como vistas de NetworkX de solo lectura, igual que ``cargar_grafo``."""
+        return vista_networkx(self, "tiempo"), vista_networkx(self, "distancia")
+
+
+def cargar_red(archivo, dirigido=False, posiciones=None):
+    """
+    Lee los tramos de ``archivo`` (ver ``leer_tramos``) y arma una
+    ``RedCompacta``. Si un tramo aparece repetido gana el último leído,
+    como en ``cargar_grafo``. ``posiciones`` (nodo -> (latitud, longitud),
+    como ``POSICIONES``) da las coordenadas de los nodos.
+    """
+    indice = {}
+    origenes, destinos = array("q"), array("q")
+    tiempos, distancias = array("f"), array("f")
+    for origen, destino, valores in leer_tramos(archivo):
+        u = indice.setdefault(origen, len(indice))
+        if destino is None:
+            continue
+        origenes.append(u)
+        destinos.append(indice.setdefault(destino, len(indice)))
+        tiempos.append(valores["tiempo"])
+        distancias.append(valores["distancia"])
+
+    n = len(indice)
+    u = np.frombuffer(origenes, dtype=np.int64)
+    v = np.frombuffer(destinos, dtype=np.int64)
+    tiempo = np.frombuffer(tiempos, dtype=np.float32)
+    distancia = np.frombuffer(distancias, dtype=np.float32)
+
+    # Tramos repetidos: se queda el último (en no dirigidos, (u, v) y (v, u) son el mismo)
+    clave = u * n + v if dirigido else np.minimum(u, v) * n + np.maximum(u, v)
+    orden = np.argsort(clave, kind="stable")
+    ultimos = orden[np.append(clave[orden][1:] != clave[orden][:-1], True)]
+    u, v, tiempo, distancia = u[ultimos], v[ultimos], tiempo[ultimos], distancia[ultimos]
+    if not dirigido:  # Cada tramo en los dos sentidos (los lazos una sola vez)
+        ida = u != v
+        u, v = np.concatenate((u, v[ida])), np.concatenate((v, u[ida]))
+        tiempo, distancia = np.concatenate((tiempo, tiempo[ida])), np.concatenate((distancia, distancia[ida]))
+
+    orden = np.lexsort((v, u))
+    tipo = np.int32 if n < 2**31 else np.int64
+    desplazamientos = np.concatenate(([0], np.cumsum(np.bincount(u, minlength=n)))).astype(np.int64)
+    lat = lon = None
+    if posiciones:
+        coordenadas = np.array([posiciones.get(nodo, (np.nan, np.nan)) for nodo in indice], dtype=np.float64)
+        lat, lon = coordenadas.reshape(n, 2).T.copy()
+    return RedCompacta(list(indice), desplazamientos, v[orden].astype(tipo),
+                       tiempo[orden], distancia[orden], dirigido, lat, lon)
+
+
+class _Vecinos(Mapping):
+    """Vecinos de un nodo: nombre -> ``{"weight": peso}``, calculado al pedirlo."""
+
+    __slots__ = ("_red", "_destinos", "_pesos")
+
+    def __init__(self, red, destinos, pesos):
+        self._red = red
+        self._destinos = destinos
+        self._pesos = pesos
+
+    def __len__(self):
+        return len(self._destinos)
+
+    def __iter__(self):
+        nombres = self._red.nodos
+        return (nombres[j] for j in self._destinos.tolist())
+
+    def __getitem__(self, nombre):
+        j = self._red.indice.get(nombre)
+        if j is not None:
+            k = int(np.searchsorted(self._destinos, j))
+            if k < len(self._destinos) and self._destinos[k] == j:
+                return {"weight": float(self._pesos[k])}
+        raise KeyError(nombre)
+
+    def items(self):
+        nombres = self._red.nodos
+        return [(nombres[j], {"weight": p}) for j, p in zip(self._destinos.tolist(), self._pesos.tolist())]
+
+
+class _Adyacencia(Mapping):
+    """Adyacencia completa en la forma ``{u: {v: atributos}}`` que espera NetworkX."""
+
+    def __init__(self, red, desplazamientos, destinos, pesos):
+        self._red = red
+        self._desplazamientos = desplazamientos
+        self._destinos = destinos
+        self._pesos = pesos
+
+    def __len__(self):
+        return len(self._red)
+
+    def __iter__(self):
+        return iter(self._red.nodos)
+
+    def __contains__(self, nombre):
+        return nombre in self._red.indice
+
+    def __getitem__(self, nombre):
+        i = self._red.indice[nombre]
+        inicio, fin = int(self._desplazamientos[i]), int(self._desplazamientos[i + 1])
+        return _Vecinos(self._red, self._destinos[inicio:fin], self._pesos[inicio:fin])
+
+
+class _Nodos(Mapping):
+    """Atributos de los nodos: ``"lat"`` y ``"lon"`` si la red tiene coordenadas para ese nodo."""
+
+    def __init__(self, red):
+        self._red = red
+
+    def __len__(self):
+        return len(self._red)
+
+    def __iter__(self):
+        return iter(self._red.nodos)
+
+    def __contains__(self, nombre):
+        return nombre in self._red.indice
+
+    def __getitem__(self, nombre):
+        i = self._red.indice[nombre]
+        if self._red.lat is None or np.isnan(self._red.lat[i]):
+            return {}
+        return {"lat": float(self._red.lat[i]), "lon": float(self._red.lon[i])}
+
+
+class _Vista:
+    """
+    Parte común de las vistas: antes de que NetworkX arme el grafo se fijan
+    las fábricas de sus diccionarios internos para que devuelvan los de la
+    red. Sin ``red`` (cuando NetworkX crea un grafo vacío de la misma clase,
+    por ejemplo en ``copy``) es un grafo común y corriente.
+    """
+
+    def __init__(self, incoming_graph_data=None, red=None, peso=None, **attr):
+        if red is not None:
+            pesos = red.pesos(peso)
+            adyacencias = [_Adyacencia(red, red.desplazamientos, red.destinos, pesos)]
+            if red.dirigido:  # DiGraph pide una segunda adyacencia: la de predecesores
+                desplazamientos, origenes, orden = red.transpuesta()
+                adyacencias.append(_Adyacencia(red, desplazamientos, origenes, np.asarray(pesos)[orden]))
+            fabricas = iter(adyacencias)
+            self.node_dict_factory = lambda: _Nodos(red)
+            self.adjlist_outer_dict_factory = lambda: next(fabricas)
+            attr.update(peso=peso, red_compacta=red)
+        super().__init__(incoming_graph_data, **attr)
+
+    def to_directed_class(self):
+        return nx.DiGraph
+
+    def to_undirected_class(self):
+        return nx.Graph
+
+
+class _VistaGrafo(_Vista, nx.Graph):
+    """Vista no dirigida de una ``RedCompacta``."""
+
+
+class _VistaDigrafo(_Vista, nx.DiGraph):
+    """Vista dirigida de una ``RedCompacta``."""
+
+
+def vista_networkx(red, peso):
+    """
+    Grafo de NetworkX de solo lectura sobre ``red`` con ``peso`` como
+    ``"weight"``. Los vecinos se arman al consultarlos, así que no se copia
+    la red; agregar aristas o usar ``cambiar_peso`` no está permitido.
+    """
+    clase = _VistaDigrafo if red.dirigido else _VistaGrafo
+    return nx.freeze(clase(red=red, peso=peso))
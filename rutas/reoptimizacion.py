@@ -0,0 +1,245 @@
+"""
+Circuito que se repara en lugar de resolverse de nuevo cuando se agregan o
+quitan paradas o cambian los pesos de algunos tramos.
+
+``CircuitoIncremental`` guarda el circuito como lista doblemente enlazada
+(el siguiente y el anterior de cada parada) y ``actualizar`` aplica un lote
+de cambios tocando solo lo necesario:
+
+- Quitar una parada une su anterior con su siguiente.
+- Agregar una parada la inserta en el tramo más barato junto a sus
+  ``vecinos`` más cercanos que ya están en el circuito.
+- Un cambio de peso marca los extremos del tramo.
+
+Después se hace una búsqueda local (Or-opt y, si el grafo no es dirigido,
+2-opt) que solo revisa las paradas marcadas y las que cambian al mejorar,
+así que el trabajo depende del tamaño del cambio y no del circuito. Como en
+``circuito_tsp``, cada salto usa la arista directa entre dos paradas (sin
+arista el salto cuesta ``inf``).
+"""
+
+import heapq  # Vecinos más cercanos de cada parada
+import math  # Infinito
+import time  # Tiempo límite
+from collections import deque  # Paradas pendientes de revisar
+
+from .grafo import cambiar_peso
+
+EPSILON = 1e-9  # Mejora mínima para aceptar un movimiento
+TRAMO_MAXIMO = 3  # Largo máximo de los tramos que mueve Or-opt
+
+
+class CircuitoIncremental:
+    """
+    Circuito ``ruta`` (en el formato de ``circuito_tsp``: ``[inicio, ...,
+    inicio]``, cada parada una vez) sobre las paradas de ``G``. No tiene
+    que visitar todos los nodos de ``G``.
+    """
+
+    def __init__(self, G, ruta, vecinos=8):
+        if ruta[0] != ruta[-1] or len(set(ruta)) != len(ruta) - 1:
+            raise ValueError("La ruta debe ser un circuito que visite cada nodo una sola vez")
+        self.G = G
+        self.inicio = ruta[0]
+        self.vecinos = vecinos
+        self._cache = {}  # Paradas cercanas de cada parada ya calculadas
+        paradas = ruta[:-1]
+        self._siguiente = {u: v for u, v in zip(paradas, paradas[1:] + paradas[:1])}
+        self._anterior = {v: u for u, v in self._siguiente.items()}
+        self.peso = self._recalcular()
+
+    def __len__(self):
+        return len(self._siguiente)
+
+    def _d(self, u, v):
+        datos = self.G.get_edge_data(u, v)
+        return math.inf if datos is None else datos["weight"]
+
+    def _recalcular(self):
+        return sum(self._d(u, v) for u, v in self._siguiente.items())
+
+    @property
+    def ruta(self):
+        """El circuito actual, empezando y terminando en ``inicio``."""
+        ruta = [self.inicio]
+        nodo = self._siguiente[self.inicio]
+        while nodo != self.inicio:
+            ruta.append(nodo)
+            nodo = self._siguiente[nodo]
+        return ruta + [self.inicio]
+
+    def _cercanos(self, nodo):
+        """Las ``vecinos`` paradas del circuito unidas a ``nodo`` por los tramos más baratos."""
+        if nodo in self._cache:
+            return [v for v in self._cache[nodo] if v in self._siguiente]
+        en_circuito = self._siguiente
+        if self.G.is_directed():  # Cuenta el tramo más barato en cualquiera de los dos sentidos
+            candidatos = {v: datos["weight"] for v, datos in self.G.pred[nodo].items() if v in en_circuito}
+            for v, datos in self.G.succ[nodo].items():
+                if v in en_circuito and datos["weight"] < candidatos.get(v, math.inf):
+                    candidatos[v] = datos["weight"]
+        else:
+            candidatos = {v: datos["weight"] for v, datos in self.G[nodo].items() if v in en_circuito}
+        candidatos.pop(nodo, None)
+        self._cache[nodo] = heapq.nsmallest(self.vecinos, candidatos, key=candidatos.get)
+        return self._cache[nodo]
+
+    def _enlazar(self, u, v):
+        self._siguiente[u] = v
+        self._anterior[v] = u
+
+    def _quitar(self, nodo):
+        """Saca ``nodo`` del circuito uniendo su anterior con su siguiente."""
+        if nodo == self.inicio:
+            raise ValueError("No se puede quitar la parada de inicio")
+        if len(self) <= 2:
+            raise ValueError("El circuito debe conservar al menos dos paradas")
+        a, b = self._anterior.pop(nodo), self._siguiente.pop(nodo)
+        self.peso += self._d(a, b) - self._d(a, nodo) - self._d(nodo, b)
+        self._enlazar(a, b)
+        return [a, b]
+
+    def _insertar(self, nodo):
+        """Inserta ``nodo`` en el tramo más barato junto a sus paradas más cercanas."""
+        cercanos = self._cercanos(nodo)
+        tramos = {(a, self._siguiente[a]) for a in cercanos} | {(self._anterior[a], a) for a in cercanos}
+        if not tramos:  # No tiene tramos hacia el circuito: se prueban todos los saltos
+            tramos = set(self._siguiente.items())
+        a, b = min(tramos, key=lambda t: self._d(t[0], nodo) + self._d(nodo, t[1]) - self._d(*t))
+        self.peso += self._d(a, nodo) + self._d(nodo, b) - self._d(a, b)
+        for c in cercanos:  # Sus vecinos ahora lo tienen cerca
+            self._cache.pop(c, None)
+        self._enlazar(a, nodo)
+        self._enlazar(nodo, b)
+        return [a, nodo, b]
+
+    def _or_opt(self, nodo):
+        """Mueve el tramo de 1 a 3 paradas que empieza en ``nodo`` a otro lugar si conviene."""
+        d = self._d
+        dirigido = self.G.is_directed()
+        s = e = nodo
+        tramo = {s}
+        for _ in range(TRAMO_MAXIMO):
+            if len(tramo) + 2 > len(self):
+                break
+            p, q = self._anterior[s], self._siguiente[e]
+            ganancia = d(p, s) + d(e, q) - d(p, q)
+            mejor, movimiento = EPSILON, None
+            for c in set(self._cercanos(s)) | set(self._cercanos(e)):
+                for a, b in ((c, self._siguiente[c]), (self._anterior[c], c)):
+                    if a in tramo or b in tramo or a == p:  # a == p: volver a ponerlo donde estaba
+                        continue
+                    costo = d(a, s) + d(e, b) - d(a, b)
+                    if ganancia - costo > mejor:
+                        mejor, movimiento = ganancia - costo, (a, b, False)
+                    if not dirigido:
+                        costo = d(a, e) + d(s, b) - d(a, b)
+                        if ganancia - costo > mejor:
+                            mejor, movimiento = ganancia - costo, (a, b, True)
+            if movimiento is not None:
+                a, b, invertido = movimiento
+                orden = []
+                x = s
+                while True:
+                    orden.append(x)
+                    if x == e:
+                        break
+                    x = self._siguiente[x]
+                self._enlazar(p, q)
+                if invertido:
+                    orden.reverse()
+                self._enlazar(a, orden[0])
+                for u, v in zip(orden, orden[1:]):
+                    self._enlazar(u, v)
+                self._enlazar(orden[-1], b)
+                self.peso -= mejor
+                return [p, q, a, b, s, e]
+            e = self._siguiente[e]
+            tramo.add(e)
+        return []
+
+    def _invertir(self, b, c):
+        """Invierte el camino de ``b`` a ``c`` (siguiendo ``_siguiente``)."""
+        a, d = self._anterior[b], self._siguiente[c]
+        x = b
+        while True:
+            siguiente = self._siguiente[x]
+            self._siguiente[x], self._anterior[x] = self._anterior[x], siguiente
+            if x == c:
+                break
+            x = siguiente
+        self._enlazar(a, c)
+        self._enlazar(b, d)
+
+    def _dos_opt(self, nodo):
+        """Cambia ``(nodo, b), (c, d)`` por ``(nodo, c), (b, d)`` con ``c`` cercano a ``nodo``."""
+        d = self._d
+        a, b = nodo, self._siguiente[nodo]
+        for c in self._cercanos(a):
+            e = self._siguiente[c]
+            if c == b or e == a:
+                continue
+            ganancia = d(a, b) + d(c, e) - d(a, c) - d(b, e)
+            if ganancia > EPSILON:
+                # Se invierte el lado más corto: b..c o su complemento e..a
+                x, y = b, e
+                while x != c and y != a:
+                    x, y = self._siguiente[x], self._siguiente[y]
+                if x == c:
+                    self._invertir(b, c)
+                else:
+                    self._invertir(e, a)
+                self.peso -= ganancia
+                return [a, b, c, e]
+        return []
+
+    def actualizar(self, agregar=(), quitar=(), cambios=(), tiempo_limite=0.1, estadisticas=None):
+        """
+        Aplica los cambios de peso ``(origen, destino, peso)`` (con
+        ``cambiar_peso``), quita las paradas de ``quitar``, inserta las de
+        ``agregar`` (que ya deben estar en ``G``, por ejemplo con
+        ``agregar_parada``) y mejora localmente el circuito alrededor de lo
+        que cambió durante a lo sumo ``tiempo_limite`` segundos. Devuelve
+        ``(ruta, peso)``. Si se pasa ``estadisticas`` se llena con las
+        paradas ``"revisadas"`` y los ``"movimientos"`` aplicados.
+        """
+        reloj = time.perf_counter()
+        pendientes = deque()
+        for u, v, peso in cambios:
+            en_circuito = self._siguiente.get(u) == v or (not self.G.is_directed() and self._siguiente.get(v) == u)
+            if en_circuito:
+                self.peso += peso - self.G[u][v]["weight"]
+            cambiar_peso(self.G, u, v, peso)
+            self._cache.pop(u, None)
+            self._cache.pop(v, None)
+            pendientes.extend(x for x in (u, v) if x in self._siguiente)
+        for nodo in quitar:
+            pendientes.extend(self._quitar(nodo))
+        for nodo in agregar:
+            if nodo in self._siguiente:
+                continue
+            if nodo not in self.G:
+                raise ValueError(f"La parada {nodo!r} no está en el grafo")
+            pendientes.extend(self._insertar(nodo))
+
+        revisadas = movimientos = 0
+        en_cola = set(pendientes)
+        while pendientes and time.perf_counter() - reloj < tiempo_limite:
+            nodo = pendientes.popleft()
+            en_cola.discard(nodo)
+            if nodo not in self._siguiente:
+                continue
+            revisadas += 1
+            tocadas = self._or_opt(nodo) or (self._dos_opt(nodo) if not self.G.is_directed() else [])
+            if tocadas:
+                movimientos += 1
+                for x in tocadas + [nodo]:
+                    if x not in en_cola:
+                        en_cola.add(x)
+                        pendientes.append(x)
+
+        if not math.isfinite(self.peso):
+            self.peso = self._recalcular()  # inf - inf no se puede llevar por diferencias
+        if estadisticas is not None:
+            estadisticas.update(revisadas=revisadas, movimientos=movimientos)
+        return self.ruta, self.peso
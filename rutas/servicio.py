@@ -0,0 +1,414 @@
+"""
+Servicio HTTP que mantiene Python y los grafos cargados entre solicitudes.
+
+``server.js`` ejecutaba ``python archivo.py`` en cada POST, pagando el
+arranque del intérprete y la importación de NetworkX antes de calcular
+nada. Este módulo expone los solucionadores como una aplicación WSGI que se
+levanta una sola vez con gunicorn (ya está en ``requirements.txt``)::
+
+    gunicorn -w 4 -k gthread --threads 8 -b 127.0.0.1:8000 rutas.servicio:aplicacion
+
+o, para desarrollo, ``python -m rutas.servicio``. Todas las operaciones
+reciben y devuelven JSON por POST:
+
+- ``/cargar_grafo``: ``{"datos": {...}, "dirigido": false}`` -> ``{"grafo": id, ...}``
+  (con ``"posiciones": {nodo: [lat, lon]}`` se usan esas coordenadas en
+  lugar de ``POSICIONES`` para la heurística de A*)
+- ``/circuito_tsp``: ``{"grafo": id, "inicio": ..., "peso": "tiempo", "metodo": "held_karp"}``
+  (con ``"salida"`` en minutos desde la medianoche, usa los perfiles de tiempo)
+- ``/ruta_mas_rapida``: ``{"grafo": id, "inicio": ..., "fin": ..., "peso": "tiempo"}``
+  (sin ``fin`` devuelve el costo mínimo hacia cada nodo)
+- ``/tsp_aproximado``: ``{"grafo": id, "inicio": ..., "peso": "distancia"}``
+  (con ``"presupuesto_ms"`` responde dentro de ese plazo con la mejor ruta
+  encontrada, su ``"cota"`` inferior y la ``"brecha"`` estimada)
+- ``/matriz``: ``{"grafo": id, "origenes": [...], "destinos": [...]}`` ->
+  ``{"tiempo": [[...]], "distancia": [[...]]}`` (sin listas, todos los nodos)
+
+En lugar de ``"grafo"`` se pueden mandar los ``"datos"`` directamente; se
+cargan una vez y quedan guardados con su huella. Los datos de cada grafo
+cargado se escriben además en ``$RUTAS_CACHE/grafos``, de modo que con
+``gunicorn -w 4`` cualquier trabajador reconoce el ``id`` que entregó otro y
+lo carga la primera vez que se lo piden. ``GET /metricas`` devuelve las
+solicitudes en curso, la profundidad de la cola y los contadores de este
+proceso (con gunicorn cada trabajador lleva los suyos).
+
+Variables de entorno: ``RUTAS_CONCURRENCIA`` (solicitudes que se resuelven a
+la vez por proceso), ``RUTAS_MAXIMO_COLA`` (cuántas pueden esperar antes de
+responder 503), ``RUTAS_MAXIMO_GRAFOS`` (grafos guardados en memoria),
+``RUTAS_MAXIMO_RESULTADOS`` (resultados en la caché en memoria),
+``RUTAS_CACHE_RESULTADOS`` (directorio de la caché en disco, compartida por
+los trabajadores), ``RUTAS_MAXIMO_HELD_KARP`` y
+``RUTAS_MAXIMO_RAMIFICACION_Y_PODA`` (nodos máximos que acepta cada método
+exacto; con más se responde 422) y ``RUTAS_DATOS`` (archivo JSON que se
+carga al arrancar).
+"""
+
+import json  # Cuerpos de solicitud y respuesta
+import math  # Detección de infinitos antes de serializar
+import os  # Configuración por variables de entorno
+import re  # Validación de los id de grafo antes de usarlos como nombre de archivo
+import tempfile  # Escritura atómica de los datos de cada grafo
+import threading  # Semáforo y candados
+import time  # Duración de las solicitudes
+from collections import OrderedDict  # Grafos guardados, del menos al más reciente
+from socketserver import ThreadingMixIn  # Servidor de desarrollo con hilos
+from wsgiref.simple_server import WSGIServer, make_server
+
+import networkx as nx  # Errores de caminos inexistentes
+
+from .cache_resultados import CacheResultados
+from .cierre_metrico import DIRECTORIO_CACHE
+from .caminos import distancias_desde, ruta_mas_rapida, tsp_aproximado
+from .dependiente_tiempo import held_karp_dependiente
+from .grafo import PESOS, POSICIONES, cargar_grafo, huella_datos
+from .jerarquias import matrices_viaje
+from .tsp_exacto import held_karp, ramificacion_y_poda
+from .tsp_progresivo import circuito_con_plazo
+
+LIMITE_CONCURRENCIA = int(os.environ.get("RUTAS_CONCURRENCIA", os.cpu_count() or 1))
+MAXIMO_COLA = int(os.environ.get("RUTAS_MAXIMO_COLA", 64))
+MAXIMO_GRAFOS = int(os.environ.get("RUTAS_MAXIMO_GRAFOS", 32))
+
+MAXIMO_RESULTADOS = int(os.environ.get("RUTAS_MAXIMO_RESULTADOS", 4096))
+
+METODOS_TSP = {"held_karp": held_karp, "ramificacion_y_poda": ramificacion_y_poda}
+# Nodos máximos de cada método exacto: Held-Karp guarda tablas de 2ⁿ · n y la poda puede ser factorial
+MAXIMO_NODOS = {
+    "held_karp": int(os.environ.get("RUTAS_MAXIMO_HELD_KARP", 20)),
+    "ramificacion_y_poda": int(os.environ.get("RUTAS_MAXIMO_RAMIFICACION_Y_PODA", 16)),
+}
+
+DIRECTORIO_GRAFOS = os.path.join(DIRECTORIO_CACHE, "grafos")  # Datos de cada grafo, por huella
+ID_GRAFO = re.compile(r"[0-9a-f]{64}")  # Las huellas son SHA-256 en hexadecimal
+
+
+class ErrorSolicitud(Exception):
+    """Error que se devuelve al cliente con el código HTTP indicado."""
+
+    def __init__(self, mensaje, estado="400 Bad Request"):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+# Grafos cargados: huella -> (G_tiempo, G_distancia)
+_grafos = OrderedDict()
+_candado_grafos = threading.Lock()
+
+# Resultados ya calculados, por huella de grafo, solucionador y argumentos
+_cache = CacheResultados(MAXIMO_RESULTADOS, os.environ.get("RUTAS_CACHE_RESULTADOS"))
+
+# Control de concurrencia y métricas de este proceso
+_semaforo = threading.BoundedSemaphore(LIMITE_CONCURRENCIA)
+_candado_metricas = threading.Lock()
+_metricas = {
+    "en_curso": 0,
+    "en_cola": 0,
+    "cola_maxima": 0,
+    "atendidas": 0,  # Operaciones resueltas sin error
+    "rechazadas": 0,  # Rechazadas con 503 por la cola llena
+    "errores": 0,  # Respuestas de error (solicitudes inválidas y operaciones que fallaron)
+    "segundos_totales": 0.0,
+}
+
+
+def _guardar_datos(clave, datos, dirigido, posiciones):
+    """Escribe los datos del grafo en ``DIRECTORIO_GRAFOS`` con un reemplazo atómico."""
+    archivo = os.path.join(DIRECTORIO_GRAFOS, clave + ".json")
+    if os.path.exists(archivo):
+        return
+    os.makedirs(DIRECTORIO_GRAFOS, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=DIRECTORIO_GRAFOS, suffix=".json")
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as salida:
+            json.dump({"datos": datos, "dirigido": dirigido, "posiciones": posiciones}, salida, ensure_ascii=False)
+        os.replace(temporal, archivo)  # Otros trabajadores nunca ven un archivo a medias
+    except BaseException:
+        os.unlink(temporal)
+        raise
+
+
+def _leer_datos(clave):
+    """Carga un grafo que registró otro trabajador; ``None`` si nadie lo registró."""
+    if not ID_GRAFO.fullmatch(clave):
+        return None
+    try:
+        with open(os.path.join(DIRECTORIO_GRAFOS, clave + ".json"), encoding="utf-8") as entrada:
+            guardado = json.load(entrada)
+    except FileNotFoundError:
+        return None
+    return registrar_grafo(guardado["datos"], guardado["dirigido"], guardado.get("posiciones"))[1]
+
+
+def _validar_posiciones(posiciones):
+    """Comprueba que ``posiciones`` sea ``{nodo: [latitud, longitud]}``."""
+    if not isinstance(posiciones, dict):
+        raise ErrorSolicitud('"posiciones" debe ser un objeto {nodo: [lat, lon]}')
+    for nodo, punto in posiciones.items():
+        if (not isinstance(punto, (list, tuple)) or len(punto) != 2
+                or not all(isinstance(x, (int, float)) and not isinstance(x, bool) for x in punto)):
+            raise ErrorSolicitud(f"Posición inválida para {nodo!r}: se espera [lat, lon]")
+
+
+def registrar_grafo(datos, dirigido=False, posiciones=None):
+    """
+    Carga los datos si no estaban y devuelve ``(id, (G_tiempo, G_distancia))``.
+    Sin ``posiciones`` se usan las de ``POSICIONES``; si se pasan, forman
+    parte del id.
+    """
+    clave = huella_datos(datos if posiciones is None else {"datos": datos, "posiciones": posiciones}, dirigido)
+    with _candado_grafos:
+        if clave in _grafos:
+            _grafos.move_to_end(clave)
+            return clave, _grafos[clave]
+    # Fuera del candado: puede tardar
+    grafos = cargar_grafo(datos, dirigido, posiciones=POSICIONES if posiciones is None else posiciones)
+    _guardar_datos(clave, datos, dirigido, posiciones)
+    with _candado_grafos:
+        _grafos[clave] = grafos
+        _grafos.move_to_end(clave)
+        while len(_grafos) > MAXIMO_GRAFOS:
+            _grafos.popitem(last=False)  # Sale el que lleva más tiempo sin usarse
+    return clave, grafos
+
+
+def _grafos_de(cuerpo):
+    """Devuelve el par de grafos indicado por ``"grafo"`` o ``"datos"``."""
+    if "grafo" in cuerpo:
+        if not isinstance(cuerpo["grafo"], str):
+            raise ErrorSolicitud('"grafo" debe ser el id que devolvió /cargar_grafo')
+        with _candado_grafos:
+            grafos = _grafos.get(cuerpo["grafo"])
+            if grafos is not None:
+                _grafos.move_to_end(cuerpo["grafo"])
+        if grafos is None:
+            grafos = _leer_datos(str(cuerpo["grafo"]))  # Quizás lo registró otro trabajador
+        if grafos is None:
+            raise ErrorSolicitud(f"Grafo desconocido: {cuerpo['grafo']}", "404 Not Found")
+        return cuerpo["grafo"], grafos
+    if "datos" in cuerpo:
+        if not isinstance(cuerpo["datos"], dict):
+            raise ErrorSolicitud('"datos" debe ser un objeto {origen: {destino: {...}}}')
+        posiciones = cuerpo.get("posiciones")
+        if posiciones is not None:
+            _validar_posiciones(posiciones)
+        return registrar_grafo(cuerpo["datos"], bool(cuerpo.get("dirigido", False)), posiciones)
+    raise ErrorSolicitud('Falta "grafo" o "datos"')
+
+
+def _grafo_peso(cuerpo, defecto="tiempo"):
+    """Grafo correspondiente al peso pedido (``"tiempo"`` o ``"distancia"``)."""
+    peso = cuerpo.get("peso", defecto)
+    if peso not in PESOS:
+        raise ErrorSolicitud(f"Peso desconocido: {peso!r}")
+    _, (G_tiempo, G_distancia) = _grafos_de(cuerpo)
+    return G_tiempo if peso == "tiempo" else G_distancia
+
+
+def _campo(cuerpo, nombre):
+    if nombre not in cuerpo:
+        raise ErrorSolicitud(f'Falta "{nombre}"')
+    return cuerpo[nombre]
+
+
+def _nodo(G, cuerpo, nombre):
+    """Campo ``nombre`` del cuerpo, que debe ser un nodo de ``G``."""
+    nodo = _campo(cuerpo, nombre)
+    if nodo not in G:
+        raise nx.NodeNotFound(f"El nodo {nodo!r} no está en el grafo")
+    return nodo
+
+
+def _limitar(G, metodo):
+    """Rechaza con 422 los grafos demasiado grandes para el método exacto ``metodo``."""
+    if G.number_of_nodes() > MAXIMO_NODOS[metodo]:
+        raise ErrorSolicitud(f"{metodo} admite a lo sumo {MAXIMO_NODOS[metodo]} nodos y el grafo "
+                             f"tiene {G.number_of_nodes()}; use /tsp_aproximado",
+                             "422 Unprocessable Entity")
+
+
+def _op_cargar_grafo(cuerpo):
+    clave, (G_tiempo, _) = _grafos_de(cuerpo)
+    return {"grafo": clave, "nodos": G_tiempo.number_of_nodes(), "aristas": G_tiempo.number_of_edges()}
+
+
+def _op_circuito_tsp(cuerpo):
+    G = _grafo_peso(cuerpo)
+    metodo = cuerpo.get("metodo", "held_karp")
+    if metodo not in METODOS_TSP:
+        raise ErrorSolicitud(f"Método desconocido: {metodo!r}")
+    inicio = _nodo(G, cuerpo, "inicio")
+    if cuerpo.get("salida") is not None:  # Circuito dependiente de la hora de salida
+        _limitar(G, "held_karp")
+        ruta, peso = _cache.consultar(held_karp_dependiente, G, inicio, float(cuerpo["salida"]))
+    else:
+        _limitar(G, metodo)
+        ruta, peso = _cache.consultar(METODOS_TSP[metodo], G, inicio)
+    return {"ruta": ruta, "peso": peso}
+
+
+def _op_ruta_mas_rapida(cuerpo):
+    G = _grafo_peso(cuerpo)
+    inicio = _nodo(G, cuerpo, "inicio")
+    if cuerpo.get("fin") is None:  # Como el script 4: costo mínimo hacia todos los nodos
+        distancias = _cache.consultar(distancias_desde, G, inicio,
+                                      nombre="distancias_desde")
+        return {"distancias": distancias}
+    ruta, costo = _cache.consultar(ruta_mas_rapida, G, inicio, _nodo(G, cuerpo, "fin"))
+    return {"ruta": ruta, "costo": costo}
+
+
+def _op_tsp_aproximado(cuerpo):
+    G = _grafo_peso(cuerpo, defecto="distancia")
+    inicio = _nodo(G, cuerpo, "inicio")
+    if cuerpo.get("presupuesto_ms") is not None:  # Respuesta acotada en tiempo: no pasa por la caché
+        estadisticas = {}
+        ruta, peso = circuito_con_plazo(G, inicio, float(cuerpo["presupuesto_ms"]),
+                                        estadisticas=estadisticas)
+        return {"ruta": ruta, "peso": peso, **estadisticas}
+    ruta = _cache.consultar(tsp_aproximado, G, inicio)
+    try:
+        peso = sum(G[ruta[i]][ruta[i + 1]]["weight"] for i in range(len(ruta) - 1))
+    except KeyError:
+        peso = None  # La heurística sobre el grafo no dirigido puede usar aristas en contra
+    return {"ruta": ruta, "peso": peso}
+
+
+def _matrices_listas(G_tiempo, G_distancia, origenes, destinos):
+    """Matrices de ``matrices_viaje`` como listas (``float32`` con su representación corta)."""
+    tiempo, distancia = matrices_viaje(G_tiempo, G_distancia, origenes, destinos)
+    return {"tiempo": [[float(x) for x in fila] for fila in tiempo.astype(str)],
+            "distancia": [[float(x) for x in fila] for fila in distancia.astype(str)]}
+
+
+def _op_matriz(cuerpo):
+    _, (G_tiempo, G_distancia) = _grafos_de(cuerpo)
+    origenes = cuerpo.get("origenes") or list(G_tiempo.nodes)
+    destinos = cuerpo.get("destinos") or list(G_tiempo.nodes)
+    for nodo in origenes + destinos:
+        if nodo not in G_tiempo:
+            raise nx.NodeNotFound(f"El nodo {nodo!r} no está en el grafo")
+    matrices = _cache.consultar(_matrices_listas, G_tiempo, G_distancia, origenes, destinos,
+                                nombre="matriz")
+    return {"origenes": origenes, "destinos": destinos, **matrices}
+
+
+OPERACIONES = {
+    "/cargar_grafo": _op_cargar_grafo,
+    "/circuito_tsp": _op_circuito_tsp,
+    "/ruta_mas_rapida": _op_ruta_mas_rapida,
+    "/tsp_aproximado": _op_tsp_aproximado,
+    "/matriz": _op_matriz,
+}
+
+
+def metricas():
+    """Copia de las métricas de este proceso."""
+    with _candado_metricas:
+        copia = dict(_metricas)
+    copia.update(pid=os.getpid(), limite_concurrencia=LIMITE_CONCURRENCIA,
+                 maximo_cola=MAXIMO_COLA, grafos_cargados=len(_grafos),
+                 cache=_cache.estadisticas())
+    return copia
+
+
+def _sin_infinitos(valor):
+    """JSON no admite ``Infinity``: los costos infinitos se envían como ``null``."""
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return None
+    if isinstance(valor, dict):
+        return {k: _sin_infinitos(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_sin_infinitos(v) for v in valor]
+    return valor
+
+
+def _responder(start_response, estado, contenido):
+    cuerpo = json.dumps(_sin_infinitos(contenido), ensure_ascii=False).encode("utf-8")
+    start_response(estado, [("Content-Type", "application/json; charset=utf-8"),
+                            ("Content-Length", str(len(cuerpo)))])
+    return [cuerpo]
+
+
+def _leer_cuerpo(environ):
+    try:
+        largo = int(environ.get("CONTENT_LENGTH") or 0)
+        cuerpo = json.loads(environ["wsgi.input"].read(largo) or b"{}")
+    except (ValueError, UnicodeDecodeError) as error:
+        raise ErrorSolicitud(f"JSON inválido: {error}")
+    if not isinstance(cuerpo, dict):
+        raise ErrorSolicitud("El cuerpo debe ser un objeto JSON")
+    return cuerpo
+
+
+def _resolver(operacion, cuerpo):
+    """Ejecuta la operación respetando el límite de concurrencia y llevando las métricas."""
+    with _candado_metricas:
+        if _metricas["en_cola"] >= MAXIMO_COLA:
+            _metricas["rechazadas"] += 1
+            raise ErrorSolicitud("Servicio saturado, intente de nuevo", "503 Service Unavailable")
+        _metricas["en_cola"] += 1
+        _metricas["cola_maxima"] = max(_metricas["cola_maxima"], _metricas["en_cola"])
+
+    _semaforo.acquire()
+    inicio = time.perf_counter()
+    with _candado_metricas:
+        _metricas["en_cola"] -= 1
+        _metricas["en_curso"] += 1
+    resuelta = False
+    try:
+        resultado = operacion(cuerpo)
+        resuelta = True
+        return resultado
+    finally:
+        _semaforo.release()
+        with _candado_metricas:
+            _metricas["en_curso"] -= 1
+            _metricas["atendidas"] += resuelta  # Los fallos los cuenta "errores" al responder
+            _metricas["segundos_totales"] += time.perf_counter() - inicio
+
+
+def aplicacion(environ, start_response):
+    """Aplicación WSGI del servicio de rutas."""
+    metodo = environ.get("REQUEST_METHOD", "GET")
+    ruta = environ.get("PATH_INFO", "/")
+
+    try:
+        if metodo == "GET" and ruta == "/metricas":
+            return _responder(start_response, "200 OK", metricas())
+        if metodo == "GET" and ruta == "/salud":
+            return _responder(start_response, "200 OK", {"estado": "ok"})
+        if ruta not in OPERACIONES:
+            raise ErrorSolicitud(f"Ruta desconocida: {ruta}", "404 Not Found")
+        if metodo != "POST":
+            raise ErrorSolicitud("Use POST", "405 Method Not Allowed")
+        resultado = _resolver(OPERACIONES[ruta], _leer_cuerpo(environ))
+        return _responder(start_response, "200 OK", resultado)
+    except ErrorSolicitud as error:
+        estado = error.estado
+        mensaje = str(error)
+    except (nx.NodeNotFound, nx.NetworkXNoPath) as error:
+        estado = "422 Unprocessable Entity"
+        mensaje = f"No se pudo calcular la ruta: {error}"
+    except Exception as error:  # Cualquier otro fallo del solucionador
+        estado = "500 Internal Server Error"
+        mensaje = f"{type(error).__name__}: {error}"
+    with _candado_metricas:
+        _metricas["errores"] += 1
+    return _responder(start_response, estado, {"error": mensaje})
+
+
+# Grafo precargado al arrancar (con gunicorn --preload lo comparten todos los trabajadores)
+if os.environ.get("RUTAS_DATOS"):
+    with open(os.environ["RUTAS_DATOS"], encoding="utf-8") as _archivo:
+        registrar_grafo(json.load(_archivo))
+
+
+class _ServidorConHilos(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+if __name__ == "__main__":
+    puerto = int(os.environ.get("RUTAS_PUERTO", 8000))
+    with make_server("127.0.0.1", puerto, aplicacion, server_class=_ServidorConHilos) as servidor:
+        print(f"Servicio de rutas en http://127.0.0.1:{puerto}")
+        servidor.serve_forever()
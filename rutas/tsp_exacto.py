@@ -0,0 +1,340 @@
+"""
+Solucionadores exactos del problema del viajante (TSP).
+
+La fuerza bruta con permutaciones recorre (n-1)! rutas, lo que deja de ser
+práctico a partir de unos 11 destinos. Aquí se usa programación dinámica
+sobre subconjuntos (Held-Karp), que cuesta O(n² · 2ⁿ) y guarda sus tablas
+en arreglos de NumPy, de modo que 20 o más destinos se resuelven en segundos.
+
+Para grafos dispersos (como los anillos de ``json_data``, donde casi ninguna
+permutación es válida) también hay una búsqueda en profundidad con
+ramificación y poda, que descarta un prefijo en cuanto su costo más una cota
+inferior supera a la mejor ruta conocida.
+
+``circuito_pareto`` hace la misma programación dinámica sobre (máscara,
+último nodo) con los dos pesos a la vez: cada estado guarda todas las
+parejas (tiempo, distancia) no dominadas, y devuelve la mejor ruta para cada
+peso junto con el frente de Pareto (las rutas que no se pueden mejorar en
+un peso sin empeorar el otro).
+
+Salvo ``circuito_pareto``, todas las funciones devuelven la misma pareja ``(ruta, peso)`` que
+``circuito_tsp``: la ruta empieza y termina en ``inicio`` y, si no existe
+ningún circuito hamiltoniano, se devuelve ``(None, float("inf"))``.
+"""
+
+from itertools import chain, islice, permutations  # Enumeración por lotes en fuerza_bruta
+
+import numpy as np  # Tablas de la programación dinámica
+
+from .grafo import evaluar_rutas, matriz_pesos
+from .instrumentacion import contar, fase
+
+
+def _peso_ruta(G, ruta, weight="weight"):
+    """
+    Suma los pesos de la ruta directamente sobre el grafo, para devolver el
+    mismo tipo numérico (int o float) que la versión de fuerza bruta.
+    """
+    return sum(G[ruta[i]][ruta[i + 1]][weight] for i in range(len(ruta) - 1))
+
+
+def _matriz_pesos(G, inicio, weight="weight"):
+    """
+    Devuelve la lista de nodos (con ``inicio`` en la posición 0) y la matriz
+    de pesos correspondiente, con infinito donde no hay conexión.
+    """
+    nodos = list(G.nodes())
+    nodos.remove(inicio)
+    orden = [inicio] + nodos
+    return orden, matriz_pesos(G, orden, weight)
+
+
+def fuerza_bruta(G, inicio, weight="weight", lote=4096, estadisticas=None):
+    """
+    Prueba todas las permutaciones, igual que la versión original de
+    ``circuito_tsp``, pero evalúa las rutas por lotes de ``lote`` permutaciones
+    con índices sobre la matriz de pesos en lugar de sumar arista por arista.
+    Se conserva como referencia para comprobar los demás solucionadores.
+    Si se pasa ``estadisticas`` se anota la cantidad de rutas ``"evaluadas"``.
+    """
+    orden, W = _matriz_pesos(G, inicio, weight)
+    n = len(orden)
+    if n == 1:
+        return held_karp(G, inicio, weight, estadisticas)
+
+    perms = permutations(range(1, n))
+    mejor_peso = np.inf
+    mejor_ruta = None
+    while True:
+        # Tomamos el siguiente lote de permutaciones como un arreglo (k, n-1)
+        bloque = np.fromiter(chain.from_iterable(islice(perms, lote)), dtype=np.intp)
+        if bloque.size == 0:
+            break
+        bloque = bloque.reshape(-1, n - 1)
+        rutas = np.zeros((len(bloque), n + 1), dtype=np.intp)  # Empiezan y terminan en 0
+        rutas[:, 1:-1] = bloque
+        pesos = evaluar_rutas(W, rutas)
+        contar(estadisticas, "evaluadas", len(rutas))
+        k = int(np.argmin(pesos))  # La primera del lote, como en el recorrido original
+        if pesos[k] < mejor_peso:
+            mejor_peso = pesos[k]
+            mejor_ruta = rutas[k]
+
+    if mejor_ruta is None:
+        return None, float("inf")  # Ninguna permutación forma un circuito
+
+    ruta = [orden[i] for i in mejor_ruta]
+    return ruta, _peso_ruta(G, ruta, weight)
+
+
+def held_karp(G, inicio, weight="weight", estadisticas=None):
+    """
+    Encuentra el circuito de menor peso que visita todos los nodos y regresa
+    a ``inicio`` usando programación dinámica con máscaras de bits.
+
+    ``costo[mascara, j]`` es el menor peso de un camino que sale de ``inicio``,
+    visita exactamente los nodos de ``mascara`` y termina en ``j``. Las
+    máscaras se procesan por capas (según cuántos nodos contienen) para que
+    cada paso sea una operación vectorizada sobre toda la capa.
+    Si se pasa ``estadisticas`` se anotan los ``"estados"`` (máscara, último
+    nodo) evaluados y el tiempo de cada fase.
+    """
+    with fase(estadisticas, "matriz"):
+        orden, W = _matriz_pesos(G, inicio, weight)  # La fila/columna 0 es el inicio
+    nodos = orden[1:]  # El nodo de inicio queda fuera de las máscaras
+    m = len(nodos)
+
+    if m == 0:  # Grafo de un solo nodo: solo vale un lazo sobre sí mismo
+        if G.has_edge(inicio, inicio):
+            return [inicio, inicio], G[inicio][inicio][weight]
+        return None, float("inf")
+
+    desde_inicio = W[0, 1:]  # Peso de salir del inicio hacia cada nodo
+    hacia_inicio = W[1:, 0]  # Peso de volver al inicio desde cada nodo
+    W = W[1:, 1:]  # Pesos entre los nodos que se permutan
+
+    total = 1 << m
+    costo = np.full((total, m), np.inf)  # Mejor peso para (máscara, último nodo)
+    padre = np.full((total, m), -1, dtype=np.int8 if m < 128 else np.int16)  # Nodo anterior
+
+    # Caminos de un solo nodo: inicio -> j
+    unitarias = 1 << np.arange(m)
+    costo[unitarias, np.arange(m)] = desde_inicio
+
+    # Cantidad de bits encendidos en cada máscara, para agruparlas por capas
+    bits = np.zeros(1, dtype=np.int8)
+    for _ in range(m):
+        bits = np.concatenate([bits, bits + 1])  # Agregar un bit alto suma uno
+
+    mascaras = np.arange(total)
+    with fase(estadisticas, "programacion_dinamica"):
+        for tam in range(2, m + 1):
+            capa = mascaras[bits == tam]  # Máscaras con exactamente "tam" nodos
+            for j in range(m):
+                con_j = capa[(capa >> j) & 1 == 1]  # Máscaras de la capa que terminan en j
+                previas = con_j ^ (1 << j)  # Las mismas máscaras sin el nodo j
+                candidatos = costo[previas] + W[:, j]  # Llegar a j desde cada posible nodo k
+                mejor_k = np.argmin(candidatos, axis=1)
+                costo[con_j, j] = candidatos[np.arange(len(con_j)), mejor_k]
+                padre[con_j, j] = mejor_k
+                contar(estadisticas, "estados", len(con_j))
+
+    # Cerramos el circuito volviendo al inicio
+    cierre = costo[total - 1] + hacia_inicio
+    ultimo = int(np.argmin(cierre))
+    if not np.isfinite(cierre[ultimo]):
+        return None, float("inf")  # No existe circuito hamiltoniano
+
+    # Reconstruimos la ruta siguiendo los padres desde el último nodo
+    recorrido = []
+    mascara, j = total - 1, ultimo
+    while j != -1:
+        recorrido.append(nodos[j])
+        mascara, j = mascara ^ (1 << j), int(padre[mascara, j])
+    ruta = [inicio] + recorrido[::-1] + [inicio]
+
+    return ruta, _peso_ruta(G, ruta, weight)
+
+
+def _arbol_minimo(W, indices):
+    """
+    Peso del árbol de expansión mínima (Prim) sobre los nodos ``indices``.
+    Si esos nodos no están conectados entre sí, devuelve infinito.
+    """
+    k = len(indices)
+    if k <= 1:
+        return 0.0
+    sub = W[np.ix_(indices, indices)]
+    en_arbol = np.zeros(k, dtype=bool)
+    en_arbol[0] = True
+    mejor = sub[0].copy()  # Arista más barata desde el árbol hacia cada nodo
+    total = 0.0
+    for _ in range(k - 1):
+        candidatos = np.where(en_arbol, np.inf, mejor)
+        j = int(np.argmin(candidatos))
+        if not np.isfinite(candidatos[j]):
+            return np.inf  # Quedan nodos que no se pueden alcanzar
+        total += candidatos[j]
+        en_arbol[j] = True
+        mejor = np.minimum(mejor, sub[j])
+    return total
+
+
+def ramificacion_y_poda(G, inicio, weight="weight", estadisticas=None):
+    """
+    Resuelve el TSP de forma exacta con búsqueda en profundidad, podando
+    cada prefijo cuyo costo parcial más una cota inferior no mejora la mejor
+    ruta encontrada hasta el momento.
+
+    La cota es el árbol de expansión mínima sobre los nodos que faltan, el
+    último nodo visitado y el inicio: el resto del circuito es un camino que
+    los une a todos, así que nunca puede costar menos que ese árbol. En grafos
+    dispersos el árbol suele ser infinito (nodos desconectados) y la rama se
+    descarta de inmediato.
+
+    Si se pasa un diccionario en ``estadisticas`` se llena con la cantidad de
+    prefijos ``"expandidos"`` y ``"podados"``.
+    """
+    orden, W = _matriz_pesos(G, inicio, weight)
+    n = len(orden)
+
+    if n == 1:  # Grafo de un solo nodo: se comporta igual que held_karp
+        return held_karp(G, inicio, weight, estadisticas)
+
+    # Para la cota basta una versión simétrica con la arista más barata en cada sentido
+    W_cota = np.minimum(W, W.T)
+    # Vecinos de cada nodo ordenados del más cercano al más lejano
+    vecinos = [[int(j) for j in np.argsort(W[i]) if j != 0 and j != i and np.isfinite(W[i, j])]
+               for i in range(n)]
+
+    mejor_peso = np.inf
+    mejor_ruta = None
+    expandidos = podados = 0
+    ruta = [0]
+    visitado = np.zeros(n, dtype=bool)
+    visitado[0] = True
+
+    def explorar(actual, costo):
+        nonlocal mejor_peso, mejor_ruta, expandidos, podados
+        expandidos += 1
+
+        if len(ruta) == n:  # Todos visitados: cerramos el circuito
+            total = costo + W[actual, 0]
+            if total < mejor_peso:
+                mejor_peso = total
+                mejor_ruta = list(ruta)
+            return
+
+        for siguiente in vecinos[actual]:
+            if visitado[siguiente]:
+                continue
+            nuevo_costo = costo + W[actual, siguiente]
+            if nuevo_costo >= mejor_peso:
+                podados += 1  # Ni siquiera el prefijo mejora la mejor ruta
+                continue
+            faltan = [0, siguiente] + [j for j in range(1, n) if not visitado[j] and j != siguiente]
+            if nuevo_costo + _arbol_minimo(W_cota, faltan) >= mejor_peso:
+                podados += 1  # La cota inferior ya supera la mejor ruta
+                continue
+            visitado[siguiente] = True
+            ruta.append(siguiente)
+            explorar(siguiente, nuevo_costo)
+            ruta.pop()
+            visitado[siguiente] = False
+
+    explorar(0, 0.0)
+
+    contar(estadisticas, "expandidos", expandidos)
+    contar(estadisticas, "podados", podados)
+
+    if mejor_ruta is None:
+        return None, float("inf")  # No existe circuito hamiltoniano
+
+    ruta_final = [orden[i] for i in mejor_ruta] + [inicio]
+    return ruta_final, _peso_ruta(G, ruta_final, weight)
+
+
+def _no_dominadas(etiquetas):
+    """
+    Etiquetas ``(tiempo, distancia, ...)`` no dominadas, ordenadas por
+    tiempo. Ante empates exactos se conserva la que aparece primero.
+    """
+    frente = []
+    menor_distancia = float("inf")
+    for etiqueta in sorted(etiquetas, key=lambda e: (e[0], e[1])):  # sorted es estable
+        if etiqueta[1] < menor_distancia:  # Solo entra si mejora la distancia de las más rápidas
+            frente.append(etiqueta)
+            menor_distancia = etiqueta[1]
+    return frente
+
+
+def circuito_pareto(G_tiempo, G_distancia, inicio, estadisticas=None):
+    """
+    Programación dinámica bi-objetivo: ``etiquetas[(mascara, j)]`` son las
+    parejas (tiempo, distancia) no dominadas de los caminos que salen de
+    ``inicio``, visitan exactamente ``mascara`` y terminan en ``j``, cada una
+    con el nodo y la etiqueta de la que viene. Solo se crean los estados
+    alcanzables, así que en grafos dispersos se visitan muy pocos.
+
+    Devuelve ``(ruta_rapida, tiempo_total)``, ``(ruta_optima, distancia_total)``
+    y el frente de Pareto como lista de ``(ruta, tiempo, distancia)`` ordenada
+    de la ruta más rápida a la más corta. Si no hay circuito, las dos
+    primeras parejas son ``(None, inf)`` y el frente queda vacío. Si se pasa
+    ``estadisticas`` se anotan las ``"etiquetas"`` creadas.
+    """
+    orden, W_t = _matriz_pesos(G_tiempo, inicio)
+    W_d = matriz_pesos(G_distancia, orden)
+    n = len(orden)
+
+    if n == 1:  # Grafo de un solo nodo: el único circuito posible es el lazo
+        ruta, tiempo_total = held_karp(G_tiempo, inicio)
+        if ruta is None or not G_distancia.has_edge(inicio, inicio):
+            return (None, float("inf")), (None, float("inf")), []
+        distancia_total = _peso_ruta(G_distancia, ruta)
+        return (ruta, tiempo_total), (ruta, distancia_total), [(ruta, tiempo_total, distancia_total)]
+
+    # Tramos que existen con los dos pesos; el 0 (inicio) solo se usa para cerrar
+    validas = np.isfinite(W_t) & np.isfinite(W_d)
+    sucesores = [[v for v in np.flatnonzero(validas[j]).tolist() if v != 0] for j in range(n)]
+    W_t, W_d = W_t.tolist(), W_d.tolist()
+
+    # Cada capa agrega un nodo; una etiqueta es (tiempo, distancia, nodo anterior, etiqueta anterior)
+    capas = [{(0, 0): [(0.0, 0.0, -1, -1)]}]
+    with fase(estadisticas, "programacion_dinamica"):
+        for _ in range(n - 1):
+            siguiente = {}
+            for (mascara, j), etiquetas in capas[-1].items():
+                for v in sucesores[j]:
+                    if mascara >> v & 1:
+                        continue
+                    t_jv, d_jv = W_t[j][v], W_d[j][v]
+                    destino = siguiente.setdefault((mascara | 1 << v, v), [])
+                    destino.extend((t + t_jv, d + d_jv, j, k) for k, (t, d, _, _) in enumerate(etiquetas))
+            for estado, etiquetas in siguiente.items():
+                siguiente[estado] = _no_dominadas(etiquetas)
+                contar(estadisticas, "etiquetas", len(siguiente[estado]))
+            capas.append(siguiente)
+
+    # Cerramos el circuito volviendo al inicio
+    cierres = [(t + W_t[j][0], d + W_d[j][0], j, k)
+               for (_, j), etiquetas in capas[-1].items() if validas[j, 0]
+               for k, (t, d, _, _) in enumerate(etiquetas)]
+    if not cierres:
+        return (None, float("inf")), (None, float("inf")), []
+
+    frente = []
+    for _, _, j, k in _no_dominadas(cierres):
+        # Reconstruimos la ruta siguiendo las etiquetas anteriores capa por capa
+        recorrido = []
+        mascara = (1 << n) - 2  # Todos los nodos salvo el inicio
+        for capa in reversed(capas[1:]):
+            recorrido.append(orden[j])
+            _, _, anterior, k = capa[(mascara, j)][k]
+            mascara, j = mascara ^ (1 << j), anterior
+        ruta = [inicio] + recorrido[::-1] + [inicio]
+        frente.append((ruta, _peso_ruta(G_tiempo, ruta), _peso_ruta(G_distancia, ruta)))
+
+    # El primero del frente es el más rápido y el último el más corto
+    ruta_rapida, tiempo_total, _ = frente[0]
+    ruta_optima, _, distancia_total = frente[-1]
+    return (ruta_rapida, tiempo_total), (ruta_optima, distancia_total), frente
@@ -0,0 +1,133 @@
+"""
+Búsqueda exhaustiva del TSP repartida entre varios procesos.
+
+El espacio de permutaciones se divide según las dos primeras paradas
+después del inicio: cada tarea recorre, en orden lexicográfico, todas las
+rutas que empiezan con ese prefijo. Los procesos comparten la mejor cota
+encontrada hasta el momento para podar prefijos que ya no pueden ganar, y
+los resultados se combinan en el orden de las tareas, así que la ruta
+devuelta es exactamente la misma que la de ``fuerza_bruta``.
+
+La poda supone pesos no negativos, como los tiempos y distancias de los datos.
+"""
+
+import math  # Infinito para las cotas
+import os  # Número de núcleos disponibles
+from concurrent.futures import ProcessPoolExecutor  # Grupo de procesos
+from itertools import permutations  # Prefijos de cada tarea
+from multiprocessing import Value  # Cota compartida entre procesos
+
+from .tsp_exacto import _matriz_pesos, _peso_ruta, fuerza_bruta
+
+# Estado de cada proceso trabajador, fijado una vez por el inicializador
+_W = None
+_cota = None
+
+REFRESCO_COTA = 1024  # Cada cuántos nodos se vuelve a leer la cota compartida
+
+
+def _iniciar_trabajador(W, cota):
+    """Guarda la matriz (como listas, más rápidas de indexar) y la cota compartida."""
+    global _W, _cota
+    _W = W.tolist()
+    _cota = cota
+
+
+def _publicar_cota(peso):
+    """Baja la cota compartida si ``peso`` la mejora."""
+    with _cota.get_lock():
+        if peso < _cota.value:
+            _cota.value = peso
+
+
+def _resolver_prefijo(prefijo):
+    """
+    Recorre en orden lexicográfico todas las rutas que empiezan por
+    ``prefijo`` y devuelve ``(peso, ruta)`` de la primera de menor peso.
+    """
+    W = _W
+    n = len(W)
+
+    costo = 0.0
+    actual = 0
+    for siguiente in prefijo:
+        costo += W[actual][siguiente]
+        actual = siguiente
+    if not math.isfinite(costo):
+        return math.inf, None  # El prefijo usa una arista inexistente
+
+    restantes = [j for j in range(1, n) if j not in prefijo]
+    ruta = [0] + list(prefijo)
+    mejor_peso = math.inf
+    mejor_ruta = None
+    cota = _cota.value
+    contador = 0
+
+    def explorar(actual, costo):
+        nonlocal mejor_peso, mejor_ruta, cota, contador
+        contador += 1
+        if contador % REFRESCO_COTA == 0:
+            cota = _cota.value  # Otros procesos pudieron encontrar algo mejor
+
+        if len(ruta) == n:  # Todos visitados: cerramos el circuito
+            total = costo + W[actual][0]
+            if total < mejor_peso and total <= cota:
+                mejor_peso = total
+                mejor_ruta = ruta + [0]
+                _publicar_cota(total)
+                cota = min(cota, total)
+            return
+
+        for k, siguiente in enumerate(restantes):
+            if siguiente is None:
+                continue  # Ya está en la ruta
+            nuevo_costo = costo + W[actual][siguiente]
+            # Con el mismo costo gana la ruta anterior en orden lexicográfico,
+            # por eso la cota de otros procesos se compara de forma estricta
+            if not math.isfinite(nuevo_costo) or nuevo_costo >= mejor_peso or nuevo_costo > cota:
+                continue
+            restantes[k] = None
+            ruta.append(siguiente)
+            explorar(siguiente, nuevo_costo)
+            ruta.pop()
+            restantes[k] = siguiente
+
+    explorar(actual, costo)
+    return mejor_peso, mejor_ruta
+
+
+def fuerza_bruta_paralela(G, inicio, weight="weight", procesos=None):
+    """
+    Igual que ``fuerza_bruta`` pero repartiendo las rutas entre ``procesos``
+    procesos (por defecto, uno por núcleo). Devuelve la misma pareja
+    ``(ruta, peso)`` que la versión en serie.
+    """
+    orden, W = _matriz_pesos(G, inicio, weight)
+    n = len(orden)
+    if n <= 3:  # Muy pocas rutas para que valga la pena repartir
+        return fuerza_bruta(G, inicio, weight)
+
+    # Una tarea por cada par de primeras paradas, en orden lexicográfico
+    largo_prefijo = 2 if n > 4 else 1
+    tareas = list(permutations(range(1, n), largo_prefijo))
+
+    cota = Value("d", math.inf)
+    procesos = procesos or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador,
+                             initargs=(W, cota)) as ejecutor:
+        resultados = list(ejecutor.map(_resolver_prefijo, tareas,
+                                       chunksize=max(1, len(tareas) // (4 * procesos))))
+
+    # Combinamos en el orden de las tareas: ante empates gana el prefijo menor
+    mejor_peso = math.inf
+    mejor_ruta = None
+    for peso, ruta in resultados:
+        if ruta is not None and peso < mejor_peso:
+            mejor_peso = peso
+            mejor_ruta = ruta
+
+    if mejor_ruta is None:
+        return None, float("inf")  # No existe circuito hamiltoniano
+
+    ruta_final = [orden[i] for i in mejor_ruta]
+    return ruta_final, _peso_ruta(G, ruta_final, weight)
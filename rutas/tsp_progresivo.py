@@ -0,0 +1,278 @@
+"""
+TSP con plazo: entrega una ruta de inmediato y la va mejorando hasta que
+se acaba el tiempo.
+
+``circuito_tsp`` y ``tsp_aproximado`` solo responden al terminar.
+``circuitos_progresivos`` es un generador que produce un diccionario cada
+vez que encuentra una ruta mejor:
+
+1. Vecino más cercano (en milisegundos, incluso con miles de paradas).
+2. Búsqueda local (2-opt / Or-opt) sobre esa ruta.
+3. Si quedan pocas paradas, ramificación y poda hasta demostrar el óptimo;
+   si no, búsqueda local iterada (una perturbación "doble puente" seguida de
+   búsqueda local, quedándose con la mejor) hasta el plazo.
+
+Cada entrega trae una cota inferior y la brecha ``(peso - cota) / peso``.
+La cota empieza con la suma de las salidas más baratas de cada nodo y luego
+se refina con la cota de 1-árbol de Held y Karp (optimización por
+subgradiente), así que la brecha es una estimación pesimista.
+
+Como ``tsp_aproximado``, si el grafo es conexo se trabaja sobre el cierre
+métrico (``preparar_circuito``) y las rutas se devuelven expandidas al
+camino real; el tiempo de leer (o calcular) el cierre cuenta dentro del
+plazo, y si lo agota no se entrega nada.
+"""
+
+import math  # Infinito
+import time  # Plazo
+
+import numpy as np  # Matriz de pesos y cotas vectorizadas
+
+from .busqueda_local import _peso_circuito, busqueda_local, preparar_busqueda
+from .cierre_metrico import preparar_circuito
+from .tsp_exacto import _arbol_minimo
+
+LIMITE_EXACTO = 12  # Hasta cuántas paradas se intenta demostrar el óptimo
+FRACCION_COTA = 0.2  # Parte del plazo que se dedica a refinar la cota
+
+
+def vecino_mas_cercano(W):
+    """Circuito de índices desde 0 yendo siempre al nodo sin visitar más barato."""
+    n = len(W)
+    libre = np.ones(n, dtype=bool)
+    libre[0] = False
+    ruta = [0]
+    for _ in range(n - 1):
+        fila = np.where(libre, W[ruta[-1]], np.inf)
+        siguiente = int(np.argmin(fila))
+        if not libre[siguiente]:  # Solo quedan nodos inalcanzables: se toma cualquiera
+            siguiente = int(np.flatnonzero(libre)[0])
+        libre[siguiente] = False
+        ruta.append(siguiente)
+    return ruta
+
+
+def _cota_rapida(W):
+    """Cada nodo sale y entra exactamente una vez: suma de sus salidas (o entradas) más baratas."""
+    sin_lazos = W + np.diag(np.full(len(W), np.inf))
+    return max(sin_lazos.min(axis=1).sum(), sin_lazos.min(axis=0).sum())
+
+
+def _un_arbol(W):
+    """
+    Peso del 1-árbol mínimo (árbol de expansión sobre los nodos 1..n-1 más
+    las dos aristas más baratas del nodo 0) y el grado de cada nodo en él.
+    """
+    n = len(W)
+    grados = np.zeros(n, dtype=np.int64)
+    en_arbol = np.zeros(n, dtype=bool)
+    en_arbol[0] = True
+    en_arbol[1] = True
+    mejor = W[1].copy()
+    desde = np.full(n, 1)
+    total = 0.0
+    for _ in range(n - 2):
+        candidatos = np.where(en_arbol, np.inf, mejor)
+        j = int(np.argmin(candidatos))
+        total += candidatos[j]
+        grados[j] += 1
+        grados[desde[j]] += 1
+        en_arbol[j] = True
+        mas_barato = W[j] < mejor
+        mejor = np.where(mas_barato, W[j], mejor)
+        desde = np.where(mas_barato, j, desde)
+    dos = np.argsort(W[0, 1:])[:2] + 1
+    total += W[0, dos].sum()
+    grados[0] = 2
+    grados[dos] += 1
+    return total, grados
+
+
+def _cota_held_karp(W, superior, plazo):
+    """
+    Cota de Held y Karp: maximiza por subgradiente el 1-árbol con penalizaciones
+    ``pi`` en los nodos hasta ``plazo``. Devuelve la mejor cota encontrada.
+    """
+    n = len(W)
+    simetrica = np.minimum(W, W.T)  # Una cota para la versión simétrica vale para la dirigida
+    np.fill_diagonal(simetrica, np.inf)
+    if n < 3 or not np.isfinite(simetrica[~np.eye(n, dtype=bool)]).all():
+        return -math.inf
+    pi = np.zeros(n)
+    paso = 2.0
+    mejor = -math.inf
+    while time.perf_counter() < plazo and paso > 1e-6:
+        valor, grados = _un_arbol(simetrica + pi[:, None] + pi[None, :])
+        valor -= 2 * pi.sum()
+        if valor > mejor + 1e-9:
+            mejor = valor
+        else:
+            paso *= 0.9
+        direccion = grados - 2
+        norma = float(direccion @ direccion)
+        if norma == 0:
+            break  # El 1-árbol es un circuito: la cota es exacta
+        pi += paso * (superior - valor) / norma * direccion
+    return mejor
+
+
+def _doble_puente(ruta, azar):
+    """
+    Perturbación clásica: corta la ruta en cuatro tramos A B C D y los une
+    como A C B D. Devuelve la nueva ruta y los nodos en los extremos de los cortes.
+    """
+    n = len(ruta)
+    i, j, k = sorted(int(x) for x in azar.choice(np.arange(1, n), size=3, replace=False))
+    extremos = [ruta[x % n] for c in (i, j, k, n) for x in (c - 1, c)]
+    return ruta[:i] + ruta[j:k] + ruta[i:j] + ruta[k:], extremos
+
+
+def _ramificacion(W, mejor_peso, plazo):
+    """
+    Ramificación y poda con cota de árbol mínimo que se detiene en ``plazo``.
+    Genera ``(ruta, peso)`` por cada mejora y termina con ``(None, completo)``.
+    """
+    n = len(W)
+    W_cota = np.minimum(W, W.T)
+    vecinos = [[int(j) for j in np.argsort(W[i]) if j != 0 and j != i and np.isfinite(W[i, j])]
+               for i in range(n)]
+    ruta = [0]
+    visitado = [False] * n
+    visitado[0] = True
+    revisados = 0
+
+    def explorar(actual, costo):
+        nonlocal mejor_peso, revisados
+        revisados += 1
+        if revisados % 256 == 0 and time.perf_counter() >= plazo:
+            raise TimeoutError
+        if len(ruta) == n:
+            total = costo + W[actual, 0]
+            if total < mejor_peso:
+                mejor_peso = total
+                yield list(ruta), float(total)
+            return
+        for siguiente in vecinos[actual]:
+            if visitado[siguiente]:
+                continue
+            nuevo = costo + W[actual, siguiente]
+            faltan = [0, siguiente] + [j for j in range(1, n) if not visitado[j] and j != siguiente]
+            if nuevo >= mejor_peso or nuevo + _arbol_minimo(W_cota, faltan) >= mejor_peso:
+                continue
+            visitado[siguiente] = True
+            ruta.append(siguiente)
+            yield from explorar(siguiente, nuevo)
+            ruta.pop()
+            visitado[siguiente] = False
+
+    try:
+        yield from explorar(0, 0.0)
+    except TimeoutError:
+        yield None, False
+        return
+    yield None, True
+
+
+def circuitos_progresivos(G, inicio, presupuesto_ms=1000, vecinos=8, semilla=0):
+    """
+    Generador de circuitos cada vez mejores que visitan todos los nodos y
+    vuelven a ``inicio``, hasta agotar ``presupuesto_ms`` milisegundos.
+
+    Cada elemento es un diccionario con ``"ruta"``, ``"peso"``, ``"cota"``,
+    ``"brecha"``, ``"segundos"`` desde el inicio, ``"fase"`` y ``"optimo"``.
+    El último elemento (``"fase": "final"``) repite la mejor ruta con la
+    cota definitiva, así que basta con quedarse con lo último recibido.
+    Si preparar la matriz ya agota el plazo el generador termina sin
+    entregar nada.
+    """
+    reloj = time.perf_counter()
+    plazo = reloj + presupuesto_ms / 1000
+    W, traducir = preparar_circuito(G, inicio)
+    if time.perf_counter() >= plazo:
+        return
+    n = len(W)
+    azar = np.random.default_rng(semilla)
+    cota = _cota_rapida(W) if n > 1 else 0.0
+    estado = {"ruta": None, "peso": math.inf, "optimo": False}
+
+    def entrega(fase):
+        peso = estado["peso"]
+        brecha = 0.0 if estado["optimo"] or peso == cota else (
+            (peso - cota) / peso if math.isfinite(peso) and peso > 0 else math.inf)
+        ruta = traducir(estado["ruta"] + [0]) if estado["ruta"] is not None else None
+        return {"ruta": ruta, "peso": peso, "cota": cota, "brecha": max(0.0, brecha),
+                "segundos": time.perf_counter() - reloj, "fase": fase, "optimo": estado["optimo"]}
+
+    def proponer(ruta):
+        """Guarda ``ruta`` si mejora la mejor (con su peso real: ``inf`` si usa aristas faltantes)."""
+        peso = _peso_circuito(W, ruta)
+        if peso < estado["peso"] - 1e-9:
+            estado["ruta"], estado["peso"] = list(ruta), float(peso)
+            return True
+        return False
+
+    # 1. Ruta constructiva inmediata
+    if n == 1:
+        estado["ruta"], estado["peso"], estado["optimo"] = [0], 0.0, True
+        yield entrega("final")
+        return
+    ruta = vecino_mas_cercano(W)
+    if proponer(ruta):
+        yield entrega("vecino_mas_cercano")
+
+    # 2. Búsqueda local sobre la ruta constructiva (vecinos y penalizaciones una sola vez)
+    preparada = None
+    if n > 3 and time.perf_counter() < plazo:
+        preparada = preparar_busqueda(W, vecinos)
+        restante = plazo - time.perf_counter()
+        ruta, _ = busqueda_local(W, ruta, tiempo_limite=max(0.0, restante * 0.5), preparada=preparada)
+        if proponer(ruta):
+            yield entrega("busqueda_local")
+
+    # 3a. Pocas paradas: se intenta demostrar el óptimo
+    if n <= LIMITE_EXACTO:
+        for ruta, peso in _ramificacion(W, estado["peso"], plazo):
+            if ruta is None:
+                estado["optimo"] = peso  # Se recorrió todo el árbol: la mejor ruta es óptima
+                if estado["optimo"]:
+                    cota = estado["peso"]
+                break
+            proponer(ruta)
+            yield entrega("ramificacion_y_poda")
+
+    # 3b. Muchas paradas: se refina la cota y se perturba la mejor ruta hasta el plazo
+    if not estado["optimo"]:
+        fin_cota = min(plazo, time.perf_counter() + FRACCION_COTA * (plazo - reloj))
+        if math.isfinite(estado["peso"]) and time.perf_counter() < fin_cota:
+            cota = max(cota, _cota_held_karp(W, estado["peso"], fin_cota))
+        while n > 7 and time.perf_counter() < plazo:
+            ruta, extremos = _doble_puente(estado["ruta"] or ruta, azar)
+            ruta, _ = busqueda_local(W, ruta, tiempo_limite=plazo - time.perf_counter(),
+                                     revisar=extremos, preparada=preparada)
+            if proponer(ruta):
+                yield entrega("busqueda_local_iterada")
+
+    yield entrega("final")
+
+
+def circuito_con_plazo(G, inicio, presupuesto_ms=1000, estadisticas=None, **opciones):
+    """
+    Mejor circuito encontrado por ``circuitos_progresivos`` dentro del plazo,
+    con la interfaz ``(ruta, peso)`` de los demás solucionadores (``(None,
+    inf)`` si el plazo se agotó antes de la primera ruta). Si se pasa
+    ``estadisticas`` se llena con la ``"cota"``, la ``"brecha"``, si es
+    ``"optimo"`` y la cantidad de ``"mejoras"``.
+    """
+    reloj = time.perf_counter()
+    ultimo, mejoras = None, 0
+    for ultimo in circuitos_progresivos(G, inicio, presupuesto_ms, **opciones):
+        mejoras += ultimo["fase"] != "final"
+    if ultimo is None:
+        if estadisticas is not None:
+            estadisticas.update(cota=-math.inf, brecha=math.inf, optimo=False, mejoras=0,
+                                segundos=time.perf_counter() - reloj)
+        return None, math.inf
+    if estadisticas is not None:
+        estadisticas.update(cota=ultimo["cota"], brecha=ultimo["brecha"], optimo=ultimo["optimo"],
+                            mejoras=mejoras, segundos=ultimo["segundos"])
+    return ultimo["ruta"], ultimo["peso"]
@@ -1,6 +1,7 @@
 const express = require('express');
 const { exec } = require('child_process');
 const path = require('path');
+const http = require('http');
 
 const app = express();
 const port = process.env.PORT || 3000;
@@ -33,6 +34,56 @@ app.post('/ejecutar', (req, res) => {
     });
 });
 
+// Dirección del servicio de rutas en Python (gunicorn rutas.servicio:aplicacion)
+const servicioRutas = process.env.SERVICIO_RUTAS || 'http://127.0.0.1:8000';
+
+// Reenvía una solicitud al servicio de rutas, que ya tiene Python y los grafos cargados.
+// Usa el módulo http de Node en lugar de fetch (que solo existe desde Node 18), así que
+// funciona con las mismas versiones de Node que /ejecutar.
+function reenviarARutas(metodo, operacion, cuerpo, res) {
+    const url = new URL(`${servicioRutas}/${operacion}`);
+    const datos = metodo === 'POST' ? JSON.stringify(cuerpo || {}) : null;
+    const solicitud = http.request({
+        hostname: url.hostname,
+        port: url.port,
+        path: url.pathname + url.search,
+        method: metodo,
+        headers: datos === null ? {} : {
+            'Content-Type': 'application/json',
+            'Content-Length': Buffer.byteLength(datos)
+        }
+    }, (respuesta) => {
+        let texto = '';
+        respuesta.setEncoding('utf8');
+        respuesta.on('data', (parte) => { texto += parte; });
+        respuesta.on('end', () => {
+            try {
+                res.status(respuesta.statusCode).json(JSON.parse(texto));
+            } catch (error) {
+                res.status(502).json({ error: `Respuesta inválida del servicio de rutas: ${error.message}` });
+            }
+        });
+    });
+    solicitud.on('error', (error) => {
+        // El servicio no está levantado o no respondió
+        res.status(502).json({ error: `Servicio de rutas no disponible: ${error.message}` });
+    });
+    if (datos !== null) {
+        solicitud.write(datos);
+    }
+    solicitud.end();
+}
+
+// Endpoints de rutas (cargar_grafo, circuito_tsp, ruta_mas_rapida, tsp_aproximado, matriz)
+app.post('/rutas/:operacion', (req, res) => {
+    reenviarARutas('POST', encodeURIComponent(req.params.operacion), req.body, res);
+});
+
+// Métricas de concurrencia y cola del servicio de rutas
+app.get('/rutas/metricas', (req, res) => {
+    reenviarARutas('GET', 'metricas', null, res);
+});
+
 // Iniciar el servidor
 app.listen(port, () => {
     console.log(`Servidor corriendo en http://localhost:${port}`);